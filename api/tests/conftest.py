@@ -1,11 +1,27 @@
 import pytest
 import os
 import sys
+import time
 from unittest.mock import patch
 
 sys.path.insert(0,
                 os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# the .env mounted in CI sets REDIS_HOST, which would otherwise make Redis
+# the cache backend; tests that need Redis give a cache a FakeRedis
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
+# sources of the Lambda functions: infra/modules/lambda in a checkout, or
+# /app/lambda in the API image
+for lambda_dir in (
+    os.path.join(os.path.dirname(__file__), '..', '..', 'infra', 'modules',
+                 'lambda'),
+    os.path.join(os.path.dirname(__file__), '..', 'lambda')
+):
+    if os.path.isdir(lambda_dir):
+        sys.path.insert(0, os.path.abspath(lambda_dir))
+        break
+
 
 @pytest.fixture(autouse=True)
 def mock_redis():
@@ -14,6 +30,105 @@ def mock_redis():
         yield mock_redis
 
 
+class FakeRedis:
+    """In-memory stand-in for the Redis commands the caches use"""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+
+    def _live(self, key):
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            return None
+        return value
+
+    def get(self, key):
+        self.commands.append("get")
+        return self._live(key)
+
+    def mget(self, keys):
+        self.commands.append("mget")
+        return [self._live(key) for key in keys]
+
+    def set(self, key, value, nx=False, px=None):
+        self.commands.append("set")
+        if nx and self._live(key) is not None:
+            return None
+        expires = time.monotonic() + px / 1000 if px else None
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        self.data[key] = (value, expires)
+        return True
+
+    def exists(self, key):
+        return int(self._live(key) is not None)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        value = int(self._live(key) or 0) + 1
+        self.data[key] = (str(value).encode(), None)
+        return value
+
+    def eval(self, script, numkeys, key, token):
+        if self._live(key) == token.encode():
+            self.delete(key)
+
+    def pipeline(self, transaction=True):
+        fake = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def set(self, *args, **kwargs):
+                self.calls.append((args, kwargs))
+
+            def execute(self):
+                fake.commands.append("pipeline")
+                for args, kwargs in self.calls:
+                    fake.data[args[0]] = (
+                        args[1], time.monotonic() + kwargs["px"] / 1000)
+
+        return Pipeline()
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture(autouse=True)
+def reset_aws_clients():
+    """Give every test fresh boto3 clients, so mocks and patches apply"""
+    from v1.aws_clients import reset_clients
+    reset_clients()
+    yield
+    reset_clients()
+
+
+@pytest.fixture(autouse=True)
+def reset_caches(monkeypatch):
+    """Start every test with empty response caches"""
+    from v1.cache import (download_url_cache, known_email_cache,
+                          listing_cache, object_info_cache,
+                          upload_session_cache)
+    caches = (download_url_cache, known_email_cache, object_info_cache)
+    # upload sessions always live in Redis
+    monkeypatch.setattr(upload_session_cache, "_client", FakeRedis())
+    listing_cache.reset()
+    for cache in caches:
+        cache.clear()
+    yield
+    listing_cache.reset()
+    for cache in caches:
+        cache.clear()
+
+
 @pytest.fixture
 def client():
     from v1.app import app
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+
+from unittest.mock import patch
+from v1 import aws_clients
+from v1.aws_clients import get_client, get_resource, reset_clients
+from v1.config import Config
+
+
+def test_get_client_is_shared():
+    """Test the same client is returned for repeated calls"""
+    assert get_client("s3") is get_client("s3")
+
+
+def test_get_client_overrides_are_separate():
+    """Test clients with different settings are cached separately"""
+    accelerated = get_client("s3", s3={"use_accelerate_endpoint": True})
+
+    assert accelerated is not get_client("s3")
+    assert accelerated is get_client(
+        "s3", s3={"use_accelerate_endpoint": True}
+    )
+
+
+def test_get_resource_is_shared():
+    """Test the same resource is returned for repeated calls"""
+    assert get_resource("dynamodb") is get_resource("dynamodb")
+
+
+def test_client_configuration():
+    """Test clients are built with the pooling and retry settings"""
+    config = get_client("s3").meta.config
+
+    assert config.max_pool_connections == Config.AWS_MAX_POOL_CONNECTIONS
+    assert config.tcp_keepalive == Config.AWS_TCP_KEEPALIVE
+    assert config.retries["mode"] == Config.AWS_RETRY_MODE
+
+
+def test_reset_clients():
+    """Test reset_clients forces new clients to be built"""
+    client = get_client("s3")
+    reset_clients()
+
+    assert get_client("s3") is not client
+
+
+def test_clients_rebuilt_after_fork():
+    """Test a forked worker does not reuse its parent's clients"""
+    client = get_client("s3")
+
+    with patch.object(aws_clients.os, "getpid",
+                      return_value=aws_clients._registry_pid + 1):
+        assert get_client("s3") is not client
@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+
+import pytest
+from unittest.mock import patch
+from v1.cache import ListingCache, TTLCache, listing_cache
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask application"""
+    from v1.app import app
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        with client.session_transaction() as session:
+            session["email"] = "testuser@example.com"
+            session["id_token"] = "mock_token"
+        yield client
+
+
+def test_ttl_cache_expiry():
+    """Test entries expire after their time to live"""
+    cache = TTLCache(maxsize=10, ttl=30)
+    with patch("v1.cache.time.monotonic", return_value=100):
+        cache.set("key", {"files": []})
+        assert cache.get("key") == {"files": []}
+
+    with patch("v1.cache.time.monotonic", return_value=131):
+        assert cache.get("key") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test the least recently used entry is evicted when full"""
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_listing_cache_settles_after_invalidation():
+    """Test listings are not cached right after a write"""
+    cache = ListingCache(maxsize=10, ttl=30, settle=5)
+    with patch("v1.cache.time.monotonic", return_value=100):
+        cache.set("key", {"files": []})
+        cache.invalidate()
+        cache.set("key", {"files": []})
+        assert cache.get("key") is None
+
+    with patch("v1.cache.time.monotonic", return_value=106):
+        cache.set("key", {"files": []})
+        assert cache.get("key") == {"files": []}
+
+
+@patch("v1.upstream.upstream.get")
+def test_listing_served_from_cache(mock_get, client):
+    """Test a repeated listing does not call API Gateway again"""
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"files": [],
+                                               "next_cursor": None}
+
+    first = client.get("/api/v1/file-metadata")
+    second = client.get("/api/v1/file-metadata")
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_json() == first.get_json()
+    assert mock_get.call_count == 1
+
+    stats = client.get("/api/v1/file-metadata/cache-stats").get_json()
+    assert stats == {"hits": 1, "misses": 1, "size": 1}
+
+
+@patch("v1.upstream.upstream.get")
+def test_listing_errors_not_cached(mock_get, client):
+    """Test failed listings are fetched again"""
+    mock_get.return_value.status_code = 500
+    mock_get.return_value.text = "Internal Server Error"
+
+    client.get("/api/v1/search-files?search=report")
+    client.get("/api/v1/search-files?search=report")
+
+    assert mock_get.call_count == 2
+
+
+@patch("v1.upstream.upstream.delete")
+@patch("v1.upstream.upstream.get")
+def test_delete_invalidates_listings(mock_get, mock_delete, client):
+    """Test a successful delete drops cached listings"""
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"files": [],
+                                               "next_cursor": None}
+    mock_delete.return_value.status_code = 200
+    mock_delete.return_value.json.return_value = {"message": "deleted"}
+
+    client.get("/api/v1/file-metadata")
+    client.delete("/api/v1/delete?file_key=text-files/report.txt")
+
+    assert listing_cache.stats()["size"] == 0
+    response = client.get("/api/v1/file-metadata")
+    assert response.headers["X-Cache"] == "MISS"
+    assert mock_get.call_count == 2
+
+
+@patch("v1.upstream.upstream.get")
+def test_listing_not_modified(mock_get, client):
+    """Test a current If-None-Match gets an empty 304"""
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"files": [],
+                                               "next_cursor": None}
+
+    first = client.get("/api/v1/file-metadata")
+    etag = first.headers["ETag"]
+    second = client.get("/api/v1/file-metadata",
+                        headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert second.status_code == 304
+    assert second.data == b""
+    assert second.headers["ETag"] == etag
+    assert mock_get.call_count == 1
+
+
+@patch("v1.upstream.upstream.get")
+def test_listing_modified(mock_get, client):
+    """Test a stale If-None-Match gets the full listing"""
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"files": ["a.txt"],
+                                               "next_cursor": None}
+
+    response = client.get("/api/v1/file-metadata",
+                          headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.get_json()["files"] == ["a.txt"]
+
+
+@patch("v1.upstream.upstream.get")
+def test_listing_not_modified_upstream(mock_get, client):
+    """Test a 304 from API Gateway is passed on without caching it"""
+    mock_get.return_value.status_code = 304
+    mock_get.return_value.headers = {"ETag": '"abc"'}
+
+    response = client.get("/api/v1/search-files?search=report",
+                          headers={"If-None-Match": '"abc"'})
+
+    assert response.status_code == 304
+    assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+    assert listing_cache.stats()["size"] == 0
+
+
+@patch("v1.upstream.upstream.get")
+def test_search_narrowed_from_cached_prefix(mock_get, client):
+    """Test a longer search is filtered from a complete shorter one"""
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {
+        "files": [{"file_name": "Report.pdf"}, {"file_name": "repo.zip"}],
+        "next_cursor": None
+    }
+
+    client.get("/api/v1/search-files?search=rep")
+    response = client.get("/api/v1/search-files?search=repor")
+
+    assert response.headers["X-Cache"] == "PREFIX"
+    assert response.get_json()["files"] == [{"file_name": "Report.pdf"}]
+    assert mock_get.call_count == 1
+
+    again = client.get("/api/v1/search-files?search=repor")
+    assert again.headers["X-Cache"] == "HIT"
+
+
+@patch("v1.upstream.upstream.get")
+def test_search_not_narrowed_from_partial_prefix(mock_get, client):
+    """Test a prefix with more pages is not used to answer a search"""
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {
+        "files": [{"file_name": "report.pdf"}],
+        "next_cursor": "abc"
+    }
+
+    client.get("/api/v1/search-files?search=rep")
+    response = client.get("/api/v1/search-files?search=repor")
+
+    assert response.headers["X-Cache"] == "MISS"
+    assert mock_get.call_count == 2
@@ -34,11 +34,17 @@ def setup_dynamodb():
     dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
     table = dynamodb.create_table(
         TableName=Config.DOCUMENTS_DYNAMODB_TABLE_NAME,
-        KeySchema=[{"AttributeName": "file_name", "KeyType": "HASH"}],
+        KeySchema=[{"AttributeName": "DocumentId", "KeyType": "HASH"}],
         AttributeDefinitions=[
+            {"AttributeName": "DocumentId", "AttributeType": "S"},
             {"AttributeName": "file_name", "AttributeType": "S"}
         ],
-        ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
+        GlobalSecondaryIndexes=[{
+            "IndexName": Config.DOCUMENTS_FILE_NAME_INDEX,
+            "KeySchema": [{"AttributeName": "file_name", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "KEYS_ONLY"}
+        }],
+        BillingMode="PAY_PER_REQUEST"
     )
     return table
 
@@ -53,7 +59,10 @@ def test_check_file_exists(client: FlaskClient):
 
     # Insert a file entry into the table
     test_file_name = "test_document.txt"
-    table.put_item(Item={"file_name": secure_filename(test_file_name)})
+    table.put_item(Item={
+        "DocumentId": "doc-1",
+        "file_name": secure_filename(test_file_name)
+    })
 
     response = client.post(
         "/api/v1/upload/check-file-exists",
@@ -82,6 +91,38 @@ def test_check_file_not_exists(client: FlaskClient):
     assert response.json["exists"] is False
 
 
+@mock_aws
+def test_check_file_exists_among_many(client: FlaskClient):
+    """Test the lookup only matches the exact file name"""
+    table = setup_dynamodb()
+
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    with table.batch_writer() as batch:
+        for i in range(50):
+            batch.put_item(Item={
+                "DocumentId": f"doc-{i}",
+                "file_name": f"report_{i}.txt"
+            })
+
+    response = client.post(
+        "/api/v1/upload/check-file-exists",
+        data=json.dumps({"fileName": "report_42.txt"}),
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    assert response.json["exists"] is True
+
+    response = client.post(
+        "/api/v1/upload/check-file-exists",
+        data=json.dumps({"fileName": "report_420.txt"}),
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    assert response.json["exists"] is False
+
+
 @mock_aws
 def test_check_file_unauthorized(client: FlaskClient):
     """Test case for unauthorized access to the endpoint"""
@@ -8,8 +8,9 @@ from v1.cognito import (register_user,
                         confirm_user,
                         resend_verification_code,
                         login_user,
-                        email_exists,
-                        delete_user)
+                        delete_user,
+                        is_known_email,
+                        warm_known_emails)
 from v1.config import Config
 from unittest.mock import MagicMock, patch
 
@@ -64,7 +65,11 @@ def test_register_user_existing(cognito_client):
         "SecurePass123!"
     )
     assert response["Success"] is False
+    assert response["exists"] is True
     assert "message" in response
+    assert is_known_email("testuser@example.com")
+    # the pool is case sensitive, so another casing is another account
+    assert not is_known_email("TestUser@example.com")
 
 
 @mock_aws
@@ -252,41 +257,6 @@ def test_login_user_missing_credentials(cognito_client):
     assert "message" in response
 
 
-@mock_aws
-def test_email_exists_true(cognito_client):
-    """Test email_exists returns True when the email is registered"""
-    cognito_client.sign_up(
-        ClientId=Config.AWS_COGNITO_CLIENT_ID,
-        Username="testuser@example.com",
-        Password="SecurePass123!",
-        UserAttributes=[{"Name": "email", "Value": "testuser@example.com"}]
-    )
-    assert email_exists("testuser@example.com") is True
-
-
-@mock_aws
-def test_email_exists_false(cognito_client):
-    """Test email_exists returns False when the email is not registered"""
-    assert email_exists("nonexistent@example.com") is False
-
-
-@mock_aws
-@patch("v1.cognito.cognito_client.list_users")
-def test_email_exists_error(mock_list_users, cognito_client):
-    """Test email_exists handles Cognito API errors gracefully"""
-    mock_list_users.side_effect = ClientError(
-        {
-            "Error": {
-                "Code": "InternalError",
-                "Message": "Internal server error"
-            }
-        },
-        "list_users"
-    )
-
-    assert email_exists("testuser@example.com") is False
-
-
 @mock_aws
 def test_delete_user_success(cognito_client):
     """Test successful user deletion from Cognito and DynamoDB"""
@@ -353,9 +323,9 @@ def test_delete_user_cognito_internal_error(mock_delete_user, cognito_client):
 
 @mock_aws
 @patch("v1.cognito.cognito_client.delete_user")
-@patch("v1.cognito.boto3.resource")
+@patch("v1.cognito.get_resource")
 def test_delete_user_dynamodb_not_found(
-    mock_boto3_resource,
+    mock_get_resource,
     mock_delete_user,
     cognito_client
 ):
@@ -366,7 +336,7 @@ def test_delete_user_dynamodb_not_found(
     mock_table = MagicMock()
     mock_table.delete_item.return_value = {}
     mock_dynamodb.Table.return_value = mock_table
-    mock_boto3_resource.return_value = mock_dynamodb
+    mock_get_resource.return_value = mock_dynamodb
 
     with patch("v1.cognito.session", {"email": "nonexistent@example.com"}):
         response = delete_user("valid-access-token")
@@ -430,3 +400,26 @@ def test_delete_user_not_found(mock_delete_user, cognito_client):
     response = delete_user("valid-access-token")
     assert response["Success"] is False
     assert "message" in response
+
+
+@mock_aws
+def test_warm_known_emails():
+    """Test registered emails are loaded from the userdata table"""
+    if Config.USERDATA_DYNAMODB_TABLE_NAME is None:
+        Config.USERDATA_DYNAMODB_TABLE_NAME = "test-userdata-table"
+
+    dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+    table = dynamodb.create_table(
+        TableName=Config.USERDATA_DYNAMODB_TABLE_NAME,
+        KeySchema=[{"AttributeName": "UserId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "UserId", "AttributeType": "S"}
+        ],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    table.put_item(Item={"UserId": "alice@example.com"})
+    table.put_item(Item={"UserId": "bob@example.com"})
+
+    assert warm_known_emails() == 2
+    assert is_known_email("alice@example.com")
+    assert not is_known_email("carol@example.com")
@@ -33,7 +33,7 @@ def test_delete_file_missing_file_key(client: FlaskClient):
     assert response.get_json()["error"] == "Missing file_key parameter"
 
 
-@patch("requests.delete")
+@patch("v1.upstream.upstream.delete")
 def test_delete_file_success(mock_delete, client: FlaskClient):
     """Test successful file deletion returns 200 OK"""
     with client.session_transaction() as session:
@@ -60,7 +60,7 @@ def test_delete_file_invalid_file_key(client: FlaskClient):
     assert "Invalid file key" in response.get_json()["error"]
 
 
-@patch("requests.delete")
+@patch("v1.upstream.upstream.delete")
 def test_delete_file_not_found(mock_delete, client: FlaskClient):
     """Test deleting non-existent file"""
     with client.session_transaction() as session:
@@ -75,7 +75,7 @@ def test_delete_file_not_found(mock_delete, client: FlaskClient):
     assert response.get_json()["error"] == "File not found"
 
 
-@patch("requests.delete")
+@patch("v1.upstream.upstream.delete")
 def test_delete_file_forbidden(mock_delete, client: FlaskClient):
     """Test deleting file without proper permissions"""
     with client.session_transaction() as session:
@@ -90,7 +90,7 @@ def test_delete_file_forbidden(mock_delete, client: FlaskClient):
     assert response.get_json()["error"] == "Access denied"
 
 
-@patch("requests.delete")
+@patch("v1.upstream.upstream.delete")
 def test_delete_file_api_failure(mock_delete, client: FlaskClient):
     """Test file deletion failure due to API error"""
     with client.session_transaction() as session:
@@ -106,7 +106,7 @@ def test_delete_file_api_failure(mock_delete, client: FlaskClient):
     assert response.get_json()["error"] == "Internal Server Error"
 
 
-@patch("requests.delete",
+@patch("v1.upstream.upstream.delete",
        side_effect=requests.RequestException("Network failure"))
 def test_delete_file_network_error(mock_delete, client: FlaskClient):
     """Test file deletion failure due to network error"""
@@ -117,3 +117,16 @@ def test_delete_file_network_error(mock_delete, client: FlaskClient):
     response = client.delete("/api/v1/delete?file_key=testfile.txt")
     assert response.status_code == 500
     assert "Network error" in response.get_json()["error"]
+
+
+@patch("v1.upstream.upstream.delete",
+       side_effect=requests.Timeout("Read timed out"))
+def test_delete_timeout(mock_delete, client):
+    """Test file deletion failure due to an upstream timeout"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+        session["id_token"] = "mock_token"
+
+    response = client.delete("/api/v1/delete?file_key=testfile.txt")
+    assert response.status_code == 504
+    assert response.get_json()["error"] == "Upstream request timed out"
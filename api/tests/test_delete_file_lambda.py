@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+
+import os
+import json
+import boto3
+import pytest
+from moto import mock_aws
+from unittest.mock import patch
+
+os.environ.setdefault("S3_BUCKET_NAME", "test-bucket")
+os.environ.setdefault("DYNAMODB_TABLE_NAME", "test-docs")
+delete_file_lambda = pytest.importorskip("delete_file_lambda")
+
+
+class PagedTable:
+    """documents table whose queries return `page_size` items at a time"""
+
+    def __init__(self, table, page_size):
+        self.table = table
+        self.page_size = page_size
+        self.queries = 0
+
+    def query(self, **kwargs):
+        self.queries += 1
+        return self.table.query(Limit=self.page_size, **kwargs)
+
+    def delete_item(self, **kwargs):
+        return self.table.delete_item(**kwargs)
+
+
+@pytest.fixture
+def documents():
+    """a moto documents table the lambda deletes from, queried two rows
+    at a time"""
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-west-2")
+        s3.create_bucket(
+            Bucket=delete_file_lambda.BUCKET_NAME,
+            CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+        )
+        dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+        table = dynamodb.create_table(
+            TableName=delete_file_lambda.TABLE_NAME,
+            KeySchema=[{"AttributeName": "DocumentId", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "DocumentId", "AttributeType": "S"},
+                {"AttributeName": "file_key", "AttributeType": "S"}
+            ],
+            GlobalSecondaryIndexes=[{
+                "IndexName": "FileKeyIndex",
+                "KeySchema": [{"AttributeName": "file_key",
+                               "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "KEYS_ONLY"}
+            }],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        paged = PagedTable(table, page_size=2)
+        with patch.object(delete_file_lambda, "s3", s3), \
+                patch.object(delete_file_lambda.dynamodb, "Table",
+                             return_value=paged):
+            yield paged
+
+
+def delete(file_key):
+    return delete_file_lambda.lambda_handler(
+        {"queryStringParameters": {"file_key": file_key}}, None)
+
+
+def test_delete_removes_every_matching_row(documents):
+    """Test every row of the key is deleted across query pages, and rows
+    of other keys are kept"""
+    for i in range(5):
+        documents.table.put_item(Item={"DocumentId": f"report-{i}",
+                                       "file_key": "text-files/report.txt"})
+    documents.table.put_item(Item={"DocumentId": "other",
+                                   "file_key": "text-files/other.txt"})
+
+    response = delete("text-files/report.txt")
+
+    assert response["statusCode"] == 200
+    assert documents.queries == 3
+    assert [item["DocumentId"] for item in documents.table.scan()["Items"]] \
+        == ["other"]
+
+
+def test_delete_without_matching_rows(documents):
+    """Test deleting a key with no documents row still succeeds"""
+    documents.table.put_item(Item={"DocumentId": "other",
+                                   "file_key": "text-files/other.txt"})
+
+    response = delete("text-files/missing.txt")
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["message"] == \
+        "File deleted successfully"
+    assert documents.queries == 1
+    assert len(documents.table.scan()["Items"]) == 1
+
+
+def test_delete_missing_file_key(documents):
+    """Test a request without a file_key is rejected"""
+    response = delete_file_lambda.lambda_handler(
+        {"queryStringParameters": {}}, None)
+
+    assert response["statusCode"] == 400
+    assert documents.queries == 0
@@ -105,3 +105,90 @@ def test_download_file_unexpected_error(mock_aws, client):
     response = client.get("/api/v1/download?file_key=documents/testfile.txt")
     assert response.status_code == 500
     assert response.get_json()["error"] == "An unexpected error occured"
+
+
+@patch("v1.routes.download.get_client")
+def test_download_file_reuses_presigned_url(mock_client, client):
+    """Test a repeated download reuses the URL without calling S3"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = mock_client.return_value
+    s3.generate_presigned_url.return_value = "https://signed-url"
+
+    first = client.get("/api/v1/download?file_key=documents/testfile.txt")
+    second = client.get("/api/v1/download?file_key=documents/testfile.txt")
+
+    assert first.get_json() == second.get_json() == {
+        "presigned_url": "https://signed-url"
+    }
+    s3.head_object.assert_called_once()
+    s3.generate_presigned_url.assert_called_once()
+
+
+@patch("v1.routes.download.get_client")
+def test_download_file_resigns_near_expiry(mock_client, client):
+    """Test a URL close to expiry is not reused"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = mock_client.return_value
+    s3.generate_presigned_url.return_value = "https://signed-url"
+    url = "/api/v1/download?file_key=documents/testfile.txt"
+
+    with patch("v1.routes.download.time.time", return_value=1000):
+        client.get(url)
+    expiry = 1000 + Config.DOWNLOAD_URL_EXPIRES_IN
+    with patch("v1.routes.download.time.time",
+               return_value=expiry - Config.DOWNLOAD_URL_REUSE_MARGIN):
+        client.get(url)
+
+    assert s3.generate_presigned_url.call_count == 2
+
+
+@patch("v1.upstream.upstream.delete")
+@patch("v1.routes.download.get_client")
+def test_download_file_url_dropped_on_delete(mock_client, mock_delete,
+                                             client):
+    """Test deleting a file drops its cached download URLs"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = mock_client.return_value
+    s3.generate_presigned_url.return_value = "https://signed-url"
+    mock_delete.return_value.status_code = 200
+    mock_delete.return_value.json.return_value = {"message": "deleted"}
+
+    client.get("/api/v1/download?file_key=documents/testfile.txt")
+    client.delete("/api/v1/delete?file_key=documents/testfile.txt")
+    client.get("/api/v1/download?file_key=documents/testfile.txt")
+
+    assert s3.head_object.call_count == 2
+
+
+@patch("v1.upstream.upstream.delete")
+@patch("v1.routes.download.get_client")
+def test_download_file_urls_kept_per_user(mock_client, mock_delete,
+                                          client):
+    """Test each user's URL is its own entry, and a delete drops them all"""
+    s3 = mock_client.return_value
+    s3.generate_presigned_url.side_effect = ["https://alice", "https://bob",
+                                             "https://alice-2"]
+    mock_delete.return_value.status_code = 200
+    mock_delete.return_value.json.return_value = {"message": "deleted"}
+    url = "/api/v1/download?file_key=documents/testfile.txt"
+
+    def download_as(email):
+        with client.session_transaction() as session:
+            session["email"] = email
+        return client.get(url).get_json()["presigned_url"]
+
+    assert download_as("alice@example.com") == "https://alice"
+    assert download_as("bob@example.com") == "https://bob"
+    assert download_as("alice@example.com") == "https://alice"
+    assert s3.generate_presigned_url.call_count == 2
+
+    client.delete("/api/v1/delete?file_key=documents/testfile.txt")
+
+    assert download_as("alice@example.com") == "https://alice-2"
+    assert s3.generate_presigned_url.call_count == 3
@@ -4,6 +4,7 @@ import pytest
 import requests
 from unittest.mock import patch
 from v1.app import app
+from v1.config import Config
 
 
 @pytest.fixture
@@ -21,7 +22,7 @@ def test_file_metadata_unauthorized(client):
     assert response.get_json()["error"] == "Unauthorized"
 
 
-@patch("requests.get")
+@patch("v1.upstream.upstream.get")
 def test_file_metadata_success(mock_get, client):
     """Test successful metadata retrieval"""
     with client.session_transaction() as session:
@@ -37,7 +38,42 @@ def test_file_metadata_success(mock_get, client):
     assert response.get_json() == {"files": ["file1.txt", "file2.txt"]}
 
 
-@patch("requests.get")
+@patch("v1.upstream.upstream.get")
+def test_file_metadata_cursor(mock_get, client):
+    """Test the cursor is forwarded and the next cursor returned"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+        session["id_token"] = "mock_token"
+
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"files": ["file3.txt"],
+                                               "next_cursor": "page-3"}
+
+    response = client.get("/api/v1/file-metadata?cursor=page-2")
+    assert response.status_code == 200
+    assert response.get_json()["next_cursor"] == "page-3"
+    assert mock_get.call_args.kwargs["params"] == {"limit": 15,
+                                                   "cursor": "page-2"}
+
+
+@patch("v1.upstream.upstream.get")
+def test_file_metadata_own_files(mock_get, client):
+    """Test scope=mine is forwarded to list only the user's files"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+        session["id_token"] = "mock_token"
+
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"files": ["file1.txt"],
+                                               "next_cursor": None}
+
+    response = client.get("/api/v1/file-metadata?scope=mine")
+    assert response.status_code == 200
+    assert mock_get.call_args.kwargs["params"] == {"limit": 15,
+                                                   "scope": "mine"}
+
+
+@patch("v1.upstream.upstream.get")
 def test_file_metadata_api_failure(mock_get, client):
     """Test metadata retrieval failure due to API error"""
     with client.session_transaction() as session:
@@ -53,7 +89,7 @@ def test_file_metadata_api_failure(mock_get, client):
         "Failed to fetch files: Internal Server Error"
 
 
-@patch("requests.get",
+@patch("v1.upstream.upstream.get",
        side_effect=requests.RequestException("Network failure"))
 def test_file_metadata_network_error(mock_get, client):
     """Test metadata retrieval failure due to network error"""
@@ -64,3 +100,57 @@ def test_file_metadata_network_error(mock_get, client):
     response = client.get("/api/v1/file-metadata")
     assert response.status_code == 500
     assert response.get_json()["error"] == "Network error: Network failure"
+
+
+@patch("v1.upstream.upstream.get",
+       side_effect=requests.Timeout("Read timed out"))
+def test_file_metadata_timeout(mock_get, client):
+    """Test metadata retrieval failure due to an upstream timeout"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+        session["id_token"] = "mock_token"
+
+    response = client.get("/api/v1/file-metadata")
+    assert response.status_code == 504
+    assert response.get_json()["error"] == "Upstream request timed out"
+
+
+@patch.object(Config, "METADATA_BACKEND", "direct")
+@patch("v1.upstream.upstream.get")
+@patch("v1.metadata_backend.get_resource")
+def test_file_metadata_direct_backend(mock_resource, mock_get, client):
+    """Test the direct backend queries DynamoDB without API Gateway"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+        session["id_token"] = "mock_token"
+
+    table = mock_resource.return_value.Table.return_value
+    table.query.return_value = {"Items": [{
+        "DocumentId": "doc-1",
+        "record_type": "document",
+        "file_name": "file1.txt",
+        "file_key": "text-files/file1.txt",
+        "upload_timestamp": "2025-01-01T00:00:00.000000+00:00",
+        "owner": "testuser@example.com"
+    }]}
+
+    response = client.get("/api/v1/file-metadata?scope=mine")
+    assert response.status_code == 200
+    assert response.get_json()["files"][0]["file_name"] == "file1.txt"
+    assert response.get_json()["next_cursor"] is None
+    assert table.query.call_args.kwargs["IndexName"] == \
+        Config.DOCUMENTS_OWNER_INDEX
+    mock_get.assert_not_called()
+
+
+@patch.object(Config, "METADATA_BACKEND", "direct")
+@patch("v1.metadata_backend.get_resource")
+def test_file_metadata_direct_backend_invalid_cursor(mock_resource, client):
+    """Test the direct backend rejects cursors it did not issue"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+        session["id_token"] = "mock_token"
+
+    response = client.get("/api/v1/file-metadata?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid cursor"
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import json
+import pytest
+from moto import mock_aws
+from unittest.mock import patch
+import v1.metadata_query
+from v1.metadata_query import MetadataQuery
+from test_metadata_query import add_document, create_documents_table
+
+os.environ.setdefault("DYNAMODB_TABLE_NAME", "test-documents")
+# metadata_query.py is packaged next to the lambda in its deployment zip
+sys.modules.setdefault("metadata_query", v1.metadata_query)
+file_metadata_lambda = pytest.importorskip("file_metadata_lambda")
+
+
+@pytest.fixture
+def documents():
+    """the lambda reading a table of ten documents, alternately owned by
+    bob and alice"""
+    with mock_aws():
+        table = create_documents_table()
+        for index in range(10):
+            owner = "alice@example.com" if index % 2 else "bob@example.com"
+            add_document(table, index, owner)
+        with patch.object(file_metadata_lambda, "metadata",
+                          MetadataQuery(table)):
+            yield table
+
+
+def fetch(params, claims=None):
+    event = {"queryStringParameters": params}
+    if claims is not None:
+        event["requestContext"] = {"authorizer": {"claims": claims}}
+    response = file_metadata_lambda.lambda_handler(event, None)
+    body = json.loads(response["body"]) if response["body"] else None
+    return response["statusCode"], body
+
+
+def file_names(body):
+    return [file["file_name"] for file in body["files"]]
+
+
+def test_pages_newest_first_until_last_page(documents):
+    """Test cursors walk the listing newest first, and the last page has
+    no next_cursor"""
+    pages = []
+    params = {"limit": "4"}
+    while True:
+        status, body = fetch(params)
+        assert status == 200
+        pages.append(file_names(body))
+        if body["next_cursor"] is None:
+            break
+        params = {"limit": "4", "cursor": body["next_cursor"]}
+
+    assert pages == [
+        ["Report_9.txt", "Report_8.txt", "Report_7.txt", "Report_6.txt"],
+        ["Report_5.txt", "Report_4.txt", "Report_3.txt", "Report_2.txt"],
+        ["Report_1.txt", "Report_0.txt"]
+    ]
+
+
+def test_invalid_cursor(documents):
+    """Test a garbled or foreign cursor is rejected with a 400"""
+    _, body = fetch({"limit": "2"})
+    foreign = body["next_cursor"]
+
+    for cursor in ["not-a-cursor", "%%%", foreign[:-4]]:
+        status, body = fetch({"limit": "2", "cursor": cursor})
+        assert status == 400
+        assert body == {"error": "Invalid cursor"}
+
+    status, body = fetch({"limit": "2", "cursor": foreign, "scope": "mine"},
+                         claims={"email": "alice@example.com"})
+    assert status == 400
+
+
+def test_scope_mine(documents):
+    """Test scope=mine lists the caller's files from the authorizer claims,
+    and is refused without them"""
+    status, body = fetch({"scope": "mine"},
+                         claims={"email": "alice@example.com"})
+    assert status == 200
+    assert file_names(body) == ["Report_9.txt", "Report_7.txt",
+                                "Report_5.txt", "Report_3.txt",
+                                "Report_1.txt"]
+    assert body["next_cursor"] is None
+
+    status, body = fetch({"scope": "mine"})
+    assert status == 403
@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+
+import boto3
+import pytest
+from moto import mock_aws
+from v1.metadata_query import (InvalidCursorError, MetadataQuery,
+                               RECORD_TYPE, encode_cursor)
+
+INFO_ATTRIBUTES = ["file_name", "file_key", "object_url", "size_bytes",
+                   "search_name"]
+
+
+def create_documents_table():
+    """Create the documents table with its listing indexes"""
+    dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+    return dynamodb.create_table(
+        TableName="test-documents",
+        KeySchema=[{"AttributeName": "DocumentId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "DocumentId", "AttributeType": "S"},
+            {"AttributeName": "record_type", "AttributeType": "S"},
+            {"AttributeName": "owner", "AttributeType": "S"},
+            {"AttributeName": "upload_timestamp", "AttributeType": "S"}
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "UploadTimestampIndex",
+                "KeySchema": [
+                    {"AttributeName": "record_type", "KeyType": "HASH"},
+                    {"AttributeName": "upload_timestamp", "KeyType": "RANGE"}
+                ],
+                "Projection": {
+                    "ProjectionType": "INCLUDE",
+                    "NonKeyAttributes": INFO_ATTRIBUTES + ["owner"]
+                }
+            },
+            {
+                "IndexName": "OwnerIndex",
+                "KeySchema": [
+                    {"AttributeName": "owner", "KeyType": "HASH"},
+                    {"AttributeName": "upload_timestamp", "KeyType": "RANGE"}
+                ],
+                "Projection": {
+                    "ProjectionType": "INCLUDE",
+                    "NonKeyAttributes": INFO_ATTRIBUTES
+                }
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST"
+    )
+
+
+def add_document(table, index, owner="alice@example.com"):
+    """Insert a document uploaded `index` minutes after midnight"""
+    file_name = f"Report_{index}.txt"
+    table.put_item(Item={
+        "DocumentId": f"doc-{index}",
+        "record_type": RECORD_TYPE,
+        "file_name": file_name,
+        "search_name": file_name.lower(),
+        "file_key": f"text-files/{file_name}",
+        "object_url": f"https://bucket.s3.amazonaws.com/{file_name}",
+        "upload_timestamp": f"2025-01-01T00:{index:02d}:00.000000+00:00",
+        "size_bytes": 1024,
+        "owner": owner
+    })
+
+
+@pytest.fixture
+def metadata():
+    """MetadataQuery over a table holding ten documents"""
+    with mock_aws():
+        table = create_documents_table()
+        for index in range(10):
+            owner = "alice@example.com" if index % 2 else "bob@example.com"
+            add_document(table, index, owner)
+        yield MetadataQuery(table)
+
+
+def test_list_files_newest_first(metadata):
+    """Test files are listed newest first with plain JSON types"""
+    listing = metadata.list_files()
+
+    assert [f["file_name"] for f in listing["files"]] == \
+        [f"Report_{i}.txt" for i in reversed(range(10))]
+    assert listing["files"][0]["size_bytes"] == 1024
+    assert isinstance(listing["files"][0]["size_bytes"], int)
+    assert listing["next_cursor"] is None
+
+
+def test_list_files_pages_with_cursor(metadata):
+    """Test a cursor resumes the listing after the previous page"""
+    first = metadata.list_files(limit=4)
+    second = metadata.list_files(limit=4, cursor=first["next_cursor"])
+
+    assert [f["file_name"] for f in first["files"]] == \
+        ["Report_9.txt", "Report_8.txt", "Report_7.txt", "Report_6.txt"]
+    assert [f["file_name"] for f in second["files"]] == \
+        ["Report_5.txt", "Report_4.txt", "Report_3.txt", "Report_2.txt"]
+
+
+def test_list_files_search_and_owner(metadata):
+    """Test search terms and owners narrow the listing"""
+    search = metadata.list_files(search_term="REPORT_3")
+    mine = metadata.list_files(owner="alice@example.com")
+
+    assert [f["file_name"] for f in search["files"]] == ["Report_3.txt"]
+    assert [f["file_name"] for f in mine["files"]] == \
+        ["Report_9.txt", "Report_7.txt", "Report_5.txt", "Report_3.txt",
+         "Report_1.txt"]
+
+
+def test_search_overshoot_cursor(metadata):
+    """Test a filtered page that overshoots resumes after its last file"""
+    first = metadata.list_files(search_term="report", limit=3)
+    second = metadata.list_files(search_term="report", limit=3,
+                                 cursor=first["next_cursor"])
+
+    assert [f["file_name"] for f in second["files"]] == \
+        ["Report_6.txt", "Report_5.txt", "Report_4.txt"]
+
+
+def test_cursor_rejected_for_other_listing(metadata):
+    """Test cursors only resume the listing that produced them"""
+    cursor = metadata.list_files(limit=2)["next_cursor"]
+
+    with pytest.raises(InvalidCursorError):
+        metadata.list_files(limit=2, cursor=cursor,
+                            owner="alice@example.com")
+    with pytest.raises(InvalidCursorError):
+        metadata.list_files(cursor="not-a-cursor")
+
+
+def test_encode_cursor_last_page():
+    """Test the last page has no cursor"""
+    assert encode_cursor(None) is None
+    assert encode_cursor({}) is None
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import boto3
+import pytest
+from moto import mock_aws
+
+sys.path.insert(0, os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "..", "scripts")))
+os.environ.setdefault("DYNAMODB_TABLE_NAME", "test-docs")
+migration = pytest.importorskip("migrate_document_ids")
+
+
+@pytest.fixture
+def table():
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+        yield dynamodb.create_table(
+            TableName="test-docs",
+            KeySchema=[{"AttributeName": "DocumentId", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "DocumentId", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST"
+        )
+
+
+def legacy(table, document_id, file_name, timestamp):
+    """a row as the lambda wrote it before ids were derived from keys"""
+    table.put_item(Item={
+        "DocumentId": document_id,
+        "file_name": file_name,
+        "file_key": f"text-files/{file_name}",
+        "upload_timestamp": timestamp,
+        "size_bytes": int(timestamp[-1])
+    })
+
+
+def rows_by_key(table):
+    return {row["file_key"]: row for row in table.scan()["Items"]}
+
+
+def test_migrate_legacy_rows(table):
+    """Test legacy rows move to their derived ids, one row per key, the
+    newest legacy row winning and rows the lambda wrote being kept"""
+    legacy(table, "legacy-a1", "a.txt", "2025-01-01T00:00:01")
+    legacy(table, "legacy-a2", "a.txt", "2025-01-01T00:00:02")
+    legacy(table, "legacy-b", "b.txt", "2025-01-01T00:00:03")
+    legacy(table, "legacy-c", "c.txt", "2025-01-01T00:00:04")
+    table.put_item(Item={
+        "DocumentId": migration.document_id_for("text-files/c.txt"),
+        "file_key": "text-files/c.txt",
+        "upload_timestamp": "2025-01-02T00:00:00",
+        "s3_sequencer": "0A",
+        "size_bytes": 9
+    })
+
+    report = migration.migrate(table)
+
+    rows = rows_by_key(table)
+    assert len(table.scan()["Items"]) == len(rows) == 3
+    for file_key, row in rows.items():
+        assert row["DocumentId"] == migration.document_id_for(file_key)
+    assert rows["text-files/a.txt"]["size_bytes"] == 2
+    assert rows["text-files/a.txt"]["record_type"] == "document"
+    assert rows["text-files/a.txt"]["search_name"] == "a.txt"
+    # an empty sequencer lets the lambda's next write replace the copy
+    assert rows["text-files/a.txt"]["s3_sequencer"] == ""
+    assert rows["text-files/c.txt"]["size_bytes"] == 9
+    assert report["copied"] + report["superseded"] == 4
+    assert report["superseded"] >= 1
+
+    assert migration.migrate(table) == {"copied": 0, "superseded": 0}
+
+
+def test_migrate_dry_run(table):
+    """Test a dry run lists legacy rows without writing"""
+    legacy(table, "legacy-a", "a.txt", "2025-01-01T00:00:01")
+
+    assert migration.migrate(table, dry_run=True)["copied"] == 1
+    assert [row["DocumentId"] for row in table.scan()["Items"]] == \
+        ["legacy-a"]
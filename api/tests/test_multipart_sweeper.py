@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+import boto3
+import pytest
+from datetime import timedelta
+from moto import mock_aws
+from unittest.mock import patch
+from botocore.exceptions import ClientError
+from v1.multipart_sweeper import sweep_multipart_uploads
+
+BUCKET = "sweeper-bucket"
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-west-2")
+        s3.create_bucket(
+            Bucket=BUCKET,
+            CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+        )
+        yield s3
+
+
+def start_upload(s3, key, part_sizes):
+    upload_id = s3.create_multipart_upload(Bucket=BUCKET,
+                                           Key=key)["UploadId"]
+    for part_number, size in enumerate(part_sizes, start=1):
+        s3.upload_part(Bucket=BUCKET, Key=key, UploadId=upload_id,
+                       PartNumber=part_number, Body=b"x" * size)
+    return upload_id
+
+
+def initiated(s3):
+    """when the listed uploads were started, as reported by S3"""
+    return s3.list_multipart_uploads(Bucket=BUCKET)["Uploads"][0]["Initiated"]
+
+
+def test_sweep_aborts_old_uploads(s3):
+    """Test uploads older than the max age are aborted and measured"""
+    start_upload(s3, "text-files/a.txt", [10, 20])
+    start_upload(s3, "text-files/b.txt", [5])
+
+    report = sweep_multipart_uploads(
+        s3, BUCKET, timedelta(hours=48),
+        now=initiated(s3) + timedelta(hours=49)
+    )
+
+    assert report == {"aborted": 2, "failed": 0, "bytes_reclaimed": 35}
+    assert "Uploads" not in s3.list_multipart_uploads(Bucket=BUCKET)
+
+
+def test_sweep_keeps_recent_uploads(s3):
+    """Test uploads younger than the max age are left alone"""
+    start_upload(s3, "text-files/a.txt", [10])
+
+    report = sweep_multipart_uploads(s3, BUCKET, timedelta(hours=48),
+                                     now=initiated(s3) + timedelta(hours=1))
+
+    assert report == {"aborted": 0, "failed": 0, "bytes_reclaimed": 0}
+    assert len(s3.list_multipart_uploads(Bucket=BUCKET)["Uploads"]) == 1
+
+
+def test_sweep_pages_through_uploads(s3):
+    """Test every page of list_multipart_uploads is swept"""
+    for i in range(5):
+        start_upload(s3, f"text-files/{i}.txt", [1])
+    now = initiated(s3) + timedelta(seconds=1)
+    uploads = s3.list_multipart_uploads(Bucket=BUCKET)["Uploads"]
+    markers = []
+
+    # moto ignores MaxUploads, so serve the listing two uploads a page
+    def list_page(Bucket, KeyMarker=None, UploadIdMarker=None):
+        markers.append(KeyMarker)
+        start = 0 if KeyMarker is None else \
+            [upload["Key"] for upload in uploads].index(KeyMarker) + 1
+        page = uploads[start:start + 2]
+        return {
+            "Uploads": page,
+            "IsTruncated": start + 2 < len(uploads),
+            "NextKeyMarker": page[-1]["Key"],
+            "NextUploadIdMarker": page[-1]["UploadId"]
+        }
+
+    with patch.object(s3, "list_multipart_uploads", list_page):
+        report = sweep_multipart_uploads(s3, BUCKET, timedelta(0), now=now)
+
+    assert markers == [None, "text-files/1.txt", "text-files/3.txt"]
+    assert report["aborted"] == 5
+    assert report["bytes_reclaimed"] == 5
+
+
+def test_sweep_counts_failures(s3):
+    """Test an upload that cannot be aborted is reported as failed"""
+    start_upload(s3, "text-files/a.txt", [10])
+    now = initiated(s3) + timedelta(seconds=1)
+    error = ClientError({"Error": {"Code": "AccessDenied"}},
+                        "AbortMultipartUpload")
+
+    with patch.object(s3, "abort_multipart_upload", side_effect=error):
+        report = sweep_multipart_uploads(s3, BUCKET, timedelta(0), now=now)
+
+    assert report == {"aborted": 0, "failed": 1, "bytes_reclaimed": 0}
@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+import boto3
+import pytest
+from moto import mock_aws
+from unittest.mock import MagicMock, patch
+from botocore.exceptions import ClientError
+from v1.cache import invalidate_file, object_info_cache
+from v1.config import Config
+from v1.object_info import object_info
+
+
+def not_found():
+    return ClientError({"Error": {"Code": "404", "Message": "Not Found"}},
+                       "HeadObject")
+
+
+@pytest.fixture
+def s3():
+    """S3 client double answering head_object for one object"""
+    s3 = MagicMock()
+    s3.head_object.return_value = {
+        "ContentLength": 1024,
+        "ETag": '"abc123"',
+        "ContentType": "text/plain"
+    }
+    return s3
+
+
+def test_object_info_cached(s3):
+    """Test head_object results are cached"""
+    first = object_info(s3, "bucket", "text-files/a.txt")
+    second = object_info(s3, "bucket", "text-files/a.txt")
+
+    assert first == second == {
+        "exists": True,
+        "size_bytes": 1024,
+        "etag": '"abc123"',
+        "content_type": "text/plain"
+    }
+    s3.head_object.assert_called_once()
+
+
+def test_object_info_negative_entries_expire_sooner(s3):
+    """Test missing objects are cached with the negative TTL"""
+    s3.head_object.side_effect = not_found()
+
+    with patch.object(object_info_cache, "set",
+                      wraps=object_info_cache.set) as mock_set:
+        assert object_info(s3, "bucket", "text-files/a.txt") is None
+        assert object_info(s3, "bucket", "text-files/a.txt") is None
+
+    mock_set.assert_called_once_with("text-files/a.txt", {"exists": False},
+                                     Config.OBJECT_INFO_NEGATIVE_TTL)
+    s3.head_object.assert_called_once()
+
+
+def test_object_info_invalidated(s3):
+    """Test an upload or delete drops the cached result"""
+    s3.head_object.side_effect = not_found()
+    object_info(s3, "bucket", "text-files/a.txt")
+
+    invalidate_file("text-files/a.txt")
+    s3.head_object.side_effect = None
+
+    assert object_info(s3, "bucket", "text-files/a.txt")["exists"] is True
+
+
+def test_object_info_errors_not_cached(s3):
+    """Test S3 errors other than 404 are raised and not cached"""
+    s3.head_object.side_effect = ClientError(
+        {"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject")
+
+    with pytest.raises(ClientError):
+        object_info(s3, "bucket", "text-files/a.txt")
+    assert object_info_cache.get("text-files/a.txt") is None
+
+
+@mock_aws
+@patch.object(Config, "OBJECT_INFO_SOURCE", "documents")
+def test_object_info_from_documents_table(s3):
+    """Test existence can be answered from the documents table"""
+    dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+    table = dynamodb.create_table(
+        TableName=Config.DOCUMENTS_DYNAMODB_TABLE_NAME,
+        KeySchema=[{"AttributeName": "DocumentId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "DocumentId", "AttributeType": "S"},
+            {"AttributeName": "file_key", "AttributeType": "S"}
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": Config.DOCUMENTS_FILE_KEY_INDEX,
+            "KeySchema": [{"AttributeName": "file_key", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "KEYS_ONLY"}
+        }],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    table.put_item(Item={"DocumentId": "doc-1",
+                         "file_key": "text-files/a.txt"})
+
+    assert object_info(s3, "bucket", "text-files/a.txt") == {"exists": True}
+    assert object_info(s3, "bucket", "text-files/b.txt") is None
+    s3.head_object.assert_not_called()
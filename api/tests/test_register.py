@@ -21,7 +21,7 @@ def test_register_get(client: FlaskClient):
     assert b"Create Your Account" in response.data
 
 
-@patch("v1.routes.register.email_exists", return_value=False)
+@patch("v1.routes.register.is_known_email", return_value=False)
 @patch("v1.routes.register.register_user", return_value={"Success": True})
 def test_register_post_success(
     mock_register_user,
@@ -41,7 +41,7 @@ def test_register_post_success(
         assert session["verification_email"] == "test@example.com"
 
 
-@patch("v1.routes.register.email_exists", return_value=True)
+@patch("v1.routes.register.is_known_email", return_value=True)
 def test_register_post_email_exists(mock_email_exists, client: FlaskClient):
     """Test registration with existing email returns 409 status"""
     response = client.post("/api/v1/register", data={
@@ -53,7 +53,7 @@ def test_register_post_email_exists(mock_email_exists, client: FlaskClient):
     assert response.json == {"message": "User with email already exists."}
 
 
-@patch("v1.routes.register.email_exists", return_value=False)
+@patch("v1.routes.register.is_known_email", return_value=False)
 @patch("v1.routes.register.register_user", return_value={"Success": False})
 def test_register_post_failure(
     mock_register_user,
@@ -72,7 +72,7 @@ def test_register_post_failure(
     }
 
 
-@patch("v1.routes.register.email_exists", return_value=False)
+@patch("v1.routes.register.is_known_email", return_value=False)
 @patch("v1.routes.register.register_user",
        side_effect=Exception("Cognito error"))
 def test_register_post_server_error(
@@ -89,3 +89,22 @@ def test_register_post_server_error(
 
     assert response.status_code == 500
     assert response.json == {"message": "An error occured. Please try again."}
+
+
+@patch("v1.routes.register.is_known_email", return_value=False)
+@patch("v1.routes.register.register_user",
+       return_value={"Success": False, "exists": True,
+                     "message": "User already exists"})
+def test_register_post_email_taken_at_sign_up(
+    mock_register_user,
+    mock_is_known_email,
+    client: FlaskClient
+):
+    """Test an email sign_up reports as taken returns 409 status"""
+    response = client.post("/api/v1/register", data={
+        "email": "existing@example.com",
+        "username": "existinguser",
+        "password": "SecurePass123!"
+    })
+    assert response.status_code == 409
+    assert response.json == {"message": "User with email already exists."}
@@ -5,6 +5,7 @@ import pytest
 import requests
 from unittest.mock import patch
 from v1.app import app
+from v1.config import Config
 
 
 @pytest.fixture
@@ -33,7 +34,7 @@ def test_search_files_no_search_term(client: FlaskClient):
     assert response.get_json()["error"] == "Search term is required"
 
 
-@patch("requests.get")
+@patch("v1.upstream.upstream.get")
 def test_search_files_success(mock_get, client: FlaskClient):
     """Test successful file search returns results"""
     with client.session_transaction() as session:
@@ -49,7 +50,26 @@ def test_search_files_success(mock_get, client: FlaskClient):
     assert response.get_json() == {"files": ["file1.txt", "file2.txt"]}
 
 
-@patch("requests.get")
+@patch("v1.upstream.upstream.get")
+def test_search_files_cursor(mock_get, client: FlaskClient):
+    """Test the cursor is forwarded and the next cursor returned"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+        session["id_token"] = "mock_token"
+
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"files": ["file3.txt"],
+                                               "next_cursor": None}
+
+    response = client.get("/api/v1/search-files?search=file&cursor=page-2")
+    assert response.status_code == 200
+    assert response.get_json()["next_cursor"] is None
+    assert mock_get.call_args.kwargs["params"] == {
+        "search": "file", "limit": 30, "cursor": "page-2"
+    }
+
+
+@patch("v1.upstream.upstream.get")
 def test_search_files_api_failure(mock_get, client: FlaskClient):
     """Test search file failure due to API error"""
     with client.session_transaction() as session:
@@ -65,7 +85,7 @@ def test_search_files_api_failure(mock_get, client: FlaskClient):
         "failed to search files: Internal Server Error"
 
 
-@patch("requests.get",
+@patch("v1.upstream.upstream.get",
        side_effect=requests.RequestException("Network failure"))
 def test_search_files_network_error(mock_get, client: FlaskClient):
     """Test search file failure due to network error"""
@@ -76,3 +96,40 @@ def test_search_files_network_error(mock_get, client: FlaskClient):
     response = client.get("/api/v1/search-files?search=file")
     assert response.status_code == 500
     assert response.get_json()["error"] == "Network error: Network failure"
+
+
+@patch("v1.upstream.upstream.get",
+       side_effect=requests.Timeout("Read timed out"))
+def test_search_file_timeout(mock_get, client):
+    """Test search file failure due to an upstream timeout"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+        session["id_token"] = "mock_token"
+
+    response = client.get("/api/v1/search-files?search=file")
+    assert response.status_code == 504
+    assert response.get_json()["error"] == "Upstream request timed out"
+
+
+@patch.object(Config, "METADATA_BACKEND", "direct")
+@patch("v1.upstream.upstream.get")
+@patch("v1.metadata_backend.get_resource")
+def test_search_files_direct_backend(mock_resource, mock_get, client):
+    """Test the direct backend filters on the search term in DynamoDB"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+        session["id_token"] = "mock_token"
+
+    table = mock_resource.return_value.Table.return_value
+    table.query.return_value = {"Items": [{
+        "DocumentId": "doc-1",
+        "record_type": "document",
+        "file_name": "report.txt",
+        "upload_timestamp": "2025-01-01T00:00:00.000000+00:00"
+    }]}
+
+    response = client.get("/api/v1/search-files?search=Report")
+    assert response.status_code == 200
+    assert response.get_json()["files"][0]["file_name"] == "report.txt"
+    assert "FilterExpression" in table.query.call_args.kwargs
+    mock_get.assert_not_called()
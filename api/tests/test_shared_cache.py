@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+
+import pytest
+import redis
+from unittest.mock import MagicMock
+from v1.config import Config
+from v1.cache import RedisListingCache, build_cache, build_listing_cache
+from v1.shared_cache import SharedCache
+
+
+@pytest.fixture
+def cache(fake_redis):
+    return SharedCache("test", ttl=30, client=fake_redis)
+
+
+def test_set_and_get(cache, fake_redis):
+    """Test values round trip through msgpack under namespaced keys"""
+    cache.set("listing", {"files": [{"size_bytes": 1024}], "next": None})
+
+    assert cache.get("listing") == {"files": [{"size_bytes": 1024}],
+                                    "next": None}
+    assert f"{Config.CACHE_KEY_PREFIX}:test:listing" in fake_redis.data
+    assert cache.get("missing") is None
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_bulk_get_and_set(cache, fake_redis):
+    """Test bulk operations use one round trip each"""
+    cache.set_many({"a": 1, "b": 2, "c": None})
+    values = cache.get_many(["a", "b", "c"])
+
+    assert values == {"a": 1, "b": 2}
+    assert fake_redis.commands == ["pipeline", "mget"]
+
+
+def test_versioned_invalidate(fake_redis):
+    """Test invalidating a versioned namespace orphans its entries"""
+    cache = SharedCache("listings", ttl=30, versioned=True,
+                        client=fake_redis)
+    cache.set("page", [1, 2])
+    cache.invalidate()
+
+    assert cache.get("page") is None
+
+
+def test_invalidate_during_compute(fake_redis):
+    """Test a value computed across an invalidation is not served as
+    current"""
+    cache = SharedCache("listings", ttl=30, versioned=True,
+                        client=fake_redis)
+
+    def stale_listing():
+        # another worker stores a file while this listing is queried
+        cache.invalidate()
+        return {"files": []}
+
+    assert cache.get_or_set("page", stale_listing) == {"files": []}
+    assert cache.get("page") is None
+
+
+def test_get_or_set_computes_once(cache):
+    """Test a cached value is not recomputed"""
+    compute = MagicMock(return_value={"files": []})
+
+    assert cache.get_or_set("page", compute) == {"files": []}
+    assert cache.get_or_set("page", compute) == {"files": []}
+    compute.assert_called_once()
+
+
+def test_get_or_set_waits_for_lock_holder(cache, fake_redis, monkeypatch):
+    """Test a worker waits for the lock holder's value instead of
+    recomputing it"""
+    monkeypatch.setattr(Config, "CACHE_LOCK_WAIT", 1)
+    fake_redis.set(cache.raw_key("lock:page"), "other-worker", nx=True,
+                   px=10000)
+
+    def value_arrives(seconds):
+        cache.set("page", {"files": ["a.txt"]})
+
+    monkeypatch.setattr("v1.shared_cache.time.sleep", value_arrives)
+    compute = MagicMock()
+
+    assert cache.get_or_set("page", compute) == {"files": ["a.txt"]}
+    compute.assert_not_called()
+
+
+def test_redis_errors_fail_open():
+    """Test Redis failures are treated as misses"""
+    client = MagicMock()
+    client.get.side_effect = redis.ConnectionError("down")
+    client.set.side_effect = redis.ConnectionError("down")
+    cache = SharedCache("test", ttl=30, client=client)
+
+    assert cache.get("page") is None
+    assert cache.get_or_set("page", lambda: [1]) == [1]
+
+
+def test_redis_listing_cache_settles(fake_redis):
+    """Test listings are shared until a write invalidates them"""
+    listings = RedisListingCache(ttl=30, settle=5)
+    listings.shared._client = fake_redis
+    compute = MagicMock(return_value={"files": []})
+
+    listings.get_or_set(("user", "/file-metadata", ()), compute)
+    listings.get_or_set(("user", "/file-metadata", ()), compute)
+    assert compute.call_count == 1
+
+    listings.invalidate()
+    listings.get_or_set(("user", "/file-metadata", ()), compute)
+    listings.get_or_set(("user", "/file-metadata", ()), compute)
+    assert compute.call_count == 3
+
+
+def test_redis_backend_is_shared_by_workers(fake_redis, monkeypatch):
+    """Test caches built for CACHE_BACKEND=redis share entries and
+    invalidations between workers, each building its own instances"""
+    monkeypatch.setattr(Config, "CACHE_BACKEND", "redis")
+    monkeypatch.setattr("v1.shared_cache._redis", fake_redis)
+    workers = [
+        (build_cache("object-info", ttl=30, maxsize=10),
+         build_listing_cache())
+        for _ in range(2)
+    ]
+    (info, listings), (other_info, other_listings) = workers
+    assert isinstance(info, SharedCache)
+    assert isinstance(listings, RedisListingCache)
+
+    info.set("text-files/a.txt", {"size": 1})
+    assert other_info.get("text-files/a.txt") == {"size": 1}
+    other_info.delete("text-files/a.txt")
+    assert info.get("text-files/a.txt") is None
+
+    key = ("user", "/file-metadata", ())
+    listings.get_or_set(key, lambda: {"files": []})
+    assert other_listings.get(key) == {"files": []}
+    other_listings.invalidate()
+    assert listings.get(key) is None
+    assert listings.settling()
@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+
+import time
+import pytest
+from unittest.mock import patch
+from joserfc import jwt
+from joserfc.jwk import KeySet, RSAKey
+from v1.tokens import InvalidTokenError, TokenVerifier
+
+REGION = "us-west-2"
+USER_POOL_ID = "us-west-2_testpool"
+CLIENT_ID = "test-client-id"
+ISSUER = f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}"
+
+
+def generate_key(kid):
+    return RSAKey.generate_key(2048, parameters={"kid": kid, "alg": "RS256",
+                                                 "use": "sig"})
+
+
+SIGNING_KEY = generate_key("key-1")
+
+
+def make_token(key=SIGNING_KEY, **overrides):
+    """Sign an ID token the way Cognito would"""
+    now = int(time.time())
+    claims = {
+        "sub": "user-1",
+        "email": "testuser@example.com",
+        "iss": ISSUER,
+        "aud": CLIENT_ID,
+        "token_use": "id",
+        "iat": now,
+        "exp": now + 3600
+    }
+    claims.update(overrides)
+    header = {"alg": "RS256", "kid": key.kid}
+    return jwt.encode(header, claims, key)
+
+
+def public_key_set(*keys):
+    return KeySet.import_key_set(KeySet(list(keys)).as_dict(private=False))
+
+
+@pytest.fixture
+def verifier():
+    """A verifier holding the public half of the signing key"""
+    return TokenVerifier(REGION, USER_POOL_ID, CLIENT_ID,
+                         key_set=public_key_set(SIGNING_KEY))
+
+
+def test_verify_valid_token(verifier):
+    """Test a valid ID token's claims are returned"""
+    claims = verifier.verify(make_token())
+    assert claims["email"] == "testuser@example.com"
+
+
+@pytest.mark.parametrize("overrides", [
+    {"exp": int(time.time()) - 3600},
+    {"aud": "another-client"},
+    {"iss": "https://cognito-idp.us-west-2.amazonaws.com/other-pool"},
+    {"token_use": "access"},
+])
+def test_verify_rejects_invalid_claims(verifier, overrides):
+    """Test expired tokens and tokens for other audiences are rejected"""
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(make_token(**overrides))
+
+
+def test_verify_rejects_bad_signature(verifier):
+    """Test a token signed with another key under the same kid fails"""
+    forged_key = generate_key("key-1")
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(make_token(key=forged_key))
+
+
+def test_verify_rejects_malformed_token(verifier):
+    """Test values that are not JWTs are rejected"""
+    with pytest.raises(InvalidTokenError):
+        verifier.verify("not-a-token")
+
+
+def test_unknown_kid_refreshes_key_set(verifier):
+    """Test a rotated signing key is fetched on first sight"""
+    rotated_key = generate_key("key-2")
+    rotated_set = public_key_set(SIGNING_KEY, rotated_key)
+    with patch.object(TokenVerifier, "_fetch_key_set",
+                      return_value=rotated_set) as mock_fetch, \
+            patch("v1.tokens.Config.JWKS_MIN_REFRESH_INTERVAL", 0):
+        claims = verifier.verify(make_token(key=rotated_key))
+
+    assert claims["sub"] == "user-1"
+    mock_fetch.assert_called_once()
+
+
+def test_unknown_kid_refresh_is_rate_limited(verifier):
+    """Test unknown key ids do not refetch the JWKS on every request"""
+    with patch.object(TokenVerifier, "_fetch_key_set") as mock_fetch:
+        with pytest.raises(InvalidTokenError):
+            verifier.verify(make_token(key=generate_key("key-3")))
+
+    mock_fetch.assert_not_called()
+
+
+def test_failed_refresh_backs_off(verifier):
+    """Test a failed refresh of a stale key set keeps serving it, and is
+    not retried on every request"""
+    with patch.object(TokenVerifier, "_fetch_key_set",
+                      side_effect=ConnectionError("down")) as mock_fetch, \
+            patch("v1.tokens.Config.JWKS_CACHE_TTL", 0):
+        first = verifier.verify(make_token())
+        second = verifier.verify(make_token())
+
+    assert first == second
+    assert first["sub"] == "user-1"
+    mock_fetch.assert_called_once()
+
+
+def test_key_set_fetched_from_user_pool():
+    """Test the JWKS is fetched from the user pool's well-known URL"""
+    verifier = TokenVerifier(REGION, USER_POOL_ID, CLIENT_ID)
+    with patch("v1.upstream.upstream.get") as mock_get:
+        mock_get.return_value.json.return_value = \
+            KeySet([SIGNING_KEY]).as_dict(private=False)
+        verifier.verify(make_token())
+        verifier.verify(make_token())
+
+    mock_get.assert_called_once_with(f"{ISSUER}/.well-known/jwks.json")
+
+
+@patch("v1.upstream.upstream.get")
+def test_bearer_token_authenticates_api_request(mock_get, client, verifier):
+    """Test API clients can list files with a bearer ID token"""
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"files": [],
+                                               "next_cursor": None}
+    token = make_token()
+
+    with patch("v1.tokens.verifier", verifier):
+        response = client.get("/api/v1/file-metadata",
+                              headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert mock_get.call_args.kwargs["headers"]["Authorization"] == \
+        f"Bearer {token}"
+    assert "Set-Cookie" not in response.headers
+
+
+def test_invalid_bearer_token_rejected(client, verifier):
+    """Test requests with an invalid bearer token are rejected"""
+    with patch("v1.tokens.verifier", verifier):
+        response = client.get(
+            "/api/v1/file-metadata",
+            headers={"Authorization": "Bearer not-a-token"}
+        )
+
+    assert response.status_code == 401
+    assert response.get_json()["error"] == "Unauthorized"
@@ -1,5 +1,7 @@
 #!/usr/bin/python3
 
+import base64
+import hashlib
 from flask.testing import FlaskClient
 import pytest
 import boto3
@@ -9,6 +11,9 @@ from botocore.exceptions import NoCredentialsError, PartialCredentialsError
 import requests
 from v1.app import app
 from v1.config import Config
+from v1.aws_clients import get_client
+from v1.routes.upload import (MAX_OBJECT_SIZE, MAX_PART_SIZE,
+                              MAX_UPLOAD_PARTS, upload_plan)
 
 
 @pytest.fixture
@@ -103,6 +108,62 @@ def test_initialize_success(client: FlaskClient):
     assert "key" in response.json
 
 
+@mock_aws
+def test_initialize_returns_plan(client: FlaskClient):
+    """Test /upload/initialize plans the parts of a declared file size"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = boto3.client("s3")
+    s3.create_bucket(
+        Bucket=Config.S3_BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+    )
+    response = client.post("/api/v1/upload/initialize", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain",
+        "fileSize": 20 * 1024 * 1024
+    })
+    assert response.status_code == 200
+    assert response.json["plan"] == upload_plan(20 * 1024 * 1024)
+
+
+def test_initialize_invalid_file_size(client: FlaskClient):
+    """Test /upload/initialize endpoint with invalid file sizes"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    for file_size in [-1, "10", 1.5, MAX_OBJECT_SIZE + 1]:
+        response = client.post("/api/v1/upload/initialize", json={
+            "fileName": "test.txt",
+            "contentType": "text/plain",
+            "fileSize": file_size
+        })
+        assert response.status_code == 400
+        assert "Invalid file size" in response.json["error"]
+
+
+def test_upload_plan_small_file():
+    """Test a small file is uploaded in one part"""
+    plan = upload_plan(20 * 1024)
+    assert plan == {"partSize": Config.UPLOAD_MIN_PART_SIZE,
+                    "partCount": 1, "concurrency": 1}
+    assert upload_plan(0)["partCount"] == 1
+
+
+def test_upload_plan_large_files():
+    """Test large files get bigger parts within S3's limits"""
+    plan = upload_plan(100 * 1024 ** 3)
+    assert plan["partCount"] <= Config.UPLOAD_TARGET_MAX_PARTS
+    assert plan["partSize"] * plan["partCount"] >= 100 * 1024 ** 3
+    assert plan["concurrency"] == Config.UPLOAD_MAX_CONCURRENCY
+
+    plan = upload_plan(MAX_OBJECT_SIZE)
+    assert plan["partSize"] <= MAX_PART_SIZE
+    assert plan["partCount"] <= MAX_UPLOAD_PARTS
+    assert plan["partSize"] * plan["partCount"] >= MAX_OBJECT_SIZE
+
+
 @patch("boto3.client", side_effect=NoCredentialsError())
 def test_initialize_aws_credentials_error(mock_boto, client: FlaskClient):
     """Test /upload/initialize endpoint for incorrect AWS credentials"""
@@ -198,6 +259,171 @@ def test_chunk_url_success(client: FlaskClient):
     assert "url" in response.json
 
 
+"""TEST /upload/chunk-urls ROUTE"""
+
+
+def test_chunk_urls_unauthorized(client: FlaskClient):
+    """Test POST /upload/chunk-urls fails if user is not logged in"""
+    response = client.post("/api/v1/upload/chunk-urls", json={})
+    assert response.status_code == 401
+
+
+def test_chunk_urls_invalid_range(client: FlaskClient):
+    """Test /upload/chunk-urls endpoint with invalid part ranges"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    for first_part, last_part in [("abc", 2), (0, 2), (3, 2), (1, 10001),
+                                  (1, Config.UPLOAD_PART_URL_BATCH_MAX + 1)]:
+        response = client.post("/api/v1/upload/chunk-urls", json={
+            "fileName": "test.txt",
+            "uploadId": "123",
+            "firstPart": first_part,
+            "lastPart": last_part
+        })
+        assert response.status_code == 400
+        assert "Invalid part range" in response.json["error"]
+
+
+@mock_aws
+def test_chunk_urls_success(client: FlaskClient):
+    """Test one request signs every part of a range"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = boto3.client("s3")
+    s3.create_bucket(
+        Bucket=Config.S3_BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+    )
+
+    init_response = client.post("/api/v1/upload/initialize", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain"
+    })
+    upload_id = init_response.json["uploadId"]
+
+    response = client.post("/api/v1/upload/chunk-urls", json={
+        "fileName": "test.txt",
+        "uploadId": upload_id,
+        "firstPart": 3,
+        "lastPart": 7
+    })
+    assert response.status_code == 200
+    urls = response.json["urls"]
+    assert [url["partNumber"] for url in urls] == [3, 4, 5, 6, 7]
+    assert "partNumber=5" in urls[2]["url"]
+
+
+"""TEST /upload/status ROUTE"""
+
+
+def test_status_unauthorized(client: FlaskClient):
+    """Test GET /upload/status fails if user is not logged in"""
+    response = client.get("/api/v1/upload/status?fileName=test.txt")
+    assert response.status_code == 401
+
+
+def test_status_missing_fields(client: FlaskClient):
+    """Test /upload/status endpoint with missing required fields"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    response = client.get("/api/v1/upload/status?fileName=test.txt")
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/upload/status?fileSize=12")
+    assert response.status_code == 400
+
+
+def test_status_no_upload(client: FlaskClient):
+    """Test /upload/status endpoint when there is nothing to resume"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    response = client.get(
+        "/api/v1/upload/status?fileName=test.txt&fileSize=12")
+    assert response.status_code == 404
+
+
+@mock_aws
+def test_status_resumes_upload(client: FlaskClient):
+    """Test /upload/status lists the uploaded parts of the same file"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = boto3.client("s3")
+    s3.create_bucket(
+        Bucket=Config.S3_BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+    )
+
+    init_response = client.post("/api/v1/upload/initialize", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain",
+        "fileSize": 12,
+        "lastModified": 1700000000000
+    })
+    upload_id = init_response.json["uploadId"]
+    file_key = init_response.json["key"]
+
+    part_response = client.post("/api/v1/upload/chunk-url", json={
+        "fileName": "test.txt",
+        "uploadId": upload_id,
+        "partNumber": 1
+    })
+    etag = requests.put(part_response.json["url"],
+                        data=b"Test content").headers["ETag"]
+
+    status_url = ("/api/v1/upload/status?fileName=test.txt&fileSize=12"
+                  "&lastModified=1700000000000")
+    response = client.get(status_url)
+    assert response.status_code == 200
+    assert response.json["uploadId"] == upload_id
+    assert response.json["plan"] == init_response.json["plan"]
+    assert response.json["parts"] == [
+        {"PartNumber": 1, "ETag": etag, "Size": 12}
+    ]
+
+    # another file with the same name is not resumed
+    response = client.get(
+        "/api/v1/upload/status?fileName=test.txt&fileSize=12")
+    assert response.status_code == 404
+
+    client.post("/api/v1/upload/complete", json={
+        "key": file_key,
+        "uploadId": upload_id,
+        "parts": [{"PartNumber": 1, "ETag": etag}]
+    })
+    assert client.get(status_url).status_code == 404
+
+
+@mock_aws
+def test_status_aborted_upload(client: FlaskClient):
+    """Test /upload/status forgets uploads that no longer exist in S3"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = boto3.client("s3")
+    s3.create_bucket(
+        Bucket=Config.S3_BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+    )
+
+    init_response = client.post("/api/v1/upload/initialize", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain",
+        "fileSize": 12
+    })
+    s3.abort_multipart_upload(Bucket=Config.S3_BUCKET_NAME,
+                              Key=init_response.json["key"],
+                              UploadId=init_response.json["uploadId"])
+
+    response = client.get(
+        "/api/v1/upload/status?fileName=test.txt&fileSize=12")
+    assert response.status_code == 404
+
+
 """TEST /upload/complete ROUTE"""
 
 
@@ -292,3 +518,308 @@ def test_complete_success(client: FlaskClient):
     })
     assert response.status_code == 200
     assert response.json["message"] == "Upload completed successfully"
+
+    head = s3.head_object(Bucket=Config.S3_BUCKET_NAME, Key=file_key)
+    assert head["Metadata"]["owner"] == "testuser@example.com"
+
+
+"""TEST PART CHECKSUMS"""
+
+
+def sha256_checksum(data):
+    return base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+def test_initialize_unsupported_checksum(client: FlaskClient):
+    """Test /upload/initialize rejects unknown checksum algorithms"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    response = client.post("/api/v1/upload/initialize", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain",
+        "checksumAlgorithm": "MD5"
+    })
+    assert response.status_code == 400
+    assert "Unsupported checksum algorithm" in response.json["error"]
+
+
+def test_chunk_urls_invalid_checksums(client: FlaskClient):
+    """Test part URLs are not signed without a valid checksum per part"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    response = client.post("/api/v1/upload/chunk-url", json={
+        "fileName": "test.txt",
+        "uploadId": "123",
+        "partNumber": 1,
+        "checksumAlgorithm": "SHA256",
+        "checksum": "not base64"
+    })
+    assert response.status_code == 400
+    assert "Invalid checksum" in response.json["error"]
+
+    for checksums in [{"1": sha256_checksum(b"a")},
+                      {"1": sha256_checksum(b"a"), "2": "AAAA"}]:
+        response = client.post("/api/v1/upload/chunk-urls", json={
+            "fileName": "test.txt",
+            "uploadId": "123",
+            "firstPart": 1,
+            "lastPart": 2,
+            "checksumAlgorithm": "SHA256",
+            "checksums": checksums
+        })
+        assert response.status_code == 400
+        assert "Invalid checksum" in response.json["error"]
+
+
+@mock_aws
+def test_checksummed_upload(client: FlaskClient):
+    """Test part checksums are signed into URLs and required to complete"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = boto3.client("s3")
+    s3.create_bucket(
+        Bucket=Config.S3_BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+    )
+
+    # moto leaves ChecksumAlgorithm out of list_parts, S3 reports it
+    def report_algorithm(parsed, **kwargs):
+        parsed.setdefault("ChecksumAlgorithm", "SHA256")
+    get_client("s3").meta.events.register("after-call.s3.ListParts",
+                                          report_algorithm)
+
+    # without a fileSize no upload session is saved, so completing relies
+    # on S3 alone to know the parts are checksummed
+    init_response = client.post("/api/v1/upload/initialize", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain",
+        "checksumAlgorithm": "SHA256"
+    })
+    assert init_response.json["checksumAlgorithm"] == "SHA256"
+    upload_id = init_response.json["uploadId"]
+    file_key = init_response.json["key"]
+
+    checksum = sha256_checksum(b"Test content")
+    response = client.post("/api/v1/upload/chunk-urls", json={
+        "fileName": "test.txt",
+        "uploadId": upload_id,
+        "firstPart": 1,
+        "lastPart": 1,
+        "checksumAlgorithm": "SHA256",
+        "checksums": {"1": checksum}
+    })
+    signed = response.json["urls"][0]
+    assert signed["checksum"] == checksum
+    assert "x-amz-checksum-sha256" in signed["url"].lower()
+
+    etag = requests.put(
+        signed["url"],
+        data=b"Test content",
+        headers={"x-amz-checksum-sha256": checksum}
+    ).headers["ETag"]
+
+    response = client.post("/api/v1/upload/complete", json={
+        "key": file_key,
+        "uploadId": upload_id,
+        "parts": [{"PartNumber": 1, "ETag": etag}]
+    })
+    assert response.status_code == 400
+    assert "Missing part checksums" in response.json["error"]
+
+    response = client.post("/api/v1/upload/complete", json={
+        "key": file_key,
+        "uploadId": upload_id,
+        "parts": [{"PartNumber": 1, "ETag": etag,
+                   "ChecksumSHA256": checksum}]
+    })
+    assert response.status_code == 200
+    assert "checksum" in response.json
+
+
+@mock_aws
+def test_complete_reads_checksum_algorithm_from_session(client: FlaskClient):
+    """Test completing an upload with a session does not call list_parts"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = boto3.client("s3")
+    s3.create_bucket(
+        Bucket=Config.S3_BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+    )
+
+    list_parts_calls = []
+    get_client("s3").meta.events.register(
+        "before-call.s3.ListParts",
+        lambda **kwargs: list_parts_calls.append(kwargs))
+
+    init_response = client.post("/api/v1/upload/initialize", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain",
+        "fileSize": 12,
+        "checksumAlgorithm": "SHA256"
+    })
+    upload_id = init_response.json["uploadId"]
+    file_key = init_response.json["key"]
+
+    response = client.post("/api/v1/upload/complete", json={
+        "key": file_key,
+        "uploadId": upload_id,
+        "parts": [{"PartNumber": 1, "ETag": "etag"}]
+    })
+    assert response.status_code == 400
+    assert "Missing part checksums" in response.json["error"]
+    assert list_parts_calls == []
+
+
+"""TEST /upload/small ROUTE"""
+
+
+def create_documents_table():
+    """documents table with the file name index the existence check uses"""
+    dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+    return dynamodb.create_table(
+        TableName=Config.DOCUMENTS_DYNAMODB_TABLE_NAME,
+        KeySchema=[{"AttributeName": "DocumentId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "DocumentId", "AttributeType": "S"},
+            {"AttributeName": "file_name", "AttributeType": "S"}
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": Config.DOCUMENTS_FILE_NAME_INDEX,
+            "KeySchema": [{"AttributeName": "file_name", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "KEYS_ONLY"}
+        }],
+        BillingMode="PAY_PER_REQUEST"
+    )
+
+
+def test_small_upload_unauthorized(client: FlaskClient):
+    """Test POST /upload/small fails if user is not logged in"""
+    response = client.post("/api/v1/upload/small", json={})
+    assert response.status_code == 401
+
+
+def test_small_upload_invalid_request(client: FlaskClient):
+    """Test /upload/small endpoint with missing or invalid fields"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    for payload in [
+        {"contentType": "text/plain", "fileSize": 12},
+        {"fileName": "test.txt", "fileSize": 12},
+        {"fileName": "test.txt", "contentType": "text/plain"},
+        {"fileName": "test.txt", "contentType": "text/plain",
+         "fileSize": -1}
+    ]:
+        response = client.post("/api/v1/upload/small", json=payload)
+        assert response.status_code == 400
+
+    response = client.post("/api/v1/upload/small", json={
+        "fileName": "test.xyz",
+        "contentType": "application/unknown",
+        "fileSize": 12
+    })
+    assert response.status_code == 400
+    assert "Unsupported file type" in response.json["error"]
+
+
+def test_small_upload_too_large(client: FlaskClient):
+    """Test files over the threshold are sent to the multipart flow"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    response = client.post("/api/v1/upload/small", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain",
+        "fileSize": Config.SMALL_UPLOAD_MAX_BYTES + 1
+    })
+    assert response.status_code == 413
+
+
+@mock_aws
+def test_small_upload_success(client: FlaskClient):
+    """Test a small file is uploaded with the returned URL and headers"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    s3 = boto3.client("s3")
+    s3.create_bucket(
+        Bucket=Config.S3_BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+    )
+    table = create_documents_table()
+    table.put_item(Item={"DocumentId": "1", "file_name": "other.txt"})
+
+    response = client.post("/api/v1/upload/small", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain",
+        "fileSize": 12,
+        "checksumAlgorithm": "SHA256",
+        "checksum": sha256_checksum(b"Test content")
+    })
+    assert response.status_code == 200
+    assert response.json["exists"] is False
+    assert response.json["headers"]["x-amz-checksum-sha256"] == \
+        sha256_checksum(b"Test content")
+
+    put = requests.put(response.json["url"], data=b"Test content",
+                       headers=response.json["headers"])
+    assert put.status_code == 200
+
+    head = s3.head_object(Bucket=Config.S3_BUCKET_NAME,
+                          Key=response.json["key"])
+    assert head["Metadata"]["owner"] == "testuser@example.com"
+    assert head["ContentType"] == "text/plain"
+
+    response = client.post("/api/v1/upload/small/complete",
+                           json={"key": response.json["key"]})
+    assert response.status_code == 200
+
+
+@mock_aws
+def test_small_upload_existing_file(client: FlaskClient):
+    """Test /upload/small reports a file of the same name"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    table = create_documents_table()
+    table.put_item(Item={"DocumentId": "1", "file_name": "test.txt"})
+
+    response = client.post("/api/v1/upload/small", json={
+        "fileName": "test.txt",
+        "contentType": "text/plain",
+        "fileSize": 12
+    })
+    assert response.status_code == 200
+    assert response.json["exists"] is True
+
+
+def test_small_upload_complete_unauthorized(client: FlaskClient):
+    """Test POST /upload/small/complete fails if user is not logged in"""
+    response = client.post("/api/v1/upload/small/complete", json={})
+    assert response.status_code == 401
+
+
+@patch("v1.routes.upload.invalidate_file")
+@patch("v1.routes.upload.invalidate_listings")
+def test_small_upload_complete_invalidates(mock_invalidate_listings,
+                                           mock_invalidate_file,
+                                           client: FlaskClient):
+    """Test cached listings and file metadata are dropped once the PUT of
+    a small upload succeeded, and not before"""
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+
+    response = client.post("/api/v1/upload/small/complete", json={})
+    assert response.status_code == 400
+    mock_invalidate_listings.assert_not_called()
+
+    response = client.post("/api/v1/upload/small/complete",
+                           json={"key": "text-files/test.txt"})
+    assert response.status_code == 200
+    mock_invalidate_listings.assert_called_once()
+    mock_invalidate_file.assert_called_once_with("text-files/test.txt")
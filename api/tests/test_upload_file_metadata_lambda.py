@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+
+import os
+import boto3
+import pytest
+from moto import mock_aws
+from types import SimpleNamespace
+from unittest.mock import patch
+
+os.environ.setdefault("DYNAMODB_TABLE_NAME", "test-docs")
+upload_file_metadata_lambda = pytest.importorskip(
+    "upload_file_metadata_lambda")
+
+BUCKET = "metadata-bucket"
+CONTEXT = SimpleNamespace(function_version="$LATEST")
+
+
+@pytest.fixture
+def metadata_lambda():
+    """the lambda module, wired to a moto bucket and documents table"""
+    with mock_aws():
+        module = upload_file_metadata_lambda
+        s3 = boto3.client("s3", region_name="us-west-2")
+        s3.create_bucket(
+            Bucket=BUCKET,
+            CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+        )
+        dynamodb = boto3.resource("dynamodb", region_name="us-west-2")
+        table = dynamodb.create_table(
+            TableName="test-docs",
+            KeySchema=[{"AttributeName": "DocumentId", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "DocumentId", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        with patch.object(module, "s3", s3), \
+                patch.object(module, "table", table):
+            yield module
+
+
+def created(file_key, size, sequencer):
+    s3 = {"bucket": {"name": BUCKET},
+          "object": {"key": file_key, "size": size, "sequencer": sequencer}}
+    return {"eventName": "ObjectCreated:Put",
+            "eventTime": "2026-10-18T12:00:00.000Z", "s3": s3}
+
+
+def put(module, file_key, body):
+    module.s3.put_object(Bucket=BUCKET, Key=file_key, Body=body)
+
+
+def rows(module):
+    return module.table.scan()["Items"]
+
+
+def test_duplicate_records_store_latest_write(metadata_lambda):
+    """Test repeated records of one key collapse to its newest write"""
+    put(metadata_lambda, "text-files/a.txt", b"new")
+    event = {"Records": [
+        created("text-files/a.txt", 10, "0A"),
+        created("text-files/a.txt", 3, "0B"),
+        created("text-files/a.txt", 3, "0B")
+    ]}
+
+    with patch.object(metadata_lambda, "store_metadata",
+                      wraps=metadata_lambda.store_metadata) as store:
+        response = metadata_lambda.lambda_handler(event, CONTEXT)
+
+    assert response["statusCode"] == 200
+    assert store.call_count == 1
+    [row] = rows(metadata_lambda)
+    assert row["file_key"] == "text-files/a.txt"
+    assert row["size_bytes"] == 3
+
+
+def test_partial_failure_raises_for_retry(metadata_lambda):
+    """Test a record that fails to store fails the invocation, so the
+    asynchronous invoke is retried, while the other records are stored"""
+    put(metadata_lambda, "text-files/a.txt", b"a")
+    # no object behind b.txt, so reading its metadata fails
+    event = {"Records": [
+        created("text-files/a.txt", 1, "0A"),
+        created("text-files/b.txt", 1, "0B")
+    ]}
+
+    with pytest.raises(RuntimeError, match="1 of 2 objects"):
+        metadata_lambda.lambda_handler(event, CONTEXT)
+
+    assert [row["file_key"] for row in rows(metadata_lambda)] == \
+        ["text-files/a.txt"]
+
+    # the retry stores the missing object and leaves the stored one alone
+    put(metadata_lambda, "text-files/b.txt", b"b")
+    response = metadata_lambda.lambda_handler(event, CONTEXT)
+    assert response["statusCode"] == 200
+    assert sorted(row["file_key"] for row in rows(metadata_lambda)) == \
+        ["text-files/a.txt", "text-files/b.txt"]
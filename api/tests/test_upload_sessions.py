@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+
+import boto3
+from moto import mock_aws
+from unittest.mock import patch
+from v1.config import Config
+from v1.cache import upload_session_cache
+from v1.shared_cache import SharedCache
+from v1.upload_sessions import (find_upload_session, forget_upload_session,
+                                save_upload_session, uploaded_parts)
+
+PLAN = {"partSize": 8388608, "partCount": 1, "concurrency": 1}
+
+
+def test_upload_session_matches_file():
+    """Test a session is only found for the file it was started for"""
+    save_upload_session("user@example.com", "text-files/a.txt", "upload-1",
+                        PLAN, 12, 1700000000000)
+
+    upload = find_upload_session("user@example.com", "text-files/a.txt", 12,
+                                 1700000000000)
+    assert upload["uploadId"] == "upload-1"
+    assert upload["plan"] == PLAN
+
+    assert find_upload_session("user@example.com", "text-files/a.txt",
+                               13, 1700000000000) is None
+    assert find_upload_session("other@example.com", "text-files/a.txt",
+                               12, 1700000000000) is None
+
+    forget_upload_session("user@example.com", "text-files/a.txt")
+    assert find_upload_session("user@example.com", "text-files/a.txt", 12,
+                               1700000000000) is None
+
+
+def test_upload_session_shared_through_redis():
+    """Test a session saved by one worker is found by another, which
+    shares only the Redis it is kept in"""
+    save_upload_session("user@example.com", "text-files/a.txt", "upload-1",
+                        PLAN, 12)
+
+    other_worker = SharedCache("upload-sessions", ttl=60,
+                               client=upload_session_cache.client)
+    with patch("v1.upload_sessions.upload_session_cache", other_worker):
+        upload = find_upload_session("user@example.com", "text-files/a.txt",
+                                     12)
+        assert upload["uploadId"] == "upload-1"
+        forget_upload_session("user@example.com", "text-files/a.txt")
+
+    assert find_upload_session("user@example.com", "text-files/a.txt",
+                               12) is None
+
+
+@mock_aws
+@patch("v1.upload_sessions.LIST_PARTS_PAGE_SIZE", 2)
+def test_uploaded_parts_pages():
+    """Test every page of list_parts is read"""
+    s3 = boto3.client("s3")
+    s3.create_bucket(
+        Bucket=Config.S3_BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": "us-west-2"}
+    )
+    upload_id = s3.create_multipart_upload(
+        Bucket=Config.S3_BUCKET_NAME, Key="text-files/a.txt")["UploadId"]
+    for part_number in range(1, 6):
+        s3.upload_part(Bucket=Config.S3_BUCKET_NAME, Key="text-files/a.txt",
+                       UploadId=upload_id, PartNumber=part_number,
+                       Body=b"x" * part_number)
+
+    parts = uploaded_parts(s3, Config.S3_BUCKET_NAME, "text-files/a.txt",
+                           upload_id)
+
+    assert [part["PartNumber"] for part in parts] == [1, 2, 3, 4, 5]
+    assert [part["Size"] for part in parts] == [1, 2, 3, 4, 5]
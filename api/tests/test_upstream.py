@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from v1.config import Config
+from v1.upstream import UpstreamClient, IDEMPOTENT_METHODS
+
+
+@pytest.fixture
+def upstream():
+    """Create an upstream client with a mocked session"""
+    client = UpstreamClient()
+    with patch.object(requests.Session, "request") as mock_request:
+        mock_request.return_value = MagicMock(status_code=200)
+        client.mock_request = mock_request
+        yield client
+
+
+def test_session_is_reused():
+    """Test every call goes through the same pooled session"""
+    client = UpstreamClient()
+    assert client.session is client.session
+
+
+def test_session_retries_idempotent_calls():
+    """Test the session adapter retries idempotent calls with jitter"""
+    client = UpstreamClient()
+    retry = client.session.get_adapter("https://example.com").max_retries
+
+    assert retry.total == Config.UPSTREAM_MAX_RETRIES
+    assert retry.allowed_methods == IDEMPOTENT_METHODS
+    assert "POST" not in retry.allowed_methods
+    assert retry.backoff_jitter == Config.UPSTREAM_BACKOFF_FACTOR
+
+
+def test_request_default_timeout(upstream):
+    """Test calls get the configured connect and read timeouts"""
+    upstream.get("https://example.com/files")
+
+    assert upstream.mock_request.call_args.kwargs["timeout"] == (
+        Config.UPSTREAM_CONNECT_TIMEOUT,
+        Config.UPSTREAM_READ_TIMEOUT
+    )
+
+
+def test_request_timeout_override(upstream):
+    """Test a call can set its own timeout"""
+    upstream.delete("https://example.com/files", timeout=1)
+
+    assert upstream.mock_request.call_args.kwargs["timeout"] == 1
+
+
+def test_metrics(upstream):
+    """Test latency and errors are recorded per endpoint"""
+    upstream.get("https://example.com/files")
+    upstream.mock_request.return_value = MagicMock(status_code=502)
+    upstream.get("https://example.com/files")
+
+    upstream.mock_request.side_effect = requests.ConnectionError()
+    with pytest.raises(requests.ConnectionError):
+        upstream.delete("https://example.com/files")
+
+    metrics = upstream.metrics()
+    assert metrics["GET https://example.com/files"]["count"] == 2
+    assert metrics["GET https://example.com/files"]["errors"] == 1
+    assert metrics["DELETE https://example.com/files"]["errors"] == 1
+
+
+def test_metrics_count_retries(upstream):
+    """Test attempts urllib3 retried before a response are counted"""
+    response = MagicMock(status_code=200)
+    response.raw.retries.history = ("first attempt", "second attempt")
+    upstream.mock_request.return_value = response
+
+    upstream.get("https://example.com/files")
+
+    assert upstream.metrics()["GET https://example.com/files"]["retries"] \
+        == 2
+
+
+@patch("v1.routes.file_metadata.upstream")
+def test_upstream_stats_route(mock_upstream, client):
+    """Test the upstream counters are reported to logged in users"""
+    mock_upstream.metrics.return_value = {
+        "GET https://example.com/files": {"count": 1, "errors": 0,
+                                          "retries": 0, "avg_ms": 12.5,
+                                          "max_ms": 12.5}
+    }
+
+    response = client.get("/api/v1/file-metadata/upstream-stats")
+    assert response.status_code == 401
+
+    with client.session_transaction() as session:
+        session["email"] = "testuser@example.com"
+    response = client.get("/api/v1/file-metadata/upstream-stats")
+    assert response.status_code == 200
+    assert response.get_json() == mock_upstream.metrics.return_value
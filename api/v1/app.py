@@ -1,10 +1,12 @@
 from flask import Flask, render_template, session, Blueprint
 from v1.config import Config
+from v1.shared_cache import get_redis
+from v1.tokens import load_bearer_user
 from flask_session import Session
 from flask_cors import CORS
 from datetime import timedelta
+import click
 import logging
-import redis
 import os
 import sys
 
@@ -43,10 +45,7 @@ if is_test:
 else:
     app.config["SESSION_TYPE"] = "redis"
     app.config["SESSION_USE_SIGNER"] = True
-    app.config["SESSION_REDIS"] = redis.from_url(
-        f"redis://:{Config.REDIS_PASSWORD}@"
-        f"{Config.REDIS_HOST}:{Config.REDIS_PORT}"
-    )
+    app.config["SESSION_REDIS"] = get_redis()
     app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(minutes=30)
 
 # remove prefix from landing page url
@@ -60,6 +59,9 @@ CORS(api_bp,
 
 Session(app)
 
+# API clients may authenticate with a Cognito ID token instead of a session
+app.before_request(load_bearer_user)
+
 api_bp.register_blueprint(register_bp)
 api_bp.register_blueprint(confirm_bp)
 api_bp.register_blueprint(resend_bp)
@@ -74,6 +76,29 @@ api_bp.register_blueprint(logout_bp)
 app.register_blueprint(api_bp)
 
 
+@app.cli.command("warm-known-emails")
+def warm_known_emails_command():
+    """load registered emails from the userdata table into the cache"""
+    from v1.cognito import warm_known_emails
+    click.echo(f"Loaded {warm_known_emails()} known emails")
+
+
+@app.cli.command("sweep-uploads")
+@click.option("--max-age-hours", type=float, default=None,
+              help="abort uploads older than this, in hours")
+def sweep_uploads_command(max_age_hours):
+    """abort multipart uploads that were never completed"""
+    from v1.aws_clients import get_client
+    from v1.multipart_sweeper import sweep_multipart_uploads
+    if max_age_hours is None:
+        max_age_hours = Config.UPLOAD_SWEEP_MAX_AGE_HOURS
+    report = sweep_multipart_uploads(get_client("s3"), Config.S3_BUCKET_NAME,
+                                     timedelta(hours=max_age_hours))
+    click.echo(f"Aborted {report['aborted']} uploads "
+               f"({report['failed']} failed), "
+               f"reclaimed {report['bytes_reclaimed']} bytes")
+
+
 # Error handler
 @app.errorhandler(404)
 def page_not_found(e):
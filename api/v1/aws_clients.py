@@ -0,0 +1,102 @@
+import os
+import boto3
+import logging
+import threading
+from botocore.config import Config as BotoConfig
+from v1.config import Config
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# clients and resources are built once per worker process and shared by
+# every request it serves
+_registry: Dict[Tuple[str, str, str], Any] = {}
+_registry_pid = os.getpid()
+_lock = threading.Lock()
+
+
+def _boto_config(**overrides: Any) -> BotoConfig:
+    """
+    Builds the botocore configuration shared by all clients
+
+    Args:
+        overrides: extra botocore Config options, e.g. `s3={...}`
+
+    Returns:
+        botocore.config.Config: pooled, keep-alive configuration
+    """
+    return BotoConfig(
+        region_name=Config.AWS_REGION,
+        max_pool_connections=Config.AWS_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=Config.AWS_TCP_KEEPALIVE,
+        retries={
+            "mode": Config.AWS_RETRY_MODE,
+            "max_attempts": Config.AWS_MAX_ATTEMPTS
+        },
+        **overrides
+    )
+
+
+def _get(kind: str, service_name: str, **overrides: Any) -> Any:
+    """
+    Returns the cached client or resource for a service, creating it on
+    first use
+
+    Args:
+        kind (str): "client" or "resource"
+        service_name (str): AWS service name, e.g. "s3"
+        overrides: extra botocore Config options
+
+    Returns:
+        the boto3 client or resource
+    """
+    global _registry_pid
+
+    key = (kind, service_name, repr(sorted(overrides.items())))
+    with _lock:
+        # a forked worker must not reuse its parent's connection pools
+        if _registry_pid != os.getpid():
+            _registry.clear()
+            _registry_pid = os.getpid()
+
+        if key not in _registry:
+            factory = boto3.client if kind == "client" else boto3.resource
+            _registry[key] = factory(service_name,
+                                     config=_boto_config(**overrides))
+            logger.debug(f"Created shared {service_name} {kind}")
+        return _registry[key]
+
+
+def get_client(service_name: str, **overrides: Any) -> Any:
+    """
+    Returns the shared boto3 client for an AWS service
+
+    Args:
+        service_name (str): AWS service name, e.g. "s3"
+        overrides: extra botocore Config options, e.g.
+            `s3={"use_accelerate_endpoint": True}`
+
+    Returns:
+        botocore.client.BaseClient: the pooled client
+    """
+    return _get("client", service_name, **overrides)
+
+
+def get_resource(service_name: str, **overrides: Any) -> Any:
+    """
+    Returns the shared boto3 resource for an AWS service
+
+    Args:
+        service_name (str): AWS service name, e.g. "dynamodb"
+        overrides: extra botocore Config options
+
+    Returns:
+        boto3.resources.base.ServiceResource: the pooled resource
+    """
+    return _get("resource", service_name, **overrides)
+
+
+def reset_clients() -> None:
+    """drops every cached client and resource"""
+    with _lock:
+        _registry.clear()
@@ -0,0 +1,417 @@
+import time
+import uuid
+import redis
+import hashlib
+import logging
+import threading
+from functools import wraps
+from collections import OrderedDict
+from v1.config import Config
+from v1.shared_cache import SharedCache
+from v1.metadata_query import listing_etag
+from v1.tokens import current_email
+from flask import jsonify, make_response, request
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    In-process cache that expires entries after a time to live and evicts
+    the least recently used entry once it holds `maxsize` entries
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the cached value of a key
+
+        Args:
+            key: cache key
+
+        Returns:
+            the value, or None if the key is missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any,
+            ttl: Optional[float] = None) -> None:
+        """
+        Stores a value, evicting the least recently used entry if full
+
+        Args:
+            key: cache key
+            value: value to cache, None is never stored
+            ttl (float): seconds to keep the value, defaults to the
+                cache's time to live
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if value is None or ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any],
+                   ttl: Optional[float] = None) -> Optional[Any]:
+        """
+        Returns the cached value of a key, computing and storing it on a
+        miss
+
+        Args:
+            key: cache key
+            compute (callable): returns the value, or None to not cache
+            ttl (float): seconds to keep the value
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def set_many(self, values: Dict[Hashable, Any],
+                 ttl: Optional[float] = None) -> None:
+        for key, value in values.items():
+            self.set(key, value, ttl)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """hit/miss counters and current size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries)
+            }
+
+
+class ListingCache(TTLCache):
+    """
+    Cache of /file-metadata and /search-files responses, keyed per user
+    and per query
+
+    Files are shared by every user, so any upload or delete invalidates
+    every cached listing. The documents row of an upload is written by
+    the S3 event Lambda shortly after /upload/complete returns, so for a
+    few seconds after an invalidation responses are served but not
+    cached, rather than caching a listing that misses the new file
+    """
+
+    def __init__(self, maxsize: int, ttl: float, settle: float) -> None:
+        super().__init__(maxsize, ttl)
+        self.settle = settle
+        self._invalidated_at = float("-inf")
+
+    def invalidate(self) -> None:
+        """drops every listing after a write to the documents table"""
+        self.clear()
+        self._invalidated_at = time.monotonic()
+
+    def reset(self) -> None:
+        """forgets every listing, counter and recent write"""
+        self.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+        self._invalidated_at = float("-inf")
+
+    def settling(self) -> bool:
+        """whether a recent write may not be visible in listings yet"""
+        return time.monotonic() - self._invalidated_at < self.settle
+
+    def peek_many(self, keys: List[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Returns the live entries of several keys, without counting hits
+        and misses or refreshing their recency
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: self._entries[key][1] for key in keys
+                if key in self._entries and self._entries[key][0] > now
+            }
+
+    def set(self, key: Hashable, value: Any,
+            ttl: Optional[float] = None) -> None:
+        if not self.settling():
+            super().set(key, value, ttl)
+
+
+class RedisListingCache:
+    """
+    ListingCache kept in the shared Redis, so that every worker serves
+    and invalidates the same listings
+    """
+
+    def __init__(self, ttl: float, settle: float) -> None:
+        self.settle = settle
+        self.shared = SharedCache("listings", ttl, versioned=True)
+
+    @staticmethod
+    def _name(key: Hashable) -> str:
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def _settle_key(self) -> str:
+        return self.shared.raw_key("settling")
+
+    def settling(self) -> bool:
+        """whether a recent write may not be visible in listings yet"""
+        try:
+            return bool(self.shared.client.exists(self._settle_key()))
+        except redis.RedisError as e:
+            logger.warning(f"Cache settle check failed: {str(e)}")
+            return True
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.shared.get(self._name(key))
+
+    def set(self, key: Hashable, value: Any,
+            ttl: Optional[float] = None) -> None:
+        if not self.settling():
+            self.shared.set(self._name(key), value, ttl)
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any],
+                   ttl: Optional[float] = None) -> Optional[Any]:
+        if self.settling():
+            return compute()
+        return self.shared.get_or_set(self._name(key), compute, ttl)
+
+    def peek_many(self, keys: List[Hashable]) -> Dict[Hashable, Any]:
+        """live entries of several keys, fetched in one round trip"""
+        names = {self._name(key): key for key in keys}
+        values = self.shared.get_many(list(names), count=False)
+        return {names[name]: value for name, value in values.items()}
+
+    def invalidate(self) -> None:
+        """drops every listing after a write to the documents table"""
+        self.shared.invalidate()
+        try:
+            if self.settle > 0:
+                self.shared.client.set(self._settle_key(), 1,
+                                       px=int(self.settle * 1000))
+        except redis.RedisError as e:
+            logger.warning(f"Cache settle marker failed: {str(e)}")
+
+    def reset(self) -> None:
+        """forgets this worker's counters"""
+        self.shared.hits = self.shared.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return self.shared.stats()
+
+
+def build_listing_cache():
+    """the listing cache of the configured CACHE_BACKEND"""
+    if Config.CACHE_BACKEND == "redis":
+        return RedisListingCache(
+            ttl=Config.METADATA_CACHE_TTL,
+            settle=Config.METADATA_CACHE_SETTLE_SECONDS
+        )
+    return ListingCache(
+        maxsize=Config.METADATA_CACHE_MAX_ENTRIES,
+        ttl=Config.METADATA_CACHE_TTL,
+        settle=Config.METADATA_CACHE_SETTLE_SECONDS
+    )
+
+
+def build_cache(namespace: str, ttl: float, maxsize: int):
+    """
+    A string-keyed cache of the configured CACHE_BACKEND
+
+    Args:
+        namespace (str): Redis key namespace of the cache
+        ttl (float): default seconds to keep entries
+        maxsize (int): entries kept by the in-memory backend
+    """
+    if Config.CACHE_BACKEND == "redis":
+        return SharedCache(namespace, ttl)
+    return TTLCache(maxsize, ttl)
+
+
+listing_cache = build_listing_cache()
+
+# presigned download URLs, one entry per file, user and disposition,
+# see routes/download.py
+download_url_cache = build_cache(
+    "download-urls",
+    ttl=Config.DOWNLOAD_URL_EXPIRES_IN - Config.DOWNLOAD_URL_REUSE_MARGIN,
+    maxsize=Config.DOWNLOAD_URL_CACHE_MAX_ENTRIES
+)
+
+
+def _download_url_version_key(file_key: str) -> str:
+    return f"version|{file_key}"
+
+
+def download_url_key(file_key: str, email: str, disposition: str) -> str:
+    """
+    download_url_cache key of one user's URL for a file
+
+    Keys carry a version of the file, which `invalidate_file` drops, so
+    every user's URLs of a file are forgotten at once without listing
+    them; the entries left behind expire on their own
+    """
+    version_key = _download_url_version_key(file_key)
+    version = download_url_cache.get(version_key)
+    if version is None:
+        version = uuid.uuid4().hex
+        download_url_cache.set(version_key, version)
+    return f"{file_key}|{version}|{email}|{disposition}"
+
+
+def invalidate_listings() -> None:
+    """called after a file is uploaded or deleted"""
+    listing_cache.invalidate()
+    logger.debug("Invalidated cached file listings")
+
+
+# head_object results of each file key, see v1/object_info.py
+object_info_cache = build_cache(
+    "object-info",
+    ttl=Config.OBJECT_INFO_CACHE_TTL,
+    maxsize=Config.OBJECT_INFO_CACHE_MAX_ENTRIES
+)
+
+
+# emails of registered users, see v1/cognito.py
+known_email_cache = build_cache(
+    "known-emails",
+    ttl=Config.KNOWN_EMAILS_TTL,
+    maxsize=Config.KNOWN_EMAILS_MAX_ENTRIES
+)
+
+
+# multipart uploads in progress, see v1/upload_sessions.py; always kept
+# in Redis whatever the CACHE_BACKEND, since a client resuming an upload
+# reaches any worker, possibly after a restart
+upload_session_cache = SharedCache("upload-sessions",
+                                   ttl=Config.UPLOAD_SESSION_TTL)
+
+
+def invalidate_file(file_key: str) -> None:
+    """called after the object under `file_key` is overwritten or deleted"""
+    download_url_cache.delete(_download_url_version_key(file_key))
+    object_info_cache.delete(file_key)
+
+
+def listing_key(args: Dict[str, str]) -> tuple:
+    """listing cache key of the current user and path with query `args`"""
+    return (current_email(), request.path, tuple(sorted(args.items())))
+
+
+def cached_listing(view: Callable) -> Callable:
+    """
+    Serves a listing route from `listing_cache`
+
+    Successful responses are cached per user, path and query string;
+    other responses are never cached. Responses carry an `X-Cache`
+    header of HIT or MISS, and a strong ETag so that a client repeating
+    a request with a current `If-None-Match` gets an empty 304
+    """
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any):
+        if not current_email():
+            return view(*args, **kwargs)
+
+        key = listing_key(request.args.to_dict())
+        computed = {}
+
+        def fetch() -> Optional[Any]:
+            response = make_response(view(*args, **kwargs))
+            computed["response"] = response
+            if response.status_code == 200:
+                body = response.get_json()
+                return {"etag": listing_etag(body), "body": body}
+            return None
+
+        entry = listing_cache.get_or_set(key, fetch)
+        if "response" in computed:
+            response = computed["response"]
+            response.headers.setdefault("X-Cache", "MISS")
+        else:
+            response = make_response(jsonify(entry["body"]), 200)
+            response.headers["X-Cache"] = "HIT"
+
+        if entry is not None:
+            response.set_etag(entry["etag"])
+        if response.status_code in (200, 304):
+            # let browsers keep the body but revalidate it every time
+            response.headers["Cache-Control"] = "private, no-cache"
+        return response.make_conditional(request)
+
+    return wrapper
+
+
+def search_from_prefix(view: Callable) -> Callable:
+    """
+    Answers a search from the cached results of a shorter search
+
+    Searches match file names by substring, so every file matching
+    "repor" also matches "repo". When the first page of a search for the
+    longest cached prefix of the term was complete (no `next_cursor`),
+    filtering it gives exactly the result the backend would return, and
+    the backend is not called. Responses built this way carry
+    `X-Cache: PREFIX`
+
+    Applied under `cached_listing`, which then caches the filtered result
+    under the longer term
+    """
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any):
+        term = request.args.get("search", "")
+        if not current_email() or len(term) < 2 or \
+                request.args.get("cursor"):
+            return view(*args, **kwargs)
+
+        params = request.args.to_dict()
+        prefix_keys = []
+        for length in range(len(term) - 1, 0, -1):
+            prefix_keys.append(listing_key({**params,
+                                            "search": term[:length]}))
+        entries = listing_cache.peek_many(prefix_keys)
+
+        for key in prefix_keys:
+            entry = entries.get(key)
+            if entry is None or entry["body"].get("next_cursor"):
+                continue
+
+            needle = term.lower()
+            body = dict(entry["body"])
+            body["files"] = [
+                file for file in body.get("files", [])
+                if needle in file.get("file_name", "").lower()
+            ]
+            response = make_response(jsonify(body), 200)
+            response.headers["X-Cache"] = "PREFIX"
+            return response
+
+        return view(*args, **kwargs)
+
+    return wrapper
@@ -1,17 +1,17 @@
-import boto3
 import logging
 import re
 from flask import session
 from botocore.exceptions import ClientError
 from v1.config import Config
+from v1.aws_clients import get_client, get_resource
+from v1.cache import known_email_cache
 from typing import Dict, Union
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # initialize cognito client
-cognito_client = boto3.client("cognito-idp",
-                              region_name=Config.AWS_REGION)
+cognito_client = get_client("cognito-idp")
 
 
 def register_user(
@@ -44,14 +44,72 @@ def register_user(
                 {"Name": "preferred_username", "Value": username}
             ]
         )
+        remember_email(email)
         return {"Success": True}
     except ClientError as e:
+        # sign_up itself reports taken emails, so no lookup is needed first
+        if e.response["Error"]["Code"] == "UsernameExistsException":
+            remember_email(email)
+            return {
+                "Success": False,
+                "exists": True,
+                "message": e.response["Error"]["Message"]
+            }
         return {
             "Success": False,
             "message": e.response["Error"]["Message"]
         }
 
 
+def remember_email(email: str) -> None:
+    """records that an email is registered"""
+    known_email_cache.set(email, True)
+
+
+def forget_email(email: str) -> None:
+    """drops an email whose account was deleted"""
+    known_email_cache.delete(email)
+
+
+def is_known_email(email: str) -> bool:
+    """
+    Checks the local cache of registered emails, without calling Cognito
+
+    Emails match exactly as given: the user pool compares usernames case
+    sensitively, so Foo@x.com and foo@x.com are different accounts
+
+    Args:
+        email (str): the email address to check
+
+    Returns:
+        bool: True if the email is known to be registered, False if it is
+            not known either way
+    """
+    return bool(known_email_cache.get(email))
+
+
+def warm_known_emails() -> int:
+    """
+    Loads the emails of confirmed users from the userdata table into the
+    known emails cache, a page at a time
+
+    Returns:
+        int: number of emails loaded
+    """
+    table = get_resource("dynamodb").Table(
+        Config.USERDATA_DYNAMODB_TABLE_NAME)
+    scan_kwargs = {"ProjectionExpression": "UserId"}
+    loaded = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        emails = [item["UserId"] for item in response.get("Items", [])]
+        known_email_cache.set_many({email: True for email in emails})
+        loaded += len(emails)
+        if "LastEvaluatedKey" not in response:
+            return loaded
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
 def confirm_user(email: str, code: str) -> Dict[str, bool | str]:
     """
     Confirms a user's email address using the verification code
@@ -135,28 +193,6 @@ def login_user(
         return {"Success": False, "message": e.response["Error"]["Message"]}
 
 
-def email_exists(email: str) -> bool:
-    """
-    Checks if an email address is already registered in Cognito
-
-    Args:
-        email (str): the email address to check
-
-        Returns:
-            bool: True if the email address is already registered,
-                False otherwise
-    """
-    try:
-        response = cognito_client.list_users(
-            UserPoolId=Config.AWS_COGNITO_USER_POOL_ID,
-            Filter=f'email = "{email}"'
-        )
-        return len(response['Users']) > 0
-    except ClientError as e:
-        logger.error(f"Error checking email existence: {e}")
-        return False
-
-
 def delete_user(access_token: str) -> Dict[str, bool | str]:
     """
     Deletes the currently signed-in user from Cognito and DynamoDB
@@ -178,7 +214,7 @@ def delete_user(access_token: str) -> Dict[str, bool | str]:
 
         # delete from DynamoDB
         email = session.get("email")
-        dynamodb = boto3.resource("dynamodb")
+        dynamodb = get_resource("dynamodb")
         table = dynamodb.Table(Config.USERDATA_DYNAMODB_TABLE_NAME)
 
         response = table.delete_item(
@@ -192,6 +228,7 @@ def delete_user(access_token: str) -> Dict[str, bool | str]:
                 "message": "User not found in database"
             }
 
+        forget_email(email)
         session.clear()
         return {"Success": True}
 
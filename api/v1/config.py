@@ -15,7 +15,114 @@ class Config:
     AWS_API_GATEWAY_DELETE_URL = os.getenv("AWS_API_GATEWAY_DELETE_URL")
     S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
     DOCUMENTS_DYNAMODB_TABLE_NAME = os.getenv("DOCUMENTS_DYNAMODB_TABLE_NAME")
+    DOCUMENTS_FILE_NAME_INDEX = os.getenv("DOCUMENTS_FILE_NAME_INDEX",
+                                          "FileNameIndex")
+    DOCUMENTS_UPLOAD_TIMESTAMP_INDEX = os.getenv(
+        "DOCUMENTS_UPLOAD_TIMESTAMP_INDEX", "UploadTimestampIndex")
+    DOCUMENTS_OWNER_INDEX = os.getenv("DOCUMENTS_OWNER_INDEX", "OwnerIndex")
+    DOCUMENTS_FILE_KEY_INDEX = os.getenv("DOCUMENTS_FILE_KEY_INDEX",
+                                         "FileKeyIndex")
     USERDATA_DYNAMODB_TABLE_NAME = os.getenv("USERDATA_DYNAMODB_TABLE_NAME")
     REDIS_HOST = os.getenv("REDIS_HOST")
     REDIS_PORT = os.getenv("REDIS_PORT")
     REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
+
+    # shared boto3 clients, see v1/aws_clients.py
+    AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS",
+                                             "50"))
+    AWS_TCP_KEEPALIVE = os.getenv("AWS_TCP_KEEPALIVE",
+                                  "true").lower() == "true"
+    AWS_RETRY_MODE = os.getenv("AWS_RETRY_MODE", "standard")
+    AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+
+    # API Gateway client, see v1/upstream.py
+    UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT",
+                                               "3.05"))
+    UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "10"))
+    UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "2"))
+    UPSTREAM_BACKOFF_FACTOR = float(os.getenv("UPSTREAM_BACKOFF_FACTOR",
+                                              "0.2"))
+    UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "10"))
+
+    # where /file-metadata and /search-files read from: "gateway" calls
+    # the fetch metadata API, "direct" queries the documents table itself,
+    # see v1/metadata_backend.py
+    METADATA_BACKEND = os.getenv("METADATA_BACKEND", "gateway").lower()
+
+    # listing response cache, see v1/cache.py
+    METADATA_CACHE_TTL = float(os.getenv("METADATA_CACHE_TTL", "30"))
+    METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES",
+                                               "1024"))
+    METADATA_CACHE_SETTLE_SECONDS = float(
+        os.getenv("METADATA_CACHE_SETTLE_SECONDS", "5"))
+
+    # shared Redis cache, see v1/shared_cache.py; "memory" keeps caches
+    # inside each worker process instead, so an invalidation only reaches
+    # the worker that made it. Redis already holds the Flask sessions, so
+    # it is the default wherever it is configured
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND",
+                              "redis" if REDIS_HOST else "memory").lower()
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "dropzy")
+    CACHE_LOCK_TTL = float(os.getenv("CACHE_LOCK_TTL", "10"))
+    CACHE_LOCK_WAIT = float(os.getenv("CACHE_LOCK_WAIT", "2"))
+
+    # presigned download URLs, reused until DOWNLOAD_URL_REUSE_MARGIN
+    # seconds before they expire
+    DOWNLOAD_URL_EXPIRES_IN = int(os.getenv("DOWNLOAD_URL_EXPIRES_IN",
+                                            "3600"))
+    DOWNLOAD_URL_REUSE_MARGIN = int(os.getenv("DOWNLOAD_URL_REUSE_MARGIN",
+                                              "300"))
+    DOWNLOAD_URL_CACHE_MAX_ENTRIES = int(
+        os.getenv("DOWNLOAD_URL_CACHE_MAX_ENTRIES", "4096"))
+
+    # presigned multipart upload part URLs; /upload/chunk-urls signs at
+    # most UPLOAD_PART_URL_BATCH_MAX parts per request
+    UPLOAD_PART_URL_EXPIRES_IN = int(
+        os.getenv("UPLOAD_PART_URL_EXPIRES_IN", "3600"))
+    UPLOAD_PART_URL_BATCH_MAX = int(
+        os.getenv("UPLOAD_PART_URL_BATCH_MAX", "500"))
+
+    # multipart upload plans, see routes/upload.py: parts are at least
+    # UPLOAD_MIN_PART_SIZE bytes and grow so that an upload has at most
+    # about UPLOAD_TARGET_MAX_PARTS parts
+    UPLOAD_MIN_PART_SIZE = int(os.getenv("UPLOAD_MIN_PART_SIZE",
+                                         str(8 * 1024 * 1024)))
+    UPLOAD_TARGET_MAX_PARTS = int(os.getenv("UPLOAD_TARGET_MAX_PARTS",
+                                            "1000"))
+    UPLOAD_MAX_CONCURRENCY = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "8"))
+
+    # files up to this size are uploaded with a single presigned PUT, see
+    # /upload/small
+    SMALL_UPLOAD_MAX_BYTES = int(os.getenv("SMALL_UPLOAD_MAX_BYTES",
+                                           str(8 * 1024 * 1024)))
+
+    # resumable multipart upload sessions, kept in Redis, see
+    # v1/upload_sessions.py
+    UPLOAD_SESSION_TTL = float(os.getenv("UPLOAD_SESSION_TTL", "86400"))
+
+    # unfinished multipart uploads older than this are aborted by the
+    # sweep-uploads command, see v1/multipart_sweeper.py; keep it above
+    # UPLOAD_SESSION_TTL so that resumable uploads are not swept
+    UPLOAD_SWEEP_MAX_AGE_HOURS = float(
+        os.getenv("UPLOAD_SWEEP_MAX_AGE_HOURS", "48"))
+
+    # object existence checks, see v1/object_info.py; "s3" calls
+    # head_object, "documents" looks the key up in the documents table
+    OBJECT_INFO_SOURCE = os.getenv("OBJECT_INFO_SOURCE", "s3").lower()
+    OBJECT_INFO_CACHE_TTL = float(os.getenv("OBJECT_INFO_CACHE_TTL", "300"))
+    OBJECT_INFO_NEGATIVE_TTL = float(os.getenv("OBJECT_INFO_NEGATIVE_TTL",
+                                               "10"))
+    OBJECT_INFO_CACHE_MAX_ENTRIES = int(
+        os.getenv("OBJECT_INFO_CACHE_MAX_ENTRIES", "4096"))
+
+    # local Cognito token verification, see v1/tokens.py
+    JWKS_CACHE_TTL = float(os.getenv("JWKS_CACHE_TTL", "21600"))
+    JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("JWKS_MIN_REFRESH_INTERVAL",
+                                                "60"))
+    TOKEN_LEEWAY = int(os.getenv("TOKEN_LEEWAY", "30"))
+
+    # emails known to be registered, checked before calling sign_up,
+    # see v1/cognito.py
+    KNOWN_EMAILS_TTL = float(os.getenv("KNOWN_EMAILS_TTL", "86400"))
+    KNOWN_EMAILS_MAX_ENTRIES = int(os.getenv("KNOWN_EMAILS_MAX_ENTRIES",
+                                             "100000"))
@@ -0,0 +1,55 @@
+import logging
+from flask import jsonify
+from v1.config import Config
+from v1.aws_clients import get_resource
+from v1.metadata_query import InvalidCursorError, MetadataQuery
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger(__name__)
+
+
+def uses_direct_backend() -> bool:
+    """whether listings are read from DynamoDB instead of API Gateway"""
+    return Config.METADATA_BACKEND == "direct"
+
+
+def direct_listing(
+    search_term: str = "",
+    limit: int = 0,
+    cursor: str = "",
+    owner: str = None
+):
+    """
+    Reads a page of file metadata straight from the documents table,
+    skipping the API Gateway and Lambda hops
+
+    Runs the same queries as the fetch metadata Lambda and answers with
+    the same body, so the frontend cannot tell the backends apart
+
+    Args:
+        search_term (str): case-insensitive substring of the file name
+        limit (int): maximum number of files to return
+        cursor (str): `next_cursor` of the previous page, if any
+        owner (str): only list this owner's files
+
+    Returns:
+        tuple: Flask JSON response and status code
+            - 200 OK: the page of files and its `next_cursor`
+            - 400 Bad Request: the cursor is invalid
+            - 500 Internal Server Error: DynamoDB failures
+    """
+    table = get_resource("dynamodb").Table(
+        Config.DOCUMENTS_DYNAMODB_TABLE_NAME)
+    metadata = MetadataQuery(table,
+                             Config.DOCUMENTS_UPLOAD_TIMESTAMP_INDEX,
+                             Config.DOCUMENTS_OWNER_INDEX)
+    try:
+        listing = metadata.list_files(search_term, limit, cursor or "",
+                                      owner)
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
+    except (BotoCoreError, ClientError) as e:
+        logger.error(f"Failed to query file metadata: {str(e)}")
+        return jsonify({"error": f"Failed to fetch files: {str(e)}"}), 500
+
+    return jsonify({"message": "Success", **listing}), 200
@@ -0,0 +1,216 @@
+"""
+listing and search queries over the documents table
+
+shared by the Flask app's direct metadata backend and by
+infra/modules/lambda/file_metadata_lambda.py, which ships this file in
+its deployment package, so it must not import anything from `v1`
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from decimal import Decimal
+from boto3.dynamodb.conditions import Attr, Key
+
+# partition key value of the UploadTimestampIndex
+RECORD_TYPE = "document"
+# items read per Query page when a search filter thins the results out
+SEARCH_PAGE_SIZE = 100
+
+UPLOAD_TIMESTAMP_INDEX = "UploadTimestampIndex"
+OWNER_INDEX = "OwnerIndex"
+
+
+class InvalidCursorError(ValueError):
+    """raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(last_key):
+    """
+    Encodes a DynamoDB LastEvaluatedKey as an opaque, URL-safe cursor
+
+    Args:
+        last_key (dict): key of the last item returned, or None
+
+    Returns:
+        str: the cursor, or None if there are no more results
+    """
+    if not last_key:
+        return None
+    payload = json.dumps(last_key, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def listing_etag(body):
+    """
+    Strong validator of a listing response body, the same whichever
+    backend produced it
+
+    Args:
+        body (dict): the JSON body of a listing response
+
+    Returns:
+        str: hex digest of the body's canonical JSON, unquoted
+    """
+    payload = json.dumps(body, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def format_file(item):
+    """
+    Picks the fields of a documents item that listings return
+
+    Args:
+        item (dict): item read from one of the listing indexes
+
+    Returns:
+        dict: the file's metadata, with plain JSON types
+    """
+    size_bytes = item.get("size_bytes", 0)
+    if isinstance(size_bytes, Decimal):
+        size_bytes = int(size_bytes)
+
+    return {
+        "file_name": item.get("file_name", "unknown"),
+        "file_key": item.get("file_key", ""),
+        "upload_timestamp": item.get("upload_timestamp",
+                                     "1970-01-01T00:00:00.000000+00:00"),
+        "object_url": item.get("object_url", ""),
+        "size_bytes": size_bytes,
+        "owner": item.get("owner", ""),
+    }
+
+
+class MetadataQuery:
+    """
+    Reads file listings from the documents table's time ordered indexes
+
+    Listings are read newest first from the UploadTimestampIndex, or from
+    the OwnerIndex when only one owner's files are requested
+    """
+
+    def __init__(self, table, upload_timestamp_index=UPLOAD_TIMESTAMP_INDEX,
+                 owner_index=OWNER_INDEX):
+        self.table = table
+        self.upload_timestamp_index = upload_timestamp_index
+        self.owner_index = owner_index
+
+    def index_partition(self, owner=None):
+        """
+        Picks the index and partition a listing is read from
+
+        Args:
+            owner (str): only list this owner's files, None for every file
+
+        Returns:
+            tuple: index name, partition key attribute and partition key
+                value
+        """
+        if owner:
+            return self.owner_index, "owner", owner
+        return self.upload_timestamp_index, "record_type", RECORD_TYPE
+
+    def index_key_attributes(self, owner=None):
+        """attributes that identify an item's position in the listing"""
+        _, partition_key, _ = self.index_partition(owner)
+        return ("DocumentId", partition_key, "upload_timestamp")
+
+    def decode_cursor(self, cursor, owner=None):
+        """
+        Decodes a cursor produced by encode_cursor back into an
+        ExclusiveStartKey for the listing of `owner`
+
+        Raises:
+            InvalidCursorError: if the cursor was not produced by
+                encode_cursor for this listing
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            last_key = json.loads(base64.urlsafe_b64decode(padded))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursorError("Invalid cursor")
+
+        _, partition_key, partition_value = self.index_partition(owner)
+        if not isinstance(last_key, dict) or \
+                set(last_key) != set(self.index_key_attributes(owner)) or \
+                last_key[partition_key] != partition_value:
+            raise InvalidCursorError("Invalid cursor")
+        return last_key
+
+    def recent_files(self, search_term="", limit=0, start_key=None,
+                     owner=None):
+        """
+        Queries the listing index newest first, stopping as soon as
+        `limit` files have been collected
+
+        Args:
+            search_term (str): case-insensitive substring of the file name
+            limit (int): maximum number of files to return, 0 for no limit
+            start_key (dict): ExclusiveStartKey to resume a previous query
+            owner (str): only query this owner's files
+
+        Returns:
+            tuple: matching documents ordered by upload_timestamp
+                descending, and the key to resume from (None once the
+                index is exhausted)
+        """
+        index_name, partition_key, partition_value = \
+            self.index_partition(owner)
+        query_kwargs = {
+            'IndexName': index_name,
+            'KeyConditionExpression': Key(partition_key).eq(partition_value),
+            'ScanIndexForward': False
+        }
+        if search_term:
+            query_kwargs['FilterExpression'] = \
+                Attr('search_name').contains(search_term.lower())
+        if start_key:
+            query_kwargs['ExclusiveStartKey'] = start_key
+
+        files = []
+        while True:
+            if limit > 0:
+                remaining = limit - len(files)
+                query_kwargs['Limit'] = max(remaining, SEARCH_PAGE_SIZE) \
+                    if search_term else remaining
+
+            response = self.table.query(**query_kwargs)
+            files.extend(response.get("Items", []))
+            last_key = response.get('LastEvaluatedKey')
+
+            if limit > 0 and len(files) > limit:
+                # the page overshot, resume right after the last file
+                files = files[:limit]
+                return files, {
+                    name: files[-1][name]
+                    for name in self.index_key_attributes(owner)
+                }
+            if (limit > 0 and len(files) == limit) or not last_key:
+                return files, last_key
+            query_kwargs['ExclusiveStartKey'] = last_key
+
+    def list_files(self, search_term="", limit=0, cursor="", owner=None):
+        """
+        Reads one page of a listing
+
+        Args:
+            search_term (str): case-insensitive substring of the file name
+            limit (int): maximum number of files to return, 0 for no limit
+            cursor (str): `next_cursor` of the previous page, if any
+            owner (str): only list this owner's files
+
+        Returns:
+            dict: the page's `files` and its `next_cursor`, None on the
+                last page
+
+        Raises:
+            InvalidCursorError: if the cursor cannot be decoded
+        """
+        start_key = self.decode_cursor(cursor, owner) if cursor else None
+        files, last_key = self.recent_files(search_term, limit, start_key,
+                                            owner)
+        return {
+            'files': [format_file(item) for item in files],
+            'next_cursor': encode_cursor(last_key)
+        }
@@ -0,0 +1,120 @@
+"""
+aborts multipart uploads that were started but never completed
+
+parts of an unfinished upload are billed as storage but are not listed
+as objects. shared by the Flask app's `sweep-uploads` command and by
+infra/modules/lambda/multipart_sweeper_lambda.py, which ships this file
+in its deployment package, so it must not import anything from `v1`
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# uploads aborted at the same time
+SWEEP_WORKERS = 8
+
+
+def upload_size(s3, bucket, file_key, upload_id):
+    """
+    Adds up the size of the parts an upload holds
+
+    Returns:
+        int: bytes stored by the upload's parts
+    """
+    size = 0
+    kwargs = {"Bucket": bucket, "Key": file_key, "UploadId": upload_id}
+    while True:
+        response = s3.list_parts(**kwargs)
+        size += sum(part["Size"] for part in response.get("Parts", []))
+        if not response.get("IsTruncated"):
+            return size
+        kwargs["PartNumberMarker"] = response["NextPartNumberMarker"]
+
+
+def stale_uploads(s3, bucket, cutoff):
+    """
+    Pages through a bucket's multipart uploads
+
+    Args:
+        s3: S3 client
+        bucket (str): bucket to list
+        cutoff (datetime): only uploads initiated before this are returned
+
+    Yields:
+        list: the stale uploads of each page, as returned by S3
+    """
+    kwargs = {"Bucket": bucket}
+    while True:
+        response = s3.list_multipart_uploads(**kwargs)
+        yield [
+            upload for upload in response.get("Uploads", [])
+            if upload["Initiated"] < cutoff
+        ]
+        if not response.get("IsTruncated"):
+            return
+        kwargs["KeyMarker"] = response["NextKeyMarker"]
+        kwargs["UploadIdMarker"] = response["NextUploadIdMarker"]
+
+
+def abort_upload(s3, bucket, upload):
+    """
+    Aborts one upload
+
+    Returns:
+        int: bytes reclaimed, or None if the upload could not be aborted
+    """
+    try:
+        size = upload_size(s3, bucket, upload["Key"], upload["UploadId"])
+        s3.abort_multipart_upload(Bucket=bucket, Key=upload["Key"],
+                                  UploadId=upload["UploadId"])
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchUpload":
+            # completed or aborted since it was listed
+            return 0
+        logger.error(f"Failed to abort upload of {upload['Key']}: {e}")
+        return None
+
+    logger.info(f"Aborted upload of {upload['Key']} started "
+                f"{upload['Initiated'].isoformat()}, {size} bytes")
+    return size
+
+
+def sweep_multipart_uploads(s3, bucket, max_age, workers=SWEEP_WORKERS,
+                            now=None):
+    """
+    Aborts every multipart upload older than `max_age`
+
+    Uploads are aborted a page of list_multipart_uploads at a time, with
+    up to `workers` uploads aborted in parallel
+
+    Args:
+        s3: S3 client
+        bucket (str): bucket to sweep
+        max_age (timedelta): age after which an upload is abandoned
+        workers (int): uploads aborted at the same time
+        now (datetime): current time, for tests
+
+    Returns:
+        dict: counts of `aborted` and `failed` uploads, and the
+            `bytes_reclaimed` from the aborted ones
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - max_age
+    report = {"aborted": 0, "failed": 0, "bytes_reclaimed": 0}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for uploads in stale_uploads(s3, bucket, cutoff):
+            for size in executor.map(
+                lambda upload: abort_upload(s3, bucket, upload), uploads
+            ):
+                if size is None:
+                    report["failed"] += 1
+                else:
+                    report["aborted"] += 1
+                    report["bytes_reclaimed"] += size
+
+    logger.info(f"Swept multipart uploads of {bucket}: {report}")
+    return report
@@ -0,0 +1,85 @@
+import logging
+from v1.config import Config
+from v1.aws_clients import get_resource
+from v1.cache import object_info_cache
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _head_object(s3: Any, bucket: str, file_key: str) -> Dict[str, Any]:
+    """
+    Reads an object's metadata from S3
+
+    Returns:
+        dict: `exists`, and the size, ETag and content type of an
+            existing object
+
+    Raises:
+        ClientError: on S3 errors other than a missing object
+    """
+    try:
+        response = s3.head_object(Bucket=bucket, Key=file_key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "404":
+            return {"exists": False}
+        raise
+
+    return {
+        "exists": True,
+        "size_bytes": response.get("ContentLength", 0),
+        "etag": response.get("ETag", ""),
+        "content_type": response.get("ContentType", "")
+    }
+
+
+def _documents_row(file_key: str) -> Dict[str, Any]:
+    """
+    Looks an object up by its documents table row, on the FileKeyIndex
+
+    The row is written by the S3 event Lambda once the object exists, so
+    this answers existence without calling S3, but not size or ETag
+    """
+    table = get_resource("dynamodb").Table(
+        Config.DOCUMENTS_DYNAMODB_TABLE_NAME)
+    response = table.query(
+        IndexName=Config.DOCUMENTS_FILE_KEY_INDEX,
+        KeyConditionExpression=Key("file_key").eq(file_key),
+        Limit=1
+    )
+    return {"exists": response.get("Count", 0) > 0}
+
+
+def object_info(s3: Any, bucket: str,
+                file_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns what is known about an object, from the cache when possible
+
+    Existing objects are cached for OBJECT_INFO_CACHE_TTL seconds and
+    missing ones for the shorter OBJECT_INFO_NEGATIVE_TTL; uploads and
+    deletes through the API drop the key's entry straight away
+
+    Args:
+        s3: S3 client to call head_object with
+        bucket (str): bucket holding the object
+        file_key (str): object key
+
+    Returns:
+        dict: the object's metadata, or None if it does not exist
+
+    Raises:
+        ClientError: on S3 or DynamoDB errors
+    """
+    info = object_info_cache.get(file_key)
+    if info is None:
+        if Config.OBJECT_INFO_SOURCE == "documents":
+            info = _documents_row(file_key)
+        else:
+            info = _head_object(s3, bucket, file_key)
+
+        ttl = None if info["exists"] else Config.OBJECT_INFO_NEGATIVE_TTL
+        object_info_cache.set(file_key, info, ttl)
+
+    return info if info["exists"] else None
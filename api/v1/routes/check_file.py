@@ -1,17 +1,38 @@
 
-import boto3
 import logging
 from . import upload_bp
 from v1.config import Config
+from v1.aws_clients import get_resource
+from v1.tokens import current_email
 from flask_cors import cross_origin
-from flask import request, jsonify, session
+from flask import request, jsonify
 from werkzeug.utils import secure_filename
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
+def file_name_exists(file_name: str) -> bool:
+    """
+    Looks a file name up on the documents table's file name index, a
+    single key lookup regardless of how many documents the table holds
+
+    Raises:
+        NoCredentialsError, PartialCredentialsError: on AWS credentials
+            errors
+    """
+    table = get_resource("dynamodb").Table(
+        Config.DOCUMENTS_DYNAMODB_TABLE_NAME)
+    response = table.query(
+        IndexName=Config.DOCUMENTS_FILE_NAME_INDEX,
+        KeyConditionExpression=Key('file_name').eq(secure_filename(file_name)),
+        Limit=1
+    )
+    return response.get('Count', 0) > 0
+
+
 @upload_bp.route("/upload/check-file-exists", methods=["POST"])
 @cross_origin(
     origins="*",
@@ -30,7 +51,7 @@ def check_file_exists():
             - 500 Internal Server Error: If an AWS credentials error occurs
     """
 
-    if "email" not in session:
+    if not current_email():
         return jsonify({"error": "Unauthorized"}), 401
 
     data = request.get_json()
@@ -40,22 +61,7 @@ def check_file_exists():
         return jsonify({"error": "Invalid request"}), 400
 
     try:
-        # initialize DynamoDB resource
-        dynamodb = boto3.resource("dynamodb")
-        TABLE_NAME = Config.DOCUMENTS_DYNAMODB_TABLE_NAME
-
-        secure_name = secure_filename(file_name)
-
-        # query dynamodb table for files with the same name
-        table = dynamodb.Table(TABLE_NAME)
-        response = table.scan(
-            FilterExpression='file_name = :filename',
-            ExpressionAttributeValues={':filename': secure_name}
-        )
-
-        exists = len(response.get('Items', [])) > 0
-
-        return jsonify({"exists": exists})
+        return jsonify({"exists": file_name_exists(file_name)})
 
     except (NoCredentialsError, PartialCredentialsError) as e:
         return jsonify({"error": str(e)}), 500
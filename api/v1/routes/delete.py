@@ -1,7 +1,10 @@
 import requests
 from v1.config import Config
+from v1.upstream import upstream
+from v1.cache import invalidate_file, invalidate_listings
+from v1.tokens import current_email, current_id_token
 import logging
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -29,8 +32,9 @@ def delete_file():
             - 400 Bad Request: `file_key` missing
             - 200 OK: file deleted successfully
             - 500 Internal Server Error: API or network failures
+            - 504 Gateway Timeout: API Gateway did not answer in time
     """
-    if "email" not in session:
+    if not current_email():
         return jsonify({"error": "Unauthorized"}), 401
 
     file_key = request.args.get("file_key")
@@ -46,16 +50,24 @@ def delete_file():
         }), 400
 
     try:
-        id_token = session.get("id_token")
+        id_token = current_id_token()
         headers = {"Authorization": f"Bearer {id_token}"}
-        response = requests.delete(
+        response = upstream.delete(
             AWS_API_GATEWAY_DELETE_URL,
             headers=headers,
             params={"file_key": file_key}
         )
+        if response.status_code == 200:
+            invalidate_listings()
+            invalidate_file(file_key)
 
         return jsonify(response.json()), response.status_code
 
+    except requests.Timeout:
+        logger.error("Delete request timed out")
+        return jsonify({
+            "error": "Upstream request timed out"
+        }), 504
     except requests.RequestException as e:
         logger.error(f"Network error: {str(e)}")
         return jsonify({
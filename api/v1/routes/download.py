@@ -1,10 +1,14 @@
 
-import boto3
+import time
 import logging
 from v1.config import Config
+from v1.aws_clients import get_client
+from v1.cache import download_url_cache, download_url_key
+from v1.object_info import object_info
+from v1.tokens import current_email
 from urllib.parse import unquote_plus
 from botocore.exceptions import ClientError
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, jsonify, request
 
 logger = logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,8 +25,11 @@ def download_file():
     GET:
         - Requires user authentication
         - Requires a `file_key` query parameter specifying the file to download
-        - Calls S3 to verify the file exists
-            before generating the pre-signed URL
+        - Calls S3, or the documents table when OBJECT_INFO_SOURCE is
+            "documents", to verify the file exists before generating the
+            pre-signed URL; the answer is cached
+        - Reuses the user's previous URL for the file, without calling
+            S3, until shortly before it expires
         - Handles missing files and errors gracefully
 
     Returns:
@@ -34,11 +41,11 @@ def download_file():
             - 500 Internal Server Error: S3 errors and unexpected failures
     """
 
-    if "email" not in session:
+    if not current_email():
         return jsonify({"error": "Unauthorized"}), 401
 
     try:
-        s3 = boto3.client("s3")
+        s3 = get_client("s3")
         BUCKET_NAME = Config.S3_BUCKET_NAME
 
         file_key = unquote_plus(request.args.get("file_key", ""))
@@ -52,36 +59,48 @@ def download_file():
         # exract the original file name
         file_name = file_key.split('/')[1]
 
+        # reuse the user's URL for this file while it has time left
+        disposition = f'attachment; filename="{file_name}"'
+        url_key = download_url_key(file_key, current_email(), disposition)
+        cached = download_url_cache.get(url_key)
+        if cached and cached["expires_at"] - time.time() > \
+                Config.DOWNLOAD_URL_REUSE_MARGIN:
+            return jsonify({
+                "presigned_url": cached["url"]
+            }), 200
+
         # check if the file exists in the bucket
         try:
-            s3.head_object(
-                Bucket=BUCKET_NAME,
-                Key=file_key
-            )
+            info = object_info(s3, BUCKET_NAME, file_key)
         except ClientError as e:
             logger.error(f"S3 error: {str(e)}")
-            if e.response["Error"]["Code"] == "404":
-                return jsonify({
-                    "error": "File not found"
-                }), 404
-            logger.error(f"S3 error: {str(e)}")
             return jsonify({
                 "error": "Error accessing file"
             }), 500
+        if info is None:
+            logger.info(f"File not found: {file_key}")
+            return jsonify({
+                "error": "File not found"
+            }), 404
 
-        # generate a pre-signed url with 1 hour expiration time
+        # generate a pre-signed url, 1 hour expiration time by default
         try:
+            expires_in = Config.DOWNLOAD_URL_EXPIRES_IN
             presigned_url = s3.generate_presigned_url(
                 "get_object",
                 Params={
                     "Bucket": BUCKET_NAME,
                     "Key": file_key,
-                    "ResponseContentDisposition":
-                        f'attachment; filename="{file_name}"'
+                    "ResponseContentDisposition": disposition
                 },
-                ExpiresIn=3600
+                ExpiresIn=expires_in
             )
 
+            download_url_cache.set(url_key, {
+                "url": presigned_url,
+                "expires_at": time.time() + expires_in
+            })
+
             return jsonify({
                 "presigned_url": presigned_url
             }), 200
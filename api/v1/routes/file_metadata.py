@@ -1,12 +1,20 @@
 import requests
 from . import file_metadata_bp
 from v1.config import Config
-from flask import jsonify, session
+from v1.upstream import upstream
+from v1.cache import cached_listing, listing_cache
+from v1.metadata_backend import direct_listing, uses_direct_backend
+from v1.tokens import current_email, current_id_token
+from flask import jsonify, request
 
 AWS_API_GATEWAY_FETCH_METADATA_URL = Config.AWS_API_GATEWAY_FETCH_METADATA_URL
 
+# number of files returned per page
+PAGE_SIZE = 15
+
 
 @file_metadata_bp.route("/file-metadata", methods=["GET"])
+@cached_listing
 def file_metadata():
     """
     Fetch recent file metadata from documents DynamoDB table
@@ -14,22 +22,47 @@ def file_metadata():
 
     GET:
         - Requires user to be logged in
-        - Calls Amazon API gateway to retrieve recent file metadata
-        - Requests metadata with a default limit of 15 files
+        - Calls Amazon API gateway to retrieve recent file metadata, or
+            queries the documents table directly when METADATA_BACKEND
+            is "direct"
+        - Requests metadata in pages of 15 files
+        - Accepts an optional `cursor` query parameter, the `next_cursor`
+            of a previous page, to fetch the page after it
+        - Accepts an optional `scope=mine` query parameter to only list
+            the files the user uploaded
         - Handles network errors and API failures gracefully
+        - Serves repeated requests from the listing cache until a file
+            is uploaded or deleted
 
     Returns:
         - 401 Unauthorized: user not logged in
-        - 200 OK: file metadata retrieval successful
+        - 200 OK: file metadata retrieval successful, with a `next_cursor`
+            that is null on the last page
+        - 304 Not Modified: the `If-None-Match` ETag is still current
         - 500 Internal Server Error: API or network failures
+        - 504 Gateway Timeout: API Gateway did not answer in time
     """
-    if "email" not in session:
+    if not current_email():
         return jsonify({"error": "Unauthorized"}), 401
 
+    if uses_direct_backend():
+        owner = current_email() \
+            if request.args.get("scope") == "mine" else None
+        return direct_listing(limit=PAGE_SIZE,
+                              cursor=request.args.get("cursor"),
+                              owner=owner)
+
     try:
-        headers = {"Authorization": f"Bearer {session.get('id_token')}"}
-        params = {"limit": 15}
-        response = requests.get(
+        headers = {"Authorization": f"Bearer {current_id_token()}"}
+        if request.if_none_match:
+            headers["If-None-Match"] = request.headers["If-None-Match"]
+        params = {"limit": PAGE_SIZE}
+        cursor = request.args.get("cursor")
+        if cursor:
+            params["cursor"] = cursor
+        if request.args.get("scope") == "mine":
+            params["scope"] = "mine"
+        response = upstream.get(
             AWS_API_GATEWAY_FETCH_METADATA_URL,
             headers=headers,
             params=params
@@ -37,9 +70,47 @@ def file_metadata():
 
         if response.status_code == 200:
             return jsonify(response.json()), 200
+        elif response.status_code == 304:
+            return "", 304, {"ETag": response.headers.get("ETag", "")}
         else:
             return jsonify({
                 "error": f"Failed to fetch files: {response.text}"
             }), response.status_code
+    except requests.Timeout:
+        return jsonify({"error": "Upstream request timed out"}), 504
     except requests.RequestException as e:
         return jsonify({"error": f"Network error: {str(e)}"}), 500
+
+
+@file_metadata_bp.route("/file-metadata/cache-stats", methods=["GET"])
+def cache_stats():
+    """
+    Report the listing cache's hit and miss counters
+
+    Returns:
+        JSON response:
+            - 401 Unauthorized: user not logged in
+            - 200 OK: hits, misses and number of cached listings
+    """
+    if not current_email():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    return jsonify(listing_cache.stats()), 200
+
+
+@file_metadata_bp.route("/file-metadata/upstream-stats", methods=["GET"])
+def upstream_stats():
+    """
+    Report this worker's latency, error and retry counters of each API
+    Gateway endpoint
+
+    Returns:
+        JSON response:
+            - 401 Unauthorized: user not logged in
+            - 200 OK: `count`, `errors`, `retries`, `avg_ms` and `max_ms`
+                per "METHOD url"
+    """
+    if not current_email():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    return jsonify(upstream.metrics()), 200
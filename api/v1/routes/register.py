@@ -6,7 +6,7 @@ from flask import (Blueprint,
                    session,
                    jsonify
                    )
-from v1.cognito import register_user, email_exists
+from v1.cognito import register_user, is_known_email
 import logging
 
 logging.basicConfig(level=logging.ERROR)
@@ -25,7 +25,8 @@ def register():
         - Render the registration page
     POST:
         - Retrieve email, username and password from form data
-        - Call Amazon Cognito to register the user
+        - Call Amazon Cognito to register the user, which rejects
+            emails that are already registered
         - If successful, store the email in session and
             redirect to confirmation page
         - If unsuccessful, re-render the registration page
@@ -44,7 +45,9 @@ def register():
         password = request.form.get("password")
 
         try:
-            if email_exists(email):
+            # registered emails are answered from the local cache, others
+            # are left to sign_up, which rejects taken emails itself
+            if is_known_email(email):
                 return jsonify({
                     "message": "User with email already exists."
                 }), 409
@@ -53,6 +56,10 @@ def register():
             if result["Success"]:
                 session["verification_email"] = email
                 return redirect(url_for("api.confirm.confirm"))
+            elif result.get("exists"):
+                return jsonify({
+                    "message": "User with email already exists."
+                }), 409
             else:
                 return jsonify({
                     "message": (
@@ -1,12 +1,21 @@
 import requests
 from . import file_metadata_bp
 from v1.config import Config
-from flask import jsonify, session, request
+from v1.upstream import upstream
+from v1.cache import cached_listing, search_from_prefix
+from v1.metadata_backend import direct_listing, uses_direct_backend
+from v1.tokens import current_email, current_id_token
+from flask import jsonify, request
 
 AWS_API_GATEWAY_FETCH_METADATA_URL = Config.AWS_API_GATEWAY_FETCH_METADATA_URL
 
+# number of matching files returned per page
+PAGE_SIZE = 30
+
 
 @file_metadata_bp.route("/search-files", methods=["GET"])
+@cached_listing
+@search_from_prefix
 def search_files():
     """
     search for files by name
@@ -14,17 +23,29 @@ def search_files():
     GET:
         - Requires a user to be logged in
         - Requires a 'search' query parameter
-        - Calls Amazon API Gateway to fetch matching file metadata
+        - Accepts an optional `cursor` query parameter, the `next_cursor`
+            of a previous page, to fetch the page after it
+        - Accepts an optional `scope=mine` query parameter to only list
+            the files the user uploaded
+        - Calls Amazon API Gateway to fetch matching file metadata, or
+            queries the documents table directly when METADATA_BACKEND
+            is "direct"
         - Handles network errors and API failures gracefully
+        - Serves repeated searches from the listing cache until a file
+            is uploaded or deleted, and narrows the complete cached results
+            of a shorter search term instead of calling the backend
 
     Returns:
         JSON response:
             - 401 Unauthorized: user not logged in
             - 400 Bad Request: search term is missing
-            - 200 OK: search results successful
+            - 200 OK: search results successful, with a `next_cursor`
+                that is null on the last page
+            - 304 Not Modified: the `If-None-Match` ETag is still current
             - 500 Internal Server Error: API or network failures
+            - 504 Gateway Timeout: API Gateway did not answer in time
     """
-    if "email" not in session:
+    if not current_email():
         return jsonify({"error": "Unauthorized"}), 401
 
     search_term = request.args.get('search', '')
@@ -33,10 +54,25 @@ def search_files():
             "error": "Search term is required"
         }), 400
 
+    if uses_direct_backend():
+        owner = current_email() \
+            if request.args.get("scope") == "mine" else None
+        return direct_listing(search_term,
+                              limit=PAGE_SIZE,
+                              cursor=request.args.get("cursor"),
+                              owner=owner)
+
     try:
-        headers = {"Authorization": f"Bearer {session.get('id_token')}"}
-        params = {"search": search_term}
-        response = requests.get(
+        headers = {"Authorization": f"Bearer {current_id_token()}"}
+        if request.if_none_match:
+            headers["If-None-Match"] = request.headers["If-None-Match"]
+        params = {"search": search_term, "limit": PAGE_SIZE}
+        cursor = request.args.get("cursor")
+        if cursor:
+            params["cursor"] = cursor
+        if request.args.get("scope") == "mine":
+            params["scope"] = "mine"
+        response = upstream.get(
             AWS_API_GATEWAY_FETCH_METADATA_URL,
             headers=headers,
             params=params
@@ -44,9 +80,13 @@ def search_files():
 
         if response.status_code == 200:
             return jsonify(response.json()), 200
+        elif response.status_code == 304:
+            return "", 304, {"ETag": response.headers.get("ETag", "")}
         else:
             return jsonify({
                 "error": f"failed to search files: {response.text}"
             }), response.status_code
+    except requests.Timeout:
+        return jsonify({"error": "Upstream request timed out"}), 504
     except requests.RequestException as e:
         return jsonify({"error": f"Network error: {str(e)}"}), 500
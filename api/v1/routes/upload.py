@@ -1,13 +1,21 @@
 import os
-import boto3
+import base64
+import binascii
 import logging
 from . import upload_bp
 import v1.config
+from v1.aws_clients import get_client
+from v1.cache import invalidate_file, invalidate_listings
+from v1.tokens import current_email
+from v1.routes.check_file import file_name_exists
+from v1.upload_sessions import (find_upload_session, forget_upload_session,
+                                get_upload_session, save_upload_session,
+                                upload_checksum_algorithm, uploaded_parts)
 from flask_cors import cross_origin
-from flask import request, jsonify, session
+from flask import request, jsonify
 from werkzeug.utils import secure_filename
-from botocore.client import Config
-from botocore.exceptions import NoCredentialsError, PartialCredentialsError
+from botocore.exceptions import (ClientError, NoCredentialsError,
+                                 PartialCredentialsError)
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -29,6 +37,19 @@ FILE_TYPE_MAP = {
     "other": []
 }
 
+# S3 multipart upload limits
+MAX_UPLOAD_PARTS = 10000
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+MAX_OBJECT_SIZE = 5 * 1024 * 1024 * 1024 * 1024
+
+# planned part sizes are rounded up to a whole number of these
+PART_SIZE_STEP = 1024 * 1024
+
+# S3 additional checksums a client may bind into its part uploads, with
+# the size of their digests in bytes
+CHECKSUM_ALGORITHMS = {"CRC32C": 4, "SHA256": 32}
+
 
 def get_folder(extension: str) -> str:
     """
@@ -46,6 +67,100 @@ def get_folder(extension: str) -> str:
     return "other"
 
 
+def upload_plan(file_size: int) -> dict:
+    """
+    Plans how a file is split into multipart upload parts
+
+    Parts are UPLOAD_MIN_PART_SIZE bytes, or larger when that would take
+    more than UPLOAD_TARGET_MAX_PARTS parts, which keeps multi-gigabyte
+    uploads to a reasonable number of requests. Part sizes stay within
+    S3's limits, so every file up to MAX_OBJECT_SIZE fits in
+    MAX_UPLOAD_PARTS parts
+
+    Args:
+        file_size (int): size of the file in bytes
+
+    Returns:
+        dict: `partSize` in bytes, `partCount`, and the recommended
+            `concurrency` of part uploads
+    """
+    config = v1.config.Config
+    target_size = max(
+        config.UPLOAD_MIN_PART_SIZE,
+        MIN_PART_SIZE,
+        -(-file_size // config.UPLOAD_TARGET_MAX_PARTS),
+        -(-file_size // MAX_UPLOAD_PARTS)
+    )
+    part_size = min(-(-target_size // PART_SIZE_STEP) * PART_SIZE_STEP,
+                    MAX_PART_SIZE)
+    part_count = max(1, -(-file_size // part_size))
+
+    return {
+        "partSize": part_size,
+        "partCount": part_count,
+        "concurrency": max(1, min(config.UPLOAD_MAX_CONCURRENCY, part_count))
+    }
+
+
+def invalid_file_name(file_name: str):
+    """
+    Checks that a file may be uploaded under this name
+
+    Returns:
+        str: the error to reply with, or None if the name is valid
+    """
+    if ".." in file_name or file_name.startswith("/"):
+        return "Invalid filename"
+
+    file_extension = os.path.splitext(file_name)[1][1:].lower()
+    if file_extension not in [
+        ext for exts in FILE_TYPE_MAP.values() for ext in exts
+    ]:
+        return "Unsupported file type"
+    return None
+
+
+def upload_key(file_name: str) -> str:
+    """S3 key an uploaded file is stored under"""
+    folder = get_folder(os.path.splitext(file_name)[1][1:])
+    return f"{folder}/{secure_filename(file_name)}"
+
+
+def valid_checksum(algorithm: str, checksum) -> bool:
+    """whether `checksum` is a base64 digest of the given algorithm"""
+    try:
+        digest = base64.b64decode(checksum, validate=True)
+    except (binascii.Error, TypeError, ValueError):
+        return False
+    return len(digest) == CHECKSUM_ALGORITHMS[algorithm]
+
+
+def part_upload_url(s3, file_key: str, upload_id: str, part_number: int,
+                    checksum_algorithm: str = None,
+                    checksum: str = None) -> str:
+    """
+    Presigns an `upload_part` request
+
+    Signing happens locally with the client's credentials, so signing
+    many parts costs no calls to S3. A part checksum is signed into the
+    request, so S3 rejects a part whose body does not match it
+    """
+    params = {
+        "Bucket": v1.config.Config.S3_BUCKET_NAME,
+        "Key": file_key,
+        "UploadId": upload_id,
+        "PartNumber": part_number
+    }
+    if checksum_algorithm:
+        params[f"Checksum{checksum_algorithm}"] = checksum
+
+    return s3.generate_presigned_url(
+        "upload_part",
+        Params=params,
+        ExpiresIn=v1.config.Config.UPLOAD_PART_URL_EXPIRES_IN
+    )
+
+
 @upload_bp.route("/upload/initialize", methods=["POST"])
 @cross_origin(origins="*", allow_headers=["Content-Type", "Authorization"])
 def initialize_multipart_upload():
@@ -57,8 +172,15 @@ def initialize_multipart_upload():
         - Requires JSON payload with:
             - `fileName` (str): Name of the file to be uploaded
             - `contentTYpe` (str): MIME type of the file
+            - `fileSize` (int, optional): size of the file in bytes
+            - `lastModified` (int, optional): the file's modification time
+            - `checksumAlgorithm` (str, optional): CRC32C or SHA256, to
+                have every part checksummed
         - Validates file name and type
         - Calls S3 to create a multipart upload session
+        - Given `fileSize`, also returns the upload `plan`: the part size,
+            part count and part upload concurrency to use, and records the
+            upload so that /upload/status can resume it
 
     Returns:
         JSON Response:
@@ -70,7 +192,7 @@ def initialize_multipart_upload():
             - 500 Internal Server Error: AWS Credentials issue
                 or other failures
     """
-    if "email" not in session:
+    if not current_email():
         return jsonify({"error": "Unauthorized"}), 401
 
     data = request.get_json()
@@ -82,45 +204,67 @@ def initialize_multipart_upload():
             "error": "Invalid request"
         }), 400
 
-    if not request.is_json:
+    file_size = data.get("fileSize")
+    if file_size is not None and (
+        not isinstance(file_size, int) or isinstance(file_size, bool) or
+        not 0 <= file_size <= MAX_OBJECT_SIZE
+    ):
         return jsonify({
-            "error": "Content-Type must be application/json"
-        }), 415
+            "error": "Invalid file size"
+        }), 400
 
-    # validate filename
-    if ".." in file_name or file_name.startswith("/"):
+    checksum_algorithm = data.get("checksumAlgorithm")
+    if checksum_algorithm is not None and \
+            checksum_algorithm not in CHECKSUM_ALGORITHMS:
         return jsonify({
-            "error": "Invalid filename"
+            "error": "Unsupported checksum algorithm"
         }), 400
 
-    # validate file type
-    file_extension = os.path.splitext(file_name)[1][1:].lower()
-    if file_extension not in [
-        ext for exts in FILE_TYPE_MAP.values() for ext in exts
-    ]:
+    if not request.is_json:
         return jsonify({
-            "error": "Unsupported file type"
+            "error": "Content-Type must be application/json"
+        }), 415
+
+    # validate filename and file type
+    error = invalid_file_name(file_name)
+    if error:
+        return jsonify({
+            "error": error
         }), 400
 
     try:
-        s3 = boto3.client(
-            "s3",
-            config=Config(s3={'use_accelerate_endpoint': True})
-        )
+        s3 = get_client("s3", s3={'use_accelerate_endpoint': True})
 
-        folder = get_folder(file_extension)
-        file_key = f"{folder}/{secure_filename(file_name)}"
+        file_key = upload_key(file_name)
 
+        # the owner metadata is what the metadata lambda records as the
+        # document's owner
+        create_kwargs = {}
+        if checksum_algorithm:
+            create_kwargs["ChecksumAlgorithm"] = checksum_algorithm
         response = s3.create_multipart_upload(
             Bucket=v1.config.Config.S3_BUCKET_NAME,
             Key=file_key,
-            ContentType=content_type
+            ContentType=content_type,
+            Metadata={"owner": current_email()},
+            **create_kwargs
         )
 
-        return jsonify({
+        upload = {
             "uploadId": response["UploadId"],
-            "key": file_key
-        })
+            "key": file_key,
+            "checksumAlgorithm": checksum_algorithm
+        }
+        if file_size is not None:
+            upload["plan"] = upload_plan(file_size)
+            last_modified = data.get("lastModified")
+            save_upload_session(
+                current_email(), file_key, upload["uploadId"],
+                upload["plan"], file_size,
+                last_modified if isinstance(last_modified, int) else None,
+                checksum_algorithm
+            )
+        return jsonify(upload)
     except (NoCredentialsError, PartialCredentialsError) as e:
         logger.error(f"Error initializing multipart upload: {str(e)}")
         return jsonify({
@@ -128,6 +272,135 @@ def initialize_multipart_upload():
         }), 500
 
 
+@upload_bp.route("/upload/small", methods=["POST"])
+@cross_origin(origins="*", allow_headers=["Content-Type", "Authorization"])
+def initialize_small_upload():
+    """
+    Prepares the upload of a small file as a single PUT, in place of the
+    check-file-exists, initialize, chunk-url and complete calls of a
+    multipart upload
+
+    POST:
+        - Requires user authentication
+        - Requires JSON payload with:
+            - `fileName` (str): Name of the file to be uploaded
+            - `contentType` (str): MIME type of the file
+            - `fileSize` (int): size of the file in bytes, at most
+                SMALL_UPLOAD_MAX_BYTES
+            - `checksumAlgorithm` and `checksum` (str, optional): the
+                file's base64 checksum, which S3 verifies
+        - Checks whether a file of the same name exists, and presigns a
+            `put_object` request carrying the owner metadata; once the
+            PUT succeeded the client notifies /upload/small/complete
+            without waiting for its response
+
+    Returns:
+        JSON response:
+            - 401 Unauthorized: User not logged in
+            - 400 Bad Request: Missing or invalid parameters
+            - 413 Payload Too Large: the file needs a multipart upload
+            - 200 OK: `exists`, the `key`, the presigned `url` and the
+                `headers` the PUT must send; a client that does not want
+                to overwrite an existing file simply does not use the URL
+            - 500 Internal Server Error: AWS errors or other failures
+    """
+    if not current_email():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json()
+    file_name = data.get("fileName")
+    content_type = data.get("contentType")
+    file_size = data.get("fileSize")
+
+    if not file_name or not content_type or \
+            not isinstance(file_size, int) or isinstance(file_size, bool) or \
+            file_size < 0:
+        return jsonify({"error": "Invalid request"}), 400
+
+    if file_size > v1.config.Config.SMALL_UPLOAD_MAX_BYTES:
+        return jsonify({"error": "File too large for a single upload"}), 413
+
+    error = invalid_file_name(file_name)
+    if error:
+        return jsonify({"error": error}), 400
+
+    checksum_algorithm = data.get("checksumAlgorithm")
+    checksum = data.get("checksum")
+    if checksum_algorithm is not None and (
+        checksum_algorithm not in CHECKSUM_ALGORITHMS or
+        not valid_checksum(checksum_algorithm, checksum)
+    ):
+        return jsonify({"error": "Invalid checksum"}), 400
+
+    try:
+        exists = file_name_exists(file_name)
+
+        s3 = get_client("s3", s3={'use_accelerate_endpoint': True})
+        file_key = upload_key(file_name)
+        params = {
+            "Bucket": v1.config.Config.S3_BUCKET_NAME,
+            "Key": file_key,
+            "ContentType": content_type,
+            "Metadata": {"owner": current_email()}
+        }
+        headers = {
+            "Content-Type": content_type,
+            "x-amz-meta-owner": current_email()
+        }
+        if checksum_algorithm:
+            params[f"Checksum{checksum_algorithm}"] = checksum
+            headers[f"x-amz-checksum-{checksum_algorithm.lower()}"] = \
+                checksum
+
+        url = s3.generate_presigned_url(
+            "put_object",
+            Params=params,
+            ExpiresIn=v1.config.Config.UPLOAD_PART_URL_EXPIRES_IN
+        )
+
+        return jsonify({
+            "exists": exists,
+            "key": file_key,
+            "url": url,
+            "headers": headers
+        })
+    except Exception as e:
+        logger.error(f"Error preparing small upload: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@upload_bp.route("/upload/small/complete", methods=["POST"])
+@cross_origin(origins="*", allow_headers=["Content-Type", "Authorization"])
+def complete_small_upload():
+    """
+    Records that the single PUT of a small upload succeeded
+
+    POST:
+        - Requires user authentication
+        - Requires JSON payload with:
+            - `key` (str): the file key returned by /upload/small
+        - Drops cached listings and the file's cached metadata, as
+            /upload/complete does for multipart uploads
+
+    Returns:
+        JSON response:
+            - 401 Unauthorized: User not logged in
+            - 400 Bad Request: Missing or invalid parameters
+            - 200 OK: Upload completed successfully
+    """
+    if not current_email():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json()
+    file_key = data.get("key")
+    if not isinstance(file_key, str) or not file_key:
+        return jsonify({"error": "Invalid request"}), 400
+
+    invalidate_listings()
+    invalidate_file(file_key)
+    return jsonify({"message": "Upload completed successfully"})
+
+
 @upload_bp.route("/upload/chunk-url", methods=["POST"])
 @cross_origin(origins="*", allow_headers=["Content-Type", "Authorization"])
 def get_chunk_upload_url():
@@ -141,6 +414,10 @@ def get_chunk_upload_url():
             - `uploadId` (str): ID of the multipart upload session
             - `partNumber` (int): The part number (1-based index)
                 of the file chunk
+            - `checksumAlgorithm` and `checksum` (str, optional): the
+                part's base64 checksum, for uploads initialized with a
+                checksum algorithm; the client sends it as the part's
+                `x-amz-checksum-*` header
         - Calls S3 to generate a pre-signed URL for the chunk upload
 
     Returns:
@@ -150,7 +427,7 @@ def get_chunk_upload_url():
             - 200 OK: Chunk upload URL generated successfully
             - 500 Internal Server Error: AWS errors or other failures
     """
-    if "email" not in session:
+    if not current_email():
         return jsonify({"error": "Unauthorized"}), 401
 
     data = request.get_json()
@@ -168,27 +445,164 @@ def get_chunk_upload_url():
     if not all([file_name, upload_id]):
         return jsonify({"error": "Missing required fields"}), 400
 
-    try:
-        s3 = boto3.client("s3")
-        folder = get_folder(os.path.splitext(file_name)[1][1:])
-        file_key = f"{folder}/{secure_filename(file_name)}"
+    checksum_algorithm = data.get("checksumAlgorithm")
+    checksum = data.get("checksum")
+    if checksum_algorithm is not None and (
+        checksum_algorithm not in CHECKSUM_ALGORITHMS or
+        not valid_checksum(checksum_algorithm, checksum)
+    ):
+        return jsonify({"error": "Invalid checksum"}), 400
 
-        url = s3.generate_presigned_url(
-            "upload_part",
-            Params={
-                "Bucket": v1.config.Config.S3_BUCKET_NAME,
-                "Key": file_key,
-                "UploadId": upload_id,
-                "PartNumber": part_number
-            },
-            ExpiresIn=3600
-        )
+    try:
+        s3 = get_client("s3")
+        url = part_upload_url(s3, upload_key(file_name), upload_id,
+                              part_number, checksum_algorithm, checksum)
 
         return jsonify({"url": url})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@upload_bp.route("/upload/chunk-urls", methods=["POST"])
+@cross_origin(origins="*", allow_headers=["Content-Type", "Authorization"])
+def get_chunk_upload_urls():
+    """
+    Generates pre-signed URLs for a range of parts of a multipart upload
+
+    POST:
+        - Requires user authentication
+        - Requires JSON payload with:
+            - `fileName` (str): Name of the file being uploaded
+            - `uploadId` (str): ID of the multipart upload session
+            - `firstPart` (int): first part number of the range (1-based)
+            - `lastPart` (int): last part number of the range, inclusive
+            - `checksumAlgorithm` (str, optional) and `checksums` (dict):
+                the base64 checksum of every part of the range, by part
+                number, for uploads initialized with a checksum algorithm
+        - Signs every part of the range in one response, at most
+            UPLOAD_PART_URL_BATCH_MAX parts and never past S3's
+            MAX_UPLOAD_PARTS
+
+    Returns:
+        JSON response:
+            - 401 Unauthorized: User not logged in
+            - 400 Bad Request: Missing or invalid parameters
+            - 200 OK: `urls`, a list of `partNumber`, `url` and
+                `checksum` objects
+            - 500 Internal Server Error: AWS errors or other failures
+    """
+    if not current_email():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json()
+    file_name = data.get("fileName")
+    upload_id = data.get("uploadId")
+
+    try:
+        first_part = int(data.get("firstPart"))
+        last_part = int(data.get("lastPart"))
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid part range"}), 400
+
+    if not 1 <= first_part <= last_part <= MAX_UPLOAD_PARTS or \
+            last_part - first_part >= \
+            v1.config.Config.UPLOAD_PART_URL_BATCH_MAX:
+        return jsonify({"error": "Invalid part range"}), 400
+
+    if not all([file_name, upload_id]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    checksum_algorithm = data.get("checksumAlgorithm")
+    checksums = data.get("checksums") or {}
+    if checksum_algorithm is not None and (
+        checksum_algorithm not in CHECKSUM_ALGORITHMS or
+        not isinstance(checksums, dict) or
+        not all(valid_checksum(checksum_algorithm, checksums.get(str(part)))
+                for part in range(first_part, last_part + 1))
+    ):
+        return jsonify({"error": "Invalid checksum"}), 400
+
+    try:
+        s3 = get_client("s3")
+        file_key = upload_key(file_name)
+        urls = []
+        for part_number in range(first_part, last_part + 1):
+            checksum = checksums.get(str(part_number)) \
+                if checksum_algorithm else None
+            urls.append({
+                "partNumber": part_number,
+                "url": part_upload_url(s3, file_key, upload_id, part_number,
+                                       checksum_algorithm, checksum),
+                "checksum": checksum
+            })
+
+        return jsonify({"urls": urls})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@upload_bp.route("/upload/status", methods=["GET"])
+@cross_origin(origins="*", allow_headers=["Content-Type", "Authorization"])
+def get_upload_status():
+    """
+    Finds an unfinished upload of a file, so that a client that lost its
+    state can resume it
+
+    GET:
+        - Requires user authentication
+        - Requires query parameters:
+            - `fileName` (str): Name of the file being uploaded
+            - `fileSize` (int): size of the file in bytes
+            - `lastModified` (int, optional): the file's modification time,
+                as sent to /upload/initialize
+        - Looks up the user's upload session of the file and lists the
+            parts that already reached S3
+
+    Returns:
+        JSON response:
+            - 401 Unauthorized: User not logged in
+            - 400 Bad Request: Missing or invalid parameters
+            - 404 Not Found: No unfinished upload of this file
+            - 200 OK: `uploadId`, `key`, `plan`, `checksumAlgorithm` and
+                the uploaded `parts` with their `PartNumber`, `ETag`,
+                `Size` and checksum
+            - 500 Internal Server Error: AWS errors or other failures
+    """
+    if not current_email():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    file_name = request.args.get("fileName")
+    file_size = request.args.get("fileSize", type=int)
+    last_modified = request.args.get("lastModified", type=int)
+    if not file_name or file_size is None:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    file_key = upload_key(file_name)
+    upload = find_upload_session(current_email(), file_key, file_size,
+                                 last_modified)
+    if upload is None:
+        return jsonify({"error": "No upload to resume"}), 404
+
+    try:
+        parts = uploaded_parts(get_client("s3"),
+                               v1.config.Config.S3_BUCKET_NAME,
+                               file_key, upload["uploadId"])
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchUpload":
+            forget_upload_session(current_email(), file_key)
+            return jsonify({"error": "No upload to resume"}), 404
+        logger.error(f"Error listing uploaded parts: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        "uploadId": upload["uploadId"],
+        "key": file_key,
+        "plan": upload["plan"],
+        "checksumAlgorithm": upload.get("checksumAlgorithm"),
+        "parts": parts
+    })
+
+
 @upload_bp.route("/upload/complete", methods=["POST"])
 @cross_origin(origins="*", allow_headers=["Content-Type", "Authorization"])
 def complete_multipart_upload():
@@ -200,17 +614,24 @@ def complete_multipart_upload():
         - Requires JSON payload with:
             - `key` (str): The file key in S3
             - `uploadId` (str): The multipart upload ID
-            - `parts` (list): List of uploaded file parts with ETags
-        - Calls S3 to finalize the multipart upload
+            - `parts` (list): List of uploaded file parts with ETags,
+                and with their checksums if the upload was initialized
+                with a checksum algorithm
+        - Reads the upload's checksum algorithm from its session, or from
+            S3 when the upload has no session
+        - Calls S3 to finalize the multipart upload, which fails if a
+            part checksum does not match the checksum S3 computed when
+            the part was uploaded
 
     Returns:
         JSON response:
             - 401 Unauthorized: User not logged in
             - 400 Bad Request: Missing or invalid parameters
-            - 200 OK: Upload completed successfully
+            - 200 OK: Upload completed successfully, with the object's
+                composite `checksum` for checksummed uploads
             - 500 Internal Server Error: AWS errors or other failures
     """
-    if "email" not in session:
+    if not current_email():
         return jsonify({"error": "Unauthorized"}), 401
 
     data = request.get_json()
@@ -219,14 +640,40 @@ def complete_multipart_upload():
     parts = data.get("parts")
 
     try:
-        s3 = boto3.client("s3")
-        s3.complete_multipart_upload(
+        s3 = get_client("s3")
+        # a checksummed upload must be completed with every part's
+        # checksum, so that S3 verifies each of them; the upload's session
+        # records its algorithm, and S3 is only asked without one
+        upload = get_upload_session(current_email(), file_key)
+        if upload is not None and upload["uploadId"] == upload_id:
+            checksum_algorithm = upload.get("checksumAlgorithm")
+        else:
+            checksum_algorithm = upload_checksum_algorithm(
+                s3, v1.config.Config.S3_BUCKET_NAME, file_key, upload_id)
+        if checksum_algorithm and not (
+            isinstance(parts, list) and all(
+                isinstance(part, dict) and valid_checksum(
+                    checksum_algorithm,
+                    part.get(f"Checksum{checksum_algorithm}"))
+                for part in parts
+            )
+        ):
+            return jsonify({"error": "Missing part checksums"}), 400
+
+        response = s3.complete_multipart_upload(
             Bucket=v1.config.Config.S3_BUCKET_NAME,
             Key=file_key,
             UploadId=upload_id,
             MultipartUpload={"Parts": parts}
         )
-
-        return jsonify({"message": "Upload completed successfully"})
+        invalidate_listings()
+        invalidate_file(file_key)
+        forget_upload_session(current_email(), file_key)
+
+        completed = {"message": "Upload completed successfully"}
+        if checksum_algorithm:
+            completed["checksum"] = \
+                response.get(f"Checksum{checksum_algorithm}")
+        return jsonify(completed)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
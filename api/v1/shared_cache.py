@@ -0,0 +1,265 @@
+import time
+import uuid
+import logging
+import threading
+import msgspec
+import redis
+from v1.config import Config
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# deletes a lock only if it is still held by the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# seconds between polls while another worker recomputes a value
+LOCK_POLL_INTERVAL = 0.05
+
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def get_redis() -> redis.Redis:
+    """
+    Returns the Redis client shared by sessions and caches
+
+    redis-py pools are fork safe, so one client per process is enough
+    """
+    global _redis
+
+    with _redis_lock:
+        if _redis is None:
+            _redis = redis.from_url(
+                f"redis://:{Config.REDIS_PASSWORD}@"
+                f"{Config.REDIS_HOST}:{Config.REDIS_PORT}"
+            )
+        return _redis
+
+
+class SharedCache:
+    """
+    Cache kept in Redis, so every gunicorn worker and host shares it
+
+    Values are serialized with msgpack under
+    `<CACHE_KEY_PREFIX>:<namespace>:<name>` keys that expire after a time
+    to live. Redis failures are logged and treated as misses, so the cache
+    never takes a route down with it
+
+    A versioned namespace also embeds a generation counter in its keys;
+    `invalidate()` bumps it, which orphans every entry of the namespace at
+    once without scanning for keys
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        versioned: bool = False,
+        client: Optional[redis.Redis] = None
+    ) -> None:
+        self.namespace = namespace
+        self.ttl = ttl
+        self.versioned = versioned
+        self.hits = 0
+        self.misses = 0
+        self._client = client
+        self._encoder = msgspec.msgpack.Encoder()
+        self._decoder = msgspec.msgpack.Decoder()
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client if self._client is not None else get_redis()
+
+    def raw_key(self, name: str) -> str:
+        """
+        Redis key of `name` in this namespace, outside any generation, for
+        markers kept next to the cache's entries
+        """
+        return f"{Config.CACHE_KEY_PREFIX}:{self.namespace}:{name}"
+
+    def _generation(self) -> int:
+        return int(self.client.get(self.raw_key("generation")) or 0)
+
+    def _keys(self, names: Iterable[str],
+              generation: Optional[int] = None) -> List[str]:
+        """
+        Redis keys of cache entries, in `generation` or else the current
+        generation of a versioned namespace
+        """
+        prefix = ""
+        if self.versioned:
+            if generation is None:
+                generation = self._generation()
+            prefix = f"{generation}:"
+        return [self.raw_key(f"{prefix}{name}") for name in names]
+
+    def _decode(self, raw: Optional[bytes],
+                count: bool = True) -> Optional[Any]:
+        if count:
+            self.hits += raw is not None
+            self.misses += raw is None
+        return None if raw is None else self._decoder.decode(raw)
+
+    def _ttl_ms(self, ttl: Optional[float]) -> int:
+        return int((self.ttl if ttl is None else ttl) * 1000)
+
+    def get(self, name: str,
+            generation: Optional[int] = None) -> Optional[Any]:
+        """
+        Returns the cached value of a name, None on a miss or Redis error
+        """
+        try:
+            return self._decode(
+                self.client.get(self._keys([name], generation)[0]))
+        except (redis.RedisError, msgspec.DecodeError) as e:
+            logger.warning(f"Cache get failed for {name}: {str(e)}")
+            self.misses += 1
+            return None
+
+    def get_many(self, names: List[str],
+                 count: bool = True) -> Dict[str, Any]:
+        """
+        Returns the cached values of several names in one round trip
+
+        Args:
+            names (list): entry names
+            count (bool): whether the lookups count as hits and misses
+
+        Returns:
+            dict: name -> value, for the names that were cached
+        """
+        if not names:
+            return {}
+        try:
+            raw_values = self.client.mget(self._keys(names))
+        except redis.RedisError as e:
+            logger.warning(f"Cache mget failed: {str(e)}")
+            self.misses += len(names) if count else 0
+            return {}
+
+        values = {}
+        for name, raw in zip(names, raw_values):
+            try:
+                value = self._decode(raw, count)
+            except msgspec.DecodeError:
+                value = None
+            if value is not None:
+                values[name] = value
+        return values
+
+    def set(self, name: str, value: Any, ttl: Optional[float] = None,
+            generation: Optional[int] = None) -> None:
+        """Stores a value for `ttl` seconds, None is never stored"""
+        self.set_many({name: value}, ttl, generation)
+
+    def set_many(self, values: Dict[str, Any],
+                 ttl: Optional[float] = None,
+                 generation: Optional[int] = None) -> None:
+        """
+        Stores several values in one pipelined round trip, in `generation`
+        or else the current generation of a versioned namespace
+        """
+        ttl_ms = self._ttl_ms(ttl)
+        values = {k: v for k, v in values.items() if v is not None}
+        if not values or ttl_ms <= 0:
+            return
+        try:
+            keys = self._keys(values, generation)
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in zip(keys, values.values()):
+                pipe.set(key, self._encoder.encode(value), px=ttl_ms)
+            pipe.execute()
+        except (redis.RedisError, TypeError) as e:
+            logger.warning(f"Cache set failed: {str(e)}")
+
+    def delete(self, *names: str) -> None:
+        if not names:
+            return
+        try:
+            self.client.delete(*self._keys(names))
+        except redis.RedisError as e:
+            logger.warning(f"Cache delete failed: {str(e)}")
+
+    def invalidate(self) -> None:
+        """orphans every entry of a versioned namespace"""
+        try:
+            self.client.incr(self.raw_key("generation"))
+        except redis.RedisError as e:
+            logger.warning(f"Cache invalidation failed: {str(e)}")
+
+    def get_or_set(
+        self,
+        name: str,
+        compute: Callable[[], Optional[Any]],
+        ttl: Optional[float] = None
+    ) -> Optional[Any]:
+        """
+        Returns the cached value of a name, computing and storing it on a
+        miss
+
+        Only one worker recomputes a missing value: it holds a short
+        `SET NX` lock while the others poll for its result, falling back
+        to computing the value themselves if it does not show up within
+        CACHE_LOCK_WAIT seconds
+
+        In a versioned namespace the value is stored in the generation
+        read before computing it, so a value computed across an
+        `invalidate()` is orphaned rather than served as current
+
+        Args:
+            name (str): entry name
+            compute (callable): returns the value, or None to not cache
+            ttl (float): seconds to keep the value
+
+        Returns:
+            the cached or computed value
+        """
+        generation = None
+        if self.versioned:
+            try:
+                generation = self._generation()
+            except redis.RedisError as e:
+                logger.warning(f"Cache get failed for {name}: {str(e)}")
+                self.misses += 1
+                return compute()
+
+        value = self.get(name, generation)
+        if value is not None:
+            return value
+
+        lock_key = self.raw_key(f"lock:{name}")
+        token = uuid.uuid4().hex
+        try:
+            locked = self.client.set(lock_key, token, nx=True,
+                                     px=int(Config.CACHE_LOCK_TTL * 1000))
+        except redis.RedisError as e:
+            logger.warning(f"Cache lock failed for {name}: {str(e)}")
+            return compute()
+
+        if not locked:
+            deadline = time.monotonic() + Config.CACHE_LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                value = self.get(name, generation)
+                if value is not None:
+                    return value
+            return compute()
+
+        try:
+            value = compute()
+            self.set(name, value, ttl, generation)
+            return value
+        finally:
+            try:
+                self.client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except redis.RedisError as e:
+                logger.warning(f"Cache unlock failed for {name}: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """this worker's hit/miss counters"""
+        return {"hits": self.hits, "misses": self.misses}
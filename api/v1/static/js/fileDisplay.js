@@ -9,8 +9,15 @@ export class FileDisplayManager {
         this.filesContainer = document.getElementById('files-container');
         this.isSearching = false;
         this.debouncedSearch = utils.debounce(this.handleSearch.bind(this), 300);
-        
+
+        // pagination state for the list currently on screen
+        this.files = [];
+        this.nextCursor = null;
+        this.currentSearch = '';
+        this.isLoadingMore = false;
+
         this.initializeEventListeners();
+        this.initializeInfiniteScroll();
         this.fetchRecentFiles();
     }
 
@@ -40,6 +47,62 @@ export class FileDisplayManager {
         });
     }
 
+    initializeInfiniteScroll() {
+        // load the next page once the end of the list scrolls into view
+        this.scrollSentinel = document.createElement('div');
+        this.scrollSentinel.className = 'scroll-sentinel';
+        this.filesContainer.after(this.scrollSentinel);
+
+        const observer = new IntersectionObserver((entries) => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                this.loadMoreFiles();
+            }
+        }, { rootMargin: '200px' });
+        observer.observe(this.scrollSentinel);
+    }
+
+    loadMoreIfVisible() {
+        // the observer only fires on changes, so a short first page that
+        // leaves the sentinel on screen has to request the next one itself
+        const { top } = this.scrollSentinel.getBoundingClientRect();
+        if (top < window.innerHeight + 200) this.loadMoreFiles();
+    }
+
+    buildListUrl(cursor = null) {
+        const params = new URLSearchParams();
+        if (this.currentSearch) params.set('search', this.currentSearch);
+        if (cursor) params.set('cursor', cursor);
+
+        const path = this.currentSearch ? 'search-files' : 'file-metadata';
+        const query = params.toString();
+        return `${this.API_BASE_URL}/${path}${query ? `?${query}` : ''}`;
+    }
+
+    async loadMoreFiles() {
+        if (!this.nextCursor || this.isLoadingMore) return;
+
+        this.isLoadingMore = true;
+        const search = this.currentSearch;
+        try {
+            const response = await fetch(this.buildListUrl(this.nextCursor));
+            if (!response.ok) throw new Error('Failed to fetch more files');
+
+            const data = await response.json();
+            // drop the page if the user started a different search meanwhile
+            if (search !== this.currentSearch) return;
+
+            this.files = this.files.concat(data.files || []);
+            this.nextCursor = data.next_cursor || null;
+            this.displayFiles(this.files);
+        } catch (error) {
+            console.error('Error loading more files:', error);
+            this.nextCursor = null;
+        } finally {
+            this.isLoadingMore = false;
+        }
+        this.loadMoreIfVisible();
+    }
+
     async fetchRecentFiles() {
         try {
             const response = await fetch(`${this.API_BASE_URL}/file-metadata`);
@@ -47,8 +110,12 @@ export class FileDisplayManager {
             
             const data = await response.json();
             if (!this.isSearching) {
-                if (data.files?.length > 0) {
-                    this.displayFiles(data.files);
+                this.currentSearch = '';
+                this.files = data.files || [];
+                this.nextCursor = data.next_cursor || null;
+                if (this.files.length > 0) {
+                    this.displayFiles(this.files);
+                    this.loadMoreIfVisible();
                 } else {
                     this.showNoFilesMessage("No files have been uploaded yet. Upload your first file to get started!");
                 }
@@ -87,13 +154,20 @@ export class FileDisplayManager {
         }
 
         this.isSearching = true;
+        this.currentSearch = searchTerm;
+        this.nextCursor = null;
         try {
-            const response = await fetch(`${this.API_BASE_URL}/search-files?search=${encodeURIComponent(searchTerm)}`);
+            const response = await fetch(this.buildListUrl());
             if (!response.ok) throw new Error('Search failed');
 
             const data = await response.json();
-            if (data.files?.length > 0) {
-                this.displayFiles(data.files);
+            if (searchTerm !== this.currentSearch) return;
+
+            this.files = data.files || [];
+            this.nextCursor = data.next_cursor || null;
+            if (this.files.length > 0) {
+                this.displayFiles(this.files);
+                this.loadMoreIfVisible();
             } else {
                 this.showNoFilesMessage(`No files found matching "${searchTerm}". Try a different search term.`);
             }
@@ -3,7 +3,21 @@
 export class FileUploader {
     constructor() {
         this.MAX_FILE_SIZE = 2.5 * 1024 * 1024 * 1024;
-        this.CHUNK_SIZE = 5 * 1024 * 1024;
+        // files up to this size are first offered a single PUT through
+        // /upload/small, which falls back to multipart above the server's
+        // own limit
+        this.SMALL_UPLOAD_MAX_BYTES = 8 * 1024 * 1024;
+        // part URLs signed per /upload/chunk-urls request
+        this.PART_URL_WINDOW = 100;
+        // attempts per part; part sizes and upload concurrency come from
+        // the plan returned by /upload/initialize
+        this.MAX_PART_ATTEMPTS = 4;
+        this.RETRY_BASE_DELAY_MS = 500;
+        // parts are checksummed where WebCrypto is available (secure
+        // contexts); part URLs of checksummed uploads are requested for
+        // about CHECKSUM_WINDOW_BYTES of hashed parts at a time
+        this.CHECKSUM_ALGORITHM = globalThis.crypto?.subtle ? 'SHA256' : null;
+        this.CHECKSUM_WINDOW_BYTES = 256 * 1024 * 1024;
         this.API_BASE_URL = '/api/v1';
         
         this.elements = {
@@ -47,13 +61,20 @@ export class FileUploader {
         if (!file) return;
 
         try {
-            const exists = await this.checkFileExists(file.name);
+            const small = file.size <= this.SMALL_UPLOAD_MAX_BYTES
+                ? await this.initializeSmallUpload(file)
+                : null;
+            const exists = small ? small.exists : await this.checkFileExists(file.name);
             if (exists && !(await this.shouldOverwriteDialog(file.name))) {
                 this.resetForm();
                 return;
             }
 
-            await this.performUpload(file);
+            if (small) {
+                await this.performSmallUpload(file, small);
+            } else {
+                await this.performUpload(file);
+            }
         } catch (error) {
             console.error('Upload error:', error);
             this.showError(`Error uploading "${file.name}": ${error.message}`);
@@ -73,15 +94,49 @@ export class FileUploader {
         return exists;
     }
 
+    // checks for an existing file and signs a single PUT in one call;
+    // null when the file has to be uploaded in parts
+    async initializeSmallUpload(file) {
+        const checksum = this.CHECKSUM_ALGORITHM ? await this.partChecksum(file) : null;
+        const response = await fetch(`${this.API_BASE_URL}/upload/small`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                fileName: file.name,
+                contentType: file.type || 'application/octet-stream',
+                fileSize: file.size,
+                checksumAlgorithm: this.CHECKSUM_ALGORITHM,
+                checksum
+            })
+        });
+        if (response.status === 413) return null;
+        if (!response.ok) throw new Error('Failed to initialize upload');
+        return response.json();
+    }
+
+    async performSmallUpload(file, { key, url, headers }) {
+        this.elements.progressContainer.style.display = 'block';
+        this.elements.uploadButton.disabled = true;
+
+        await this.putPart(url, file, bytes => this.updateProgress((bytes / (file.size || 1)) * 100), headers);
+        // only drops the server's cached listings and object info, so the
+        // upload is done once the PUT succeeded and this is not awaited
+        this.completeSmallUpload(key);
+
+        await this.showTemporarySuccess(`File "${file.name}" uploaded successfully.`);
+    }
+
     async performUpload(file) {
         this.elements.progressContainer.style.display = 'block';
         this.elements.uploadButton.disabled = true;
         this.elements.uploadStatus.textContent = 'Initializing upload...';
 
-        const { uploadId, key } = await this.initializeUpload(file);
-        const chunks = this.createChunks(file);
-        const parts = await this.uploadChunks(chunks, file, uploadId, key);
-        await this.completeUpload(key, uploadId, parts);
+        const resumable = await this.findResumableUpload(file);
+        if (resumable) this.elements.uploadStatus.textContent = 'Resuming upload...';
+        const upload = resumable || await this.initializeUpload(file);
+        const chunks = this.createChunks(file, upload.plan);
+        const parts = await this.uploadChunks(chunks, file, upload);
+        await this.completeUpload(upload.key, upload.uploadId, parts);
 
         await this.showTemporarySuccess(`File "${file.name}" uploaded successfully.`);
     }
@@ -95,57 +150,197 @@ export class FileUploader {
             },
             body: JSON.stringify({
                 fileName: file.name,
-                contentType: file.type
+                contentType: file.type,
+                fileSize: file.size,
+                lastModified: file.lastModified,
+                checksumAlgorithm: this.CHECKSUM_ALGORITHM
             })
         });
         if (!response.ok) throw new Error('Failed to initialize upload');
         return response.json();
     }
 
-    createChunks(file) {
+    // an unfinished upload of the same file, e.g. from before a reload,
+    // with the parts that already reached S3
+    async findResumableUpload(file) {
+        const params = new URLSearchParams({
+            fileName: file.name,
+            fileSize: file.size,
+            lastModified: file.lastModified
+        });
+        const response = await fetch(`${this.API_BASE_URL}/upload/status?${params}`);
+        if (!response.ok) return null;
+        return response.json();
+    }
+
+    createChunks(file, { partSize, partCount }) {
         const chunks = [];
-        let start = 0;
-        while (start < file.size) {
-            chunks.push(file.slice(start, Math.min(start + this.CHUNK_SIZE, file.size)));
-            start += this.CHUNK_SIZE;
+        for (let i = 0; i < partCount; i++) {
+            chunks.push(file.slice(i * partSize, Math.min((i + 1) * partSize, file.size)));
         }
         return chunks;
     }
 
-    async uploadChunks(chunks, file, uploadId, key) {
-        const parts = [];
+    // uploads up to the planned number of parts at a time, skipping the
+    // parts of a resumed upload that are already in S3; parts are listed
+    // in PartNumber order whatever order they finish in
+    async uploadChunks(chunks, file, upload) {
+        const { uploadId, plan, checksumAlgorithm, parts: uploadedParts = [] } = upload;
+        const getPartUrl = this.createPartUrlPrefetcher(file.name, uploadId, chunks, checksumAlgorithm);
+        const parts = new Array(chunks.length);
+        const loaded = new Array(chunks.length).fill(0);
         let uploadedSize = 0;
+        let nextIndex = 0;
+        let failed = false;
 
-        for (let i = 0; i < chunks.length; i++) {
-            const url = await this.getChunkUploadUrl(file.name, uploadId, i + 1);
-            const uploadResponse = await fetch(url, {
-                method: 'PUT',
-                body: chunks[i]
-            });
-
-            if (!uploadResponse.ok) throw new Error(`Failed to upload part ${i + 1}`);
-
-            uploadedSize += chunks[i].size;
+        const onPartProgress = (index, bytes) => {
+            uploadedSize += bytes - loaded[index];
+            loaded[index] = bytes;
             this.updateProgress((uploadedSize / file.size) * 100);
+        };
 
-            parts.push({
-                PartNumber: i + 1,
-                ETag: uploadResponse.headers.get('Etag')
-            });
+        for (const { Size, ...part } of uploadedParts) {
+            const index = part.PartNumber - 1;
+            if (index < chunks.length && Size === chunks[index].size) {
+                parts[index] = part;
+                onPartProgress(index, Size);
+            }
         }
 
+        const worker = async () => {
+            while (nextIndex < chunks.length && !failed) {
+                const index = nextIndex++;
+                if (parts[index]) continue;
+                try {
+                    const { etag, checksum } = await this.uploadPart(getPartUrl, index + 1,
+                        chunks[index], checksumAlgorithm, bytes => onPartProgress(index, bytes));
+                    parts[index] = { PartNumber: index + 1, ETag: etag };
+                    if (checksumAlgorithm) parts[index][`Checksum${checksumAlgorithm}`] = checksum;
+                } catch (error) {
+                    failed = true;
+                    throw error;
+                }
+            }
+        };
+
+        const workerCount = Math.min(plan.concurrency, chunks.length);
+        await Promise.all(Array.from({ length: workerCount }, worker));
         return parts;
     }
 
-    async getChunkUploadUrl(fileName, uploadId, partNumber) {
-        const response = await fetch(`${this.API_BASE_URL}/upload/chunk-url`, {
+    // retries a failed part with jittered exponential backoff
+    async uploadPart(getPartUrl, partNumber, chunk, checksumAlgorithm, onProgress) {
+        for (let attempt = 1; ; attempt++) {
+            try {
+                onProgress(0);
+                const { url, checksum } = await getPartUrl(partNumber);
+                // the checksum is signed into the URL, so S3 rejects a part
+                // whose body does not match it
+                const headers = checksumAlgorithm
+                    ? { [`x-amz-checksum-${checksumAlgorithm.toLowerCase()}`]: checksum }
+                    : {};
+                const etag = await this.putPart(url, chunk, onProgress, headers);
+                return { etag, checksum };
+            } catch (error) {
+                if (attempt >= this.MAX_PART_ATTEMPTS) {
+                    throw new Error(`Failed to upload part ${partNumber}: ${error.message}`);
+                }
+                const delay = this.RETRY_BASE_DELAY_MS * 2 ** (attempt - 1) * (0.5 + Math.random());
+                await new Promise(resolve => setTimeout(resolve, delay));
+            }
+        }
+    }
+
+    // fetch() cannot report upload progress, so parts are sent with XHR
+    putPart(url, chunk, onProgress, headers = {}) {
+        return new Promise((resolve, reject) => {
+            const xhr = new XMLHttpRequest();
+            xhr.open('PUT', url);
+            for (const [name, value] of Object.entries(headers)) {
+                xhr.setRequestHeader(name, value);
+            }
+            xhr.upload.onprogress = event => onProgress(event.loaded);
+            xhr.onload = () => {
+                if (xhr.status < 200 || xhr.status >= 300) {
+                    reject(new Error(`status ${xhr.status}`));
+                    return;
+                }
+                onProgress(chunk.size);
+                resolve(xhr.getResponseHeader('ETag'));
+            };
+            xhr.onerror = () => reject(new Error('network error'));
+            xhr.send(chunk);
+        });
+    }
+
+    // returns a function resolving a part's presigned URL and checksum;
+    // URLs are signed a window of parts at a time, and the next window is
+    // requested, and its parts hashed, once half of the current one has
+    // been handed out
+    createPartUrlPrefetcher(fileName, uploadId, chunks, checksumAlgorithm) {
+        const partCount = chunks.length;
+        const windowSize = checksumAlgorithm
+            ? Math.max(1, Math.min(this.PART_URL_WINDOW,
+                Math.floor(this.CHECKSUM_WINDOW_BYTES / chunks[0].size)))
+            : this.PART_URL_WINDOW;
+        const windows = new Map();
+
+        const signWindow = async (firstPart, lastPart) => {
+            const checksums = {};
+            if (checksumAlgorithm) {
+                for (let part = firstPart; part <= lastPart; part++) {
+                    checksums[part] = await this.partChecksum(chunks[part - 1]);
+                }
+            }
+            return this.getChunkUploadUrls(fileName, uploadId, firstPart, lastPart,
+                checksumAlgorithm, checksums);
+        };
+
+        const loadWindow = index => {
+            if (!windows.has(index)) {
+                const firstPart = index * windowSize + 1;
+                const lastPart = Math.min(firstPart + windowSize - 1, partCount);
+                const urls = signWindow(firstPart, lastPart);
+                // a failed window is requested again on next use
+                urls.catch(() => windows.delete(index));
+                windows.set(index, urls);
+            }
+            return windows.get(index);
+        };
+
+        return async partNumber => {
+            const index = Math.floor((partNumber - 1) / windowSize);
+            for (const loaded of windows.keys()) {
+                if (loaded < index - 2) windows.delete(loaded);
+            }
+            const offset = (partNumber - 1) % windowSize;
+            if (offset >= windowSize / 2 && (index + 1) * windowSize < partCount) {
+                loadWindow(index + 1);
+            }
+            const urls = await loadWindow(index);
+            return urls.get(partNumber);
+        };
+    }
+
+    async getChunkUploadUrls(fileName, uploadId, firstPart, lastPart, checksumAlgorithm, checksums) {
+        const response = await fetch(`${this.API_BASE_URL}/upload/chunk-urls`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ fileName, uploadId, partNumber })
+            body: JSON.stringify({
+                fileName, uploadId, firstPart, lastPart, checksumAlgorithm, checksums
+            })
         });
-        if (!response.ok) throw new Error('Failed to get chunk upload URL');
-        const { url } = await response.json();
-        return url;
+        if (!response.ok) throw new Error('Failed to get chunk upload URLs');
+        const { urls } = await response.json();
+        return new Map(urls.map(({ partNumber, ...signed }) => [partNumber, signed]));
+    }
+
+    // base64 SHA-256 digest of a part, as S3 expects in x-amz-checksum-sha256
+    async partChecksum(chunk) {
+        const digest = await crypto.subtle.digest('SHA-256', await chunk.arrayBuffer());
+        let binary = '';
+        for (const byte of new Uint8Array(digest)) binary += String.fromCharCode(byte);
+        return btoa(binary);
     }
 
     async completeUpload(key, uploadId, parts) {
@@ -157,6 +352,20 @@ export class FileUploader {
         if (!response.ok) throw new Error('Failed to complete upload');
     }
 
+    // fire and forget; keepalive lets the request finish if the page is left
+    completeSmallUpload(key) {
+        fetch(`${this.API_BASE_URL}/upload/small/complete`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ key }),
+            keepalive: true
+        })
+            .then(response => {
+                if (!response.ok) console.warn('Failed to complete upload:', response.status);
+            })
+            .catch(error => console.warn('Failed to complete upload:', error));
+    }
+
     shouldOverwriteDialog(fileName) {
         return new Promise(resolve => {
             const dialog = document.createElement('div');
@@ -0,0 +1,177 @@
+import time
+import logging
+import threading
+from v1.config import Config
+from v1.upstream import upstream
+from flask import g, jsonify, request, session
+from joserfc import jws, jwt
+from joserfc.errors import JoseError
+from joserfc.jwk import KeySet
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidTokenError(ValueError):
+    """raised when a token fails verification"""
+
+
+class TokenVerifier:
+    """
+    Verifies Cognito ID and access tokens locally against the user pool's
+    JSON Web Key Set
+
+    The key set is fetched once and cached for JWKS_CACHE_TTL seconds. A
+    token signed with a key id the cache does not know triggers an early
+    refresh, at most once every JWKS_MIN_REFRESH_INTERVAL seconds, so
+    Cognito key rotation is picked up without letting bad tokens hammer
+    the JWKS endpoint. A failed refresh keeps the stale key set and is
+    retried after the same interval
+    """
+
+    def __init__(
+        self,
+        region: Optional[str] = None,
+        user_pool_id: Optional[str] = None,
+        client_id: Optional[str] = None,
+        key_set: Optional[KeySet] = None
+    ) -> None:
+        self._region = region
+        self._user_pool_id = user_pool_id
+        self._client_id = client_id
+        self._key_set = key_set
+        self._fetched_at = time.monotonic() if key_set else float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def issuer(self) -> str:
+        region = self._region or Config.AWS_REGION
+        user_pool_id = self._user_pool_id or Config.AWS_COGNITO_USER_POOL_ID
+        return f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+
+    @property
+    def client_id(self) -> Optional[str]:
+        return self._client_id or Config.AWS_COGNITO_CLIENT_ID
+
+    def _fetch_key_set(self) -> KeySet:
+        response = upstream.get(f"{self.issuer}/.well-known/jwks.json")
+        response.raise_for_status()
+        return KeySet.import_key_set(response.json())
+
+    def _key_set_with(self, kid: str) -> KeySet:
+        """
+        Returns the cached key set, refreshing it if it is stale or does
+        not hold `kid`
+        """
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            known = self._key_set is not None and \
+                any(key.kid == kid for key in self._key_set)
+            if age > Config.JWKS_CACHE_TTL or \
+                    (not known and age > Config.JWKS_MIN_REFRESH_INTERVAL):
+                try:
+                    self._key_set = self._fetch_key_set()
+                    self._fetched_at = time.monotonic()
+                    logger.info("Refreshed the user pool JWKS")
+                except Exception as e:
+                    logger.error(f"Failed to fetch the JWKS: {str(e)}")
+                    if self._key_set is None:
+                        raise InvalidTokenError("Signing keys unavailable")
+                    # keep serving the stale key set and retry after
+                    # JWKS_MIN_REFRESH_INTERVAL, rather than refetching
+                    # under the lock on every request while Cognito is down
+                    self._fetched_at = time.monotonic() - \
+                        Config.JWKS_CACHE_TTL + \
+                        Config.JWKS_MIN_REFRESH_INTERVAL
+            return self._key_set
+
+    def verify(self, token: str, token_use: str = "id") -> Dict[str, Any]:
+        """
+        Verifies a token's signature, expiry, issuer and audience
+
+        Args:
+            token (str): compact JWT
+            token_use (str): "id" or "access"
+
+        Returns:
+            dict: the token's claims
+
+        Raises:
+            InvalidTokenError: if the token is not valid
+        """
+        try:
+            kid = jws.extract_compact(token.encode()).headers().get("kid")
+        except (JoseError, ValueError):
+            raise InvalidTokenError("Malformed token")
+        if not kid:
+            raise InvalidTokenError("Malformed token")
+
+        key_set = self._key_set_with(kid)
+        try:
+            key = key_set.get_by_kid(kid)
+        except ValueError:
+            raise InvalidTokenError("Unknown signing key")
+
+        claims_options = {
+            "iss": {"essential": True, "value": self.issuer},
+            "exp": {"essential": True},
+            "token_use": {"essential": True, "value": token_use}
+        }
+        # ID tokens name the app client in `aud`, access tokens in
+        # `client_id`
+        audience_claim = "aud" if token_use == "id" else "client_id"
+        claims_options[audience_claim] = {"essential": True,
+                                          "value": self.client_id}
+
+        try:
+            decoded = jwt.decode(token, key, algorithms=["RS256"])
+            jwt.JWTClaimsRegistry(
+                leeway=Config.TOKEN_LEEWAY, **claims_options
+            ).validate(decoded.claims)
+        except (JoseError, ValueError) as e:
+            raise InvalidTokenError(f"Invalid token: {str(e)}")
+        return decoded.claims
+
+
+verifier = TokenVerifier()
+
+
+def load_bearer_user():
+    """
+    Authenticates API clients that send `Authorization: Bearer <id token>`
+    instead of a session cookie
+
+    Registered as a `before_request` hook. A valid token's email is put on
+    `flask.g`, without creating a session; an invalid one is rejected
+    with 401
+    """
+    g.bearer_user = None
+    header = request.headers.get("Authorization", "")
+    if "email" in session or not header.startswith("Bearer "):
+        return None
+
+    token = header[len("Bearer "):].strip()
+    try:
+        claims = verifier.verify(token)
+    except InvalidTokenError as e:
+        logger.info(f"Rejected bearer token: {str(e)}")
+        return jsonify({"error": "Unauthorized"}), 401
+
+    g.bearer_user = {"email": claims.get("email"), "id_token": token}
+    return None
+
+
+def current_email() -> Optional[str]:
+    """email of the logged in user or of a verified bearer token"""
+    bearer_user = g.get("bearer_user")
+    if "email" in session or not bearer_user:
+        return session.get("email")
+    return bearer_user["email"]
+
+
+def current_id_token() -> Optional[str]:
+    """ID token to forward to API Gateway for the current user"""
+    bearer_user = g.get("bearer_user")
+    if "email" in session or not bearer_user:
+        return session.get("id_token")
+    return bearer_user["id_token"]
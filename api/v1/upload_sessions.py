@@ -0,0 +1,137 @@
+from v1.cache import upload_session_cache
+from typing import Any, Dict, List, Optional
+
+# parts read per list_parts call, the most S3 returns
+LIST_PARTS_PAGE_SIZE = 1000
+
+
+def _session_name(owner: str, file_key: str) -> str:
+    return f"{owner}|{file_key}"
+
+
+def save_upload_session(
+    owner: str,
+    file_key: str,
+    upload_id: str,
+    plan: Dict[str, int],
+    file_size: int,
+    last_modified: Optional[int] = None,
+    checksum_algorithm: Optional[str] = None
+) -> None:
+    """
+    Remembers a multipart upload, so that its client can resume it after
+    losing its state
+
+    A user has at most one session per file key: starting a new upload of
+    the same key replaces it
+
+    Args:
+        owner (str): email of the uploading user
+        file_key (str): S3 key being uploaded
+        upload_id (str): the multipart upload's ID
+        plan (dict): the upload plan the parts follow
+        file_size (int): size of the file in bytes
+        last_modified (int): the file's modification time as reported by
+            the browser, to tell apart files with the same name and size
+        checksum_algorithm (str): algorithm of the parts' checksums, if
+            they are checksummed
+    """
+    upload_session_cache.set(_session_name(owner, file_key), {
+        "uploadId": upload_id,
+        "key": file_key,
+        "owner": owner,
+        "plan": plan,
+        "fileSize": file_size,
+        "lastModified": last_modified,
+        "checksumAlgorithm": checksum_algorithm
+    })
+
+
+def get_upload_session(owner: str,
+                       file_key: str) -> Optional[Dict[str, Any]]:
+    """the user's session of an upload of `file_key`, if any"""
+    return upload_session_cache.get(_session_name(owner, file_key))
+
+
+def find_upload_session(owner: str, file_key: str,
+                        file_size: int,
+                        last_modified: Optional[int] = None
+                        ) -> Optional[Dict[str, Any]]:
+    """
+    Returns the session of an unfinished upload of the same file
+
+    Returns:
+        dict: the session, or None if there is none or it was started
+            for a different file
+    """
+    upload = get_upload_session(owner, file_key)
+    if upload is None or upload["fileSize"] != file_size or \
+            upload["lastModified"] != last_modified:
+        return None
+    return upload
+
+
+def forget_upload_session(owner: str, file_key: str) -> None:
+    """called once an upload is completed or can no longer be resumed"""
+    upload_session_cache.delete(_session_name(owner, file_key))
+
+
+def upload_checksum_algorithm(s3: Any, bucket: str, file_key: str,
+                              upload_id: str) -> Optional[str]:
+    """
+    Returns the checksum algorithm a multipart upload was created with
+
+    S3 is asked rather than the upload's session, which may have expired
+    or never been saved
+
+    Returns:
+        str: the algorithm, or None if the upload's parts are not
+            checksummed
+
+    Raises:
+        ClientError: on S3 errors, NoSuchUpload once the upload was
+            completed or aborted
+    """
+    response = s3.list_parts(Bucket=bucket, Key=file_key,
+                             UploadId=upload_id, MaxParts=1)
+    return response.get("ChecksumAlgorithm")
+
+
+def uploaded_parts(s3: Any, bucket: str, file_key: str,
+                   upload_id: str) -> List[Dict[str, Any]]:
+    """
+    Lists the parts of a multipart upload that reached S3
+
+    S3 is the record of which parts were uploaded, since clients upload
+    parts straight to it
+
+    Returns:
+        list: `PartNumber`, `ETag`, `Size` and the checksum, if any, of
+            each part, in PartNumber order
+
+    Raises:
+        ClientError: on S3 errors, NoSuchUpload once the upload was
+            completed or aborted
+    """
+    parts = []
+    kwargs = {
+        "Bucket": bucket,
+        "Key": file_key,
+        "UploadId": upload_id,
+        "MaxParts": LIST_PARTS_PAGE_SIZE
+    }
+    while True:
+        response = s3.list_parts(**kwargs)
+        parts.extend(
+            {
+                "PartNumber": part["PartNumber"],
+                "ETag": part["ETag"],
+                "Size": part["Size"],
+                **{name: value for name, value in part.items()
+                   if name.startswith("Checksum")}
+            }
+            for part in response.get("Parts", [])
+        )
+        if not response.get("IsTruncated"):
+            return parts
+        kwargs["PartNumberMarker"] = response["NextPartNumberMarker"]
@@ -0,0 +1,146 @@
+import os
+import time
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from v1.config import Config
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# methods that are safe to retry against the API Gateway endpoints
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "DELETE"})
+
+
+class LatencyStats:
+    """running latency counters for calls to one upstream endpoint"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool,
+               retries: int = 0) -> None:
+        self.count += 1
+        self.errors += int(failed)
+        self.retries += retries
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.count, 2)
+            if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2)
+        }
+
+
+class UpstreamClient:
+    """
+    Shared HTTP client for the API Gateway endpoints
+
+    Keeps one pooled keep-alive session per worker process, applies
+    connect/read timeouts to every call, retries idempotent calls with
+    jittered exponential backoff and records per-endpoint latency
+    """
+
+    def __init__(self) -> None:
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, LatencyStats] = {}
+
+    def _build_session(self) -> requests.Session:
+        retry = Retry(
+            total=Config.UPSTREAM_MAX_RETRIES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            status_forcelist=(502, 503, 504),
+            backoff_factor=Config.UPSTREAM_BACKOFF_FACTOR,
+            backoff_jitter=Config.UPSTREAM_BACKOFF_FACTOR,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=Config.UPSTREAM_POOL_SIZE,
+            pool_maxsize=Config.UPSTREAM_POOL_SIZE,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """the pooled session, rebuilt in a forked worker"""
+        with self._lock:
+            if self._session is None or self._session_pid != os.getpid():
+                self._session = self._build_session()
+                self._session_pid = os.getpid()
+            return self._session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        **kwargs: Any
+    ) -> requests.Response:
+        """
+        Sends a request through the pooled session
+
+        Args:
+            method (str): HTTP method
+            url (str): upstream URL
+            kwargs: passed on to requests, `timeout` defaults to the
+                configured (connect, read) timeouts
+
+        Returns:
+            requests.Response: the upstream response
+
+        Raises:
+            requests.RequestException: on network errors and timeouts
+        """
+        kwargs.setdefault("timeout", (Config.UPSTREAM_CONNECT_TIMEOUT,
+                                      Config.UPSTREAM_READ_TIMEOUT))
+        name = f"{method.upper()} {url}"
+
+        start = time.perf_counter()
+        failed = True
+        retries = 0
+        try:
+            response = self.session.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+            # attempts urllib3 retried before this response
+            retry = getattr(response.raw, "retries", None)
+            retries = len(retry.history) if retry is not None else 0
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._stats.setdefault(name, LatencyStats()) \
+                    .record(elapsed_ms, failed, retries)
+            logger.debug(f"{name} took {elapsed_ms:.1f} ms")
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """latency, error and retry counters per upstream endpoint"""
+        with self._lock:
+            return {
+                name: stats.as_dict() for name, stats in self._stats.items()
+            }
+
+
+# client shared by every route in the worker process
+upstream = UpstreamClient()
@@ -39,6 +39,8 @@ resource "aws_api_gateway_method" "file_metadata" {
   request_parameters = {
     "method.request.querystring.search" = false
     "method.request.querystring.limit"  = false
+    "method.request.querystring.cursor" = false
+    "method.request.querystring.scope"  = false
   }
 }
 
@@ -55,6 +57,8 @@ resource "aws_api_gateway_integration" "file_metadata_lambda" {
       queryStringParameters = {
         search = "$input.params('search')"
         limit  = "$input.params('limit')"
+        cursor = "$input.params('cursor')"
+        scope  = "$input.params('scope')"
       }
     })
   }
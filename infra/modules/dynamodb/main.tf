@@ -31,6 +31,65 @@ resource "aws_dynamodb_table" "documents_metadata" {
     type = "S"
   }
 
+  attribute {
+    name = "file_name"
+    type = "S"
+  }
+
+  attribute {
+    name = "file_key"
+    type = "S"
+  }
+
+  attribute {
+    name = "record_type"
+    type = "S"
+  }
+
+  attribute {
+    name = "upload_timestamp"
+    type = "S"
+  }
+
+  attribute {
+    name = "owner"
+    type = "S"
+  }
+
+  # lets the upload pre-check look up a file by name without a table scan
+  global_secondary_index {
+    name            = "FileNameIndex"
+    hash_key        = "file_name"
+    projection_type = "KEYS_ONLY"
+  }
+
+  # lets the delete lambda resolve an S3 key to its row without a table scan
+  global_secondary_index {
+    name            = "FileKeyIndex"
+    hash_key        = "file_key"
+    projection_type = "KEYS_ONLY"
+  }
+
+  # orders every document by upload time under one constant partition
+  # (record_type = "document") so listings are a single bounded Query
+  global_secondary_index {
+    name               = "UploadTimestampIndex"
+    hash_key           = "record_type"
+    range_key          = "upload_timestamp"
+    projection_type    = "INCLUDE"
+    non_key_attributes = ["file_name", "file_key", "object_url", "size_bytes", "search_name", "owner"]
+  }
+
+  # partitions documents by the email of the user who uploaded them, so a
+  # user's own listing is a Query over their partition only
+  global_secondary_index {
+    name               = "OwnerIndex"
+    hash_key           = "owner"
+    range_key          = "upload_timestamp"
+    projection_type    = "INCLUDE"
+    non_key_attributes = ["file_name", "file_key", "object_url", "size_bytes", "search_name"]
+  }
+
   point_in_time_recovery {
     enabled = true
   }
@@ -4,6 +4,7 @@ import boto3
 import json
 import os
 import logging
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
 s3 = boto3.client("s3")
@@ -11,6 +12,7 @@ dynamodb = boto3.resource("dynamodb")
 
 BUCKET_NAME = os.environ["S3_BUCKET_NAME"]
 TABLE_NAME = os.environ["DYNAMODB_TABLE_NAME"]
+FILE_KEY_INDEX = os.environ.get("DYNAMODB_FILE_KEY_INDEX", "FileKeyIndex")
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -45,15 +47,20 @@ def lambda_handler(event, context):
         # delete metadata from DynamoDB
         table = dynamodb.Table(TABLE_NAME)
         try:
-            # find item with matching file_key
-            response = table.scan(
-                FilterExpression='file_key = :key',
-                ExpressionAttributeValues={':key': file_key}
-            )
+            # find the items with matching file_key on the file_key index
+            query_kwargs = {
+                'IndexName': FILE_KEY_INDEX,
+                'KeyConditionExpression': Key('file_key').eq(file_key)
+            }
+            while True:
+                response = table.query(**query_kwargs)
+                for item in response.get('Items', []):
+                    table.delete_item(Key={'DocumentId': item['DocumentId']})
 
-            items = response.get('Items', [])
-            if items:
-                table.delete_item(Key={'DocumentId': items[0]['DocumentId']})
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = \
+                    response['LastEvaluatedKey']
         except ClientError as e:
             logger.error(f"DynamoDB deleteion error: {e}")
             return {
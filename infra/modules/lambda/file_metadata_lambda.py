@@ -1,18 +1,28 @@
 """
-fetches a file metadata from the documents table
-scans the documents table to get a searched file
+fetches the most recent file metadata from the documents table
+queries the documents table's upload time index to get a searched file
+queries the owner index instead when only the caller's files are requested
 """
 
 import boto3
 import simplejson as json
 import os
 import logging
+from metadata_query import InvalidCursorError, MetadataQuery, listing_etag
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 dynamodb = boto3.resource("dynamodb")
 TABLE_NAME = os.environ["DYNAMODB_TABLE_NAME"]
+UPLOAD_TIMESTAMP_INDEX = os.environ.get("DYNAMODB_UPLOAD_TIMESTAMP_INDEX",
+                                        "UploadTimestampIndex")
+OWNER_INDEX = os.environ.get("DYNAMODB_OWNER_INDEX", "OwnerIndex")
+table = dynamodb.Table(TABLE_NAME)
+
+# the query logic lives in metadata_query.py, which is shared with the
+# API's direct metadata backend and packaged alongside this file
+metadata = MetadataQuery(table, UPLOAD_TIMESTAMP_INDEX, OWNER_INDEX)
 
 
 def lambda_handler(event, context):
@@ -23,57 +33,71 @@ def lambda_handler(event, context):
         query_params = event.get('queryStringParameters', {}) or {}
         search_term = query_params.get('search', '')
         limit = int(query_params.get('limit', 0))
+        cursor = query_params.get('cursor', '')
 
-        # scan the table for the files
-        table = dynamodb.Table(TABLE_NAME)
-        response = table.scan()
-        files = response.get("Items", [])
-        logger.info(f"Files received: {len(files)}")
-
-        # extract file metadata
-        extracted_files = []
-        for file in files:
-            extracted_files.append({
-                "file_name": file.get("file_name", "unknown"),
-                "file_key": file.get("file_key", ""),
-                "upload_timestamp": (
-                    file.get("upload_timestamp",
-                             "1970-01-01T00:00:00.000000+00:00")
-                ),
-                "object_url": file.get("object_url", ""),
-                "size_bytes": file.get("size_bytes", 0),
-            })
+        # scope=mine lists only the caller's files, taking the owner from
+        # the Cognito authorizer claims rather than from the request
+        owner = None
+        if query_params.get('scope') == 'mine':
+            claims = (event.get('requestContext', {})
+                      .get('authorizer', {}).get('claims', {}))
+            owner = claims.get('email')
+            if not owner:
+                return {
+                    'statusCode': 403,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({'error': 'Unknown caller'})
+                }
 
-        # sort the files by upload timestamp
-        sorted_files = sorted(
-            extracted_files,
-            key=lambda x: x["upload_timestamp"],
-            reverse=True
-        )
+        try:
+            listing = metadata.list_files(search_term, limit, cursor, owner)
+        except InvalidCursorError as e:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': str(e)})
+            }
+        logger.info(f"Files received: {len(listing['files'])}")
 
-        # apply search filter if search term exists
-        if search_term:
-            sorted_files = [
-                file for file in sorted_files
-                if search_term.lower() in file["file_name"].lower()
-            ]
+        body = {
+            'message': 'Success',
+            'files': listing['files'],
+            'next_cursor': listing['next_cursor']
+        }
+        etag = f'"{listing_etag(body)}"'
 
-        # apply specified limit
-        if limit > 0:
-            sorted_files = sorted_files[:limit]
+        # answer a revalidation with an empty 304 if the listing is the
+        # one the caller already holds
+        headers = {k.lower(): v for k, v in
+                   (event.get('headers') or {}).items()}
+        if_none_match = headers.get('if-none-match', '')
+        if etag in [tag.strip().removeprefix('W/')
+                    for tag in if_none_match.split(',')]:
+            return {
+                'statusCode': 304,
+                'headers': {
+                    'ETag': etag,
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': ''
+            }
 
         return {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
+                'ETag': etag,
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, OPTIONS',
                 'Access-Control-Allow-Headers': 'Content-Type, Authorization'
             },
-            'body': json.dumps({
-                'message': 'Success',
-                'files': sorted_files
-            })
+            'body': json.dumps(body)
         }
 
     except Exception as e:
@@ -14,8 +14,18 @@ data "archive_file" "upload_lambda_zip_file" {
 
 data "archive_file" "fetch_file_metadata_zip_file" {
   type        = "zip"
-  source_file = "${path.module}/file_metadata_lambda.py"
   output_path = "${path.module}/file_metadata_lambda.zip"
+
+  source {
+    content  = file("${path.module}/file_metadata_lambda.py")
+    filename = "file_metadata_lambda.py"
+  }
+
+  # query logic shared with the API's direct metadata backend
+  source {
+    content  = file("${path.module}/../../../api/v1/metadata_query.py")
+    filename = "metadata_query.py"
+  }
 }
 
 data "archive_file" "delete_file_lambda_zip_file" {
@@ -24,6 +34,22 @@ data "archive_file" "delete_file_lambda_zip_file" {
   output_path = "${path.module}/delete_file_lambda.zip"
 }
 
+data "archive_file" "multipart_sweeper_lambda_zip_file" {
+  type        = "zip"
+  output_path = "${path.module}/multipart_sweeper_lambda.zip"
+
+  source {
+    content  = file("${path.module}/multipart_sweeper_lambda.py")
+    filename = "multipart_sweeper_lambda.py"
+  }
+
+  # sweep logic shared with the API's sweep-uploads command
+  source {
+    content  = file("${path.module}/../../../api/v1/multipart_sweeper.py")
+    filename = "multipart_sweeper.py"
+  }
+}
+
 resource "aws_lambda_function" "userdata" {
   filename      = "${path.module}/userdata_lambda.zip"
   function_name = "${var.project_name}-userdata-${var.environment}"
@@ -94,6 +120,42 @@ resource "aws_lambda_function" "delete_file" {
   }
 }
 
+resource "aws_lambda_function" "multipart_sweeper" {
+  filename      = "${path.module}/multipart_sweeper_lambda.zip"
+  function_name = "${var.project_name}-multipart-sweeper-${var.environment}"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "multipart_sweeper_lambda.lambda_handler"
+  runtime       = "python3.12"
+  timeout       = 300
+
+  source_code_hash = data.archive_file.multipart_sweeper_lambda_zip_file.output_base64sha256
+
+  environment {
+    variables = {
+      S3_BUCKET_NAME       = var.s3_bucket_name
+      MAX_UPLOAD_AGE_HOURS = var.multipart_upload_max_age_hours
+    }
+  }
+}
+
+resource "aws_cloudwatch_event_rule" "multipart_sweeper" {
+  name                = "${var.project_name}-multipart-sweeper-${var.environment}"
+  schedule_expression = var.multipart_sweep_schedule
+}
+
+resource "aws_cloudwatch_event_target" "multipart_sweeper" {
+  rule = aws_cloudwatch_event_rule.multipart_sweeper.name
+  arn  = aws_lambda_function.multipart_sweeper.arn
+}
+
+resource "aws_lambda_permission" "multipart_sweeper_schedule" {
+  statement_id  = "AllowEventBridgeInvoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.multipart_sweeper.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.multipart_sweeper.arn
+}
+
 resource "aws_iam_role" "lambda_role" {
   name               = "${var.project_name}-lambda-role"
   assume_role_policy = file("${path.module}/lambda-policy.json")
@@ -157,3 +219,12 @@ resource "aws_iam_role_policy" "lambda_logs" {
   policy = file("${path.module}/lambda-logs-policy.json")
 
 }
+
+resource "aws_iam_role_policy" "multipart_sweeper_policy" {
+  name = "${var.project_name}-multipart-sweeper-policy-${var.environment}"
+  role = aws_iam_role.lambda_role.name
+
+  policy = templatefile("${path.module}/lambda-multipart-sweeper-policy.json", {
+    s3_bucket_arn = var.s3_bucket_arn
+  })
+}
@@ -0,0 +1,32 @@
+""" aborts abandoned multipart uploads on a schedule """
+
+import boto3
+import json
+import os
+import logging
+from datetime import timedelta
+from multipart_sweeper import sweep_multipart_uploads
+
+s3 = boto3.client("s3")
+
+BUCKET_NAME = os.environ["S3_BUCKET_NAME"]
+MAX_UPLOAD_AGE_HOURS = float(os.environ.get("MAX_UPLOAD_AGE_HOURS", "48"))
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def lambda_handler(event, context):
+    try:
+        report = sweep_multipart_uploads(
+            s3, BUCKET_NAME, timedelta(hours=MAX_UPLOAD_AGE_HOURS))
+        return {
+            'statusCode': 200,
+            'body': json.dumps(report)
+        }
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
@@ -8,86 +8,196 @@ import os
 import uuid
 import logging
 from datetime import datetime, timezone
+from urllib.parse import unquote_plus
+from botocore.exceptions import ClientError
 
 logger = logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+s3 = boto3.client("s3")
 dynamodb = boto3.resource("dynamodb")
 TABLE_NAME = os.environ["DYNAMODB_TABLE_NAME"]
+table = dynamodb.Table(TABLE_NAME)
+
+# partition key value of the UploadTimestampIndex
+RECORD_TYPE = "document"
+
+# namespace of the name-based UUIDs used as DocumentIds
+DOCUMENT_ID_NAMESPACE = uuid.UUID("ee57ae71-7e25-4600-8ef5-6756c5de0ed2")
+
+
+def document_id_for(file_key):
+    """
+    Derives the DocumentId of an object from its key, so every write for
+    the same object lands on the same row
+    """
+    return str(uuid.uuid5(DOCUMENT_ID_NAMESPACE, file_key))
+
+
+def sequencer_of(record):
+    """
+    Returns a sortable form of a record's S3 sequencer
+
+    S3 sequencers are hex strings of varying length which only compare
+    correctly once the shorter one is left-padded with zeros
+    """
+    return record["s3"]["object"].get("sequencer", "").rjust(32, "0")
+
+
+def latest_records(records):
+    """
+    Collapses the ObjectCreated records of an event to one per object key,
+    keeping the most recent write of each key
+
+    Returns:
+        dict: object key -> S3 event record
+    """
+    latest = {}
+    for record in records:
+        if not record["eventName"].startswith("ObjectCreated:"):
+            continue
+
+        file_key = unquote_plus(record["s3"]["object"]["key"])
+        current = latest.get(file_key)
+        if current is None or sequencer_of(record) >= sequencer_of(current):
+            latest[file_key] = record
+    return latest
+
+
+# S3 additional checksum algorithms, as named in head_object responses
+CHECKSUM_ALGORITHMS = ("CRC32C", "SHA256")
+
+
+def object_details(bucket_name, file_key):
+    """
+    Reads what the documents row records about an object from its
+    metadata
+
+    Returns:
+        tuple: the email of the user who uploaded the object, which the
+            API records in its `owner` metadata, and its S3 checksum as an
+            `(algorithm, checksum)` pair; either is None if the object
+            has none
+    """
+    response = s3.head_object(Bucket=bucket_name, Key=file_key,
+                              ChecksumMode="ENABLED")
+    owner = response.get("Metadata", {}).get("owner")
+    for algorithm in CHECKSUM_ALGORITHMS:
+        if response.get(f"Checksum{algorithm}"):
+            return owner, (algorithm, response[f"Checksum{algorithm}"])
+    return owner, None
+
+
+def event_timestamp(record):
+    """
+    Returns the time S3 created the object, so a redelivered record
+    writes the same upload_timestamp as the original delivery
+    """
+    event_time = record.get("eventTime")
+    if not event_time:
+        created = datetime.now(timezone.utc)
+    else:
+        created = datetime.fromisoformat(event_time.replace("Z", "+00:00"))
+    return created.isoformat(timespec="microseconds")
+
+
+def store_metadata(file_key, record):
+    """
+    Upserts the documents row of an object with a single conditional
+    UpdateItem
+
+    The write only applies if the row is new or was written from an older
+    S3 event, so duplicate and out-of-order deliveries are no-ops
+
+    Returns:
+        bool: True if the row was written, False if it was already current
+    """
+    bucket_name = record["s3"]["bucket"]["name"]
+    file_name = file_key.split('/')[1]
+    owner, checksum = object_details(bucket_name, file_key)
+
+    attributes = {
+        'record_type': RECORD_TYPE,
+        'file_name': file_name,
+        'search_name': file_name.lower(),
+        'file_key': file_key,
+        'object_url': f"https://{bucket_name}.s3.amazonaws.com/{file_key}",
+        'upload_timestamp': event_timestamp(record),
+        'size_bytes': record["s3"]["object"]["size"],
+        's3_sequencer': sequencer_of(record)
+    }
+    # objects uploaded outside the API have no owner and stay out of the
+    # owner index
+    if owner:
+        attributes['owner'] = owner
+    # composite checksum of the parts of a checksummed multipart upload,
+    # so integrity checks need not read the object again
+    if checksum:
+        attributes['checksum_algorithm'], attributes['checksum'] = checksum
+
+    names = {f"#{name}": name for name in attributes}
+    values = {f":{name}": value for name, value in attributes.items()}
+    update_expression = "SET " + ", ".join(
+        f"#{name} = :{name}" for name in attributes
+    )
+    removed = [name for name in ('owner', 'checksum_algorithm', 'checksum')
+               if name not in attributes]
+    if removed:
+        update_expression += " REMOVE " + ", ".join(
+            f"#{name}" for name in removed
+        )
+        names.update({f"#{name}": name for name in removed})
+
+    try:
+        table.update_item(
+            Key={'DocumentId': document_id_for(file_key)},
+            UpdateExpression=update_expression,
+            ConditionExpression=(
+                "attribute_not_exists(DocumentId) OR "
+                "#s3_sequencer < :s3_sequencer"
+            ),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            logger.info(f"Metadata for {file_key} is already up to date")
+            return False
+        raise
 
 
 def lambda_handler(event, context):
     logger.info(f"Lambda function version: {context.function_version}")
     logger.info(f"Event source: {event.get('eventSource')}")
 
-    try:
-        for record in event["Records"]:
-            if record["eventName"].startswith("ObjectCreated:"):
-                bucket_name = record["s3"]["bucket"]["name"]
-                file_key = record["s3"]["object"]["key"]
-                size_bytes = record["s3"]["object"]["size"]
-
-                # get the filename
-                file_name = file_key.split('/')[1]
-
-                # query existing entries with the same filename
-                table = dynamodb.Table(TABLE_NAME)
-                response = table.scan(
-                    FilterExpression='file_name = :filename',
-                    ExpressionAttributeValues={':filename': file_name}
-                )
-
-                # if it exists, update the existing entry
-                existing_items = response.get('Items', [])
-                if existing_items:
-                    existing_item = existing_items[0]
-                    table.update_item(
-                        Key={'DocumentId': existing_item['DocumentId']},
-                        UpdateExpression=(
-                            'SET file_key = :new_key, '
-                            'object_url = :new_url, '
-                            'upload_timestamp = :new_timestamp, '
-                            'size_bytes = :new_size'
-                        ),
-                        ExpressionAttributeValues={
-                            ':new_key': file_key,
-                            ':new_url': (
-                                f"https://{bucket_name}.s3.amazonaws.com/"
-                                f"{file_key}"
-                            ),
-                            ':new_timestamp': (
-                                datetime.now(timezone.utc).isoformat()
-                            ),
-                            ':new_size': size_bytes
-                        }
-                    )
-                    logger.info(f"Updated metadata for {file_name}")
-                else:
-                    # create a new entry if no existing entry
-                    file_metadata = {
-                        'DocumentId': str(uuid.uuid4()),
-                        'file_name': file_name,
-                        'file_key': file_key,
-                        'object_url': (
-                            f"https://{bucket_name}.s3.amazonaws.com/"
-                            f"{file_key}"
-                        ),
-                        'upload_timestamp': (
-                            datetime.now(timezone.utc).isoformat()
-                        ),
-                        'size_bytes': size_bytes
-                    }
-
-                    table.put_item(Item=file_metadata)
-                    logger.info(
-                        f"Metadata for {file_name} stored successfully"
-                    )
-
-        return {
-            'statusCode': 200,
-            'body': json.dumps("File metadata stored successfully")
-        }
-    except Exception as e:
-        logger.error(f"Error processing event: {str(e)}")
+    records = latest_records(event.get("Records", []))
+    logger.info(f"Processing {len(records)} unique objects")
+
+    failed_keys = []
+    stored = 0
+    for file_key, record in records.items():
+        try:
+            if store_metadata(file_key, record):
+                stored += 1
+        except Exception as e:
+            logger.error(f"Error processing {file_key}: {str(e)}")
+            failed_keys.append(file_key)
+
+    logger.info(f"Stored metadata for {stored} objects")
+
+    if failed_keys:
+        logger.error(f"Failed to store metadata for: {failed_keys}")
         logger.error(f"Event structure: {json.dumps(event)}")
-        raise
+        # S3 invokes this function asynchronously, so raising is what makes
+        # Lambda retry the event; the objects already stored are no-ops on
+        # the retry, since their rows are current
+        raise RuntimeError(
+            f"Failed to store metadata for {len(failed_keys)} of "
+            f"{len(records)} objects"
+        )
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps("File metadata stored successfully")
+    }
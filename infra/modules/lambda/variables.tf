@@ -37,3 +37,15 @@ variable "s3_bucket_arn" {
   description = "ARN of the S3 bucket"
   type        = string
 }
+
+variable "multipart_upload_max_age_hours" {
+  description = "Age after which unfinished multipart uploads are aborted"
+  type        = number
+  default     = 48
+}
+
+variable "multipart_sweep_schedule" {
+  description = "EventBridge schedule of the multipart upload sweeper"
+  type        = string
+  default     = "rate(6 hours)"
+}
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+benchmarks the per-request cost of building boto3 clients
+
+compares creating a client inside every request, as the routes used to,
+against reusing the shared clients from api/v1/aws_clients.py, for the
+work a /download request does (presigning a get_object URL) and the work
+a /upload/check-file-exists request does (building a DynamoDB table)
+
+usage:
+    python scripts/benchmark_boto3_clients.py [--requests 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import boto3
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api"))
+sys.path.insert(0, API_DIR)
+
+from v1.aws_clients import get_client, get_resource  # noqa: E402
+
+
+def presign(s3):
+    s3.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": "benchmark-files", "Key": "text-files/a.txt"},
+        ExpiresIn=3600
+    )
+
+
+def per_request_s3(_):
+    presign(boto3.client("s3"))
+
+
+def shared_s3(_):
+    presign(get_client("s3"))
+
+
+def per_request_dynamodb(_):
+    boto3.resource("dynamodb").Table("benchmark-documents")
+
+
+def shared_dynamodb(_):
+    get_resource("dynamodb").Table("benchmark-documents")
+
+
+def timed(func, requests):
+    """return the mean wall time of `requests` calls in milliseconds"""
+    start = time.perf_counter()
+    for i in range(requests):
+        func(i)
+    return (time.perf_counter() - start) * 1000 / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = [
+        ("s3 presign, client per request", per_request_s3),
+        ("s3 presign, shared client", shared_s3),
+        ("dynamodb table, resource per request", per_request_dynamodb),
+        ("dynamodb table, shared resource", shared_dynamodb),
+    ]
+    for name, func in cases:
+        print(f"{name:40} {timed(func, args.requests):8.3f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+benchmarks how the delete lambda resolves a file_key to its documents row
+
+compares the old full-table scan against the FileKeyIndex query used by
+delete_file_lambda.py, on a moto-backed documents table
+
+usage:
+    python scripts/benchmark_delete_lookup.py [--rows 100000] [--runs 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+from moto import mock_aws
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+os.environ.setdefault("S3_BUCKET_NAME", "benchmark-files")
+os.environ.setdefault("DYNAMODB_TABLE_NAME", "benchmark-documents")
+
+LAMBDA_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "infra", "modules", "lambda"))
+sys.path.insert(0, LAMBDA_DIR)
+
+
+def create_table(dynamodb):
+    """create the documents table the way infra/modules/dynamodb does"""
+    return dynamodb.create_table(
+        TableName=os.environ["DYNAMODB_TABLE_NAME"],
+        KeySchema=[{"AttributeName": "DocumentId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "DocumentId", "AttributeType": "S"},
+            {"AttributeName": "file_key", "AttributeType": "S"}
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "FileKeyIndex",
+            "KeySchema": [{"AttributeName": "file_key", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "KEYS_ONLY"}
+        }],
+        BillingMode="PAY_PER_REQUEST"
+    )
+
+
+def fill_table(table, rows):
+    """write `rows` documents and return their file keys"""
+    keys = []
+    with table.batch_writer() as batch:
+        for i in range(rows):
+            file_key = f"text-files/document_{i}.txt"
+            batch.put_item(Item={
+                "DocumentId": str(uuid.uuid4()),
+                "file_name": f"document_{i}.txt",
+                "file_key": file_key,
+                "size_bytes": 1024
+            })
+            keys.append(file_key)
+    return keys
+
+
+def scan_lookup(table, file_key):
+    """the previous lookup, paged through so that it is actually correct"""
+    kwargs = {
+        "FilterExpression": "file_key = :key",
+        "ExpressionAttributeValues": {":key": file_key}
+    }
+    items = []
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def timed(func, runs):
+    """return the mean wall time of `runs` calls to func in milliseconds"""
+    start = time.perf_counter()
+    for i in range(runs):
+        func(i)
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with mock_aws():
+        import boto3
+        import delete_file_lambda
+
+        boto3.client("s3").create_bucket(
+            Bucket=os.environ["S3_BUCKET_NAME"],
+            CreateBucketConfiguration={
+                "LocationConstraint": os.environ["AWS_DEFAULT_REGION"]
+            }
+        )
+        table = create_table(boto3.resource("dynamodb"))
+
+        print(f"writing {args.rows} rows...")
+        keys = fill_table(table, args.rows)
+        targets = keys[-args.runs * 2:]
+
+        scan_ms = timed(lambda i: scan_lookup(table, targets[i]), args.runs)
+
+        def delete(i):
+            event = {"queryStringParameters": {
+                "file_key": targets[args.runs + i]
+            }}
+            response = delete_file_lambda.lambda_handler(event, None)
+            assert response["statusCode"] == 200, response
+
+        delete_ms = timed(delete, args.runs)
+
+        print(f"scan lookup:            {scan_ms:10.2f} ms")
+        print(f"indexed delete handler: {delete_ms:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+moves documents rows written under random DocumentIds to the ids the
+upload metadata lambda derives from their file_key
+
+rows written before DocumentIds were derived from the key would otherwise
+sit next to the row a re-upload creates, and be listed twice. a one-off
+migration, safe to re-run and to run while uploads continue
+
+usage:
+    DYNAMODB_TABLE_NAME=<documents table> \
+        python scripts/migrate_document_ids.py [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+
+import boto3
+from botocore.exceptions import ClientError
+
+LAMBDA_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "infra", "modules", "lambda"))
+sys.path.insert(0, LAMBDA_DIR)
+
+from upload_file_metadata_lambda import (  # noqa: E402
+    RECORD_TYPE, document_id_for
+)
+
+
+def legacy_rows(table):
+    """yield the rows whose DocumentId is not derived from their file_key"""
+    kwargs = {}
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get("Items", []):
+            file_key = item.get("file_key")
+            if file_key and item["DocumentId"] != document_id_for(file_key):
+                yield item
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def migrate_row(table, item):
+    """
+    copy a legacy row to its derived id, then delete it
+
+    the copy carries an empty s3_sequencer, so any S3 event the lambda
+    stores afterwards replaces it. it only overwrites a row that is itself
+    an older copy, so a row the lambda wrote is kept, and of several legacy
+    rows of one key the newest wins
+
+    returns True if the row was copied, False if a newer row was kept
+    """
+    file_name = item.get("file_name", "")
+    row = {
+        "record_type": RECORD_TYPE,
+        "search_name": file_name.lower(),
+        "upload_timestamp": "",
+        **item,
+        "DocumentId": document_id_for(item["file_key"]),
+        "s3_sequencer": ""
+    }
+    try:
+        table.put_item(
+            Item=row,
+            ConditionExpression=(
+                "attribute_not_exists(DocumentId) OR "
+                "(#s3_sequencer = :empty AND #upload_timestamp < :timestamp)"
+            ),
+            ExpressionAttributeNames={
+                "#s3_sequencer": "s3_sequencer",
+                "#upload_timestamp": "upload_timestamp"
+            },
+            ExpressionAttributeValues={
+                ":empty": "",
+                ":timestamp": row["upload_timestamp"]
+            }
+        )
+        copied = True
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        copied = False
+
+    table.delete_item(Key={"DocumentId": item["DocumentId"]})
+    return copied
+
+
+def migrate(table, dry_run=False):
+    """migrate every legacy row and return counts of what was done"""
+    report = {"copied": 0, "superseded": 0}
+    for item in legacy_rows(table):
+        if dry_run:
+            print(f"would migrate {item['DocumentId']} ({item['file_key']})")
+            report["copied"] += 1
+        elif migrate_row(table, item):
+            report["copied"] += 1
+        else:
+            report["superseded"] += 1
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="list the rows to migrate without writing")
+    args = parser.parse_args()
+
+    table = boto3.resource("dynamodb").Table(
+        os.environ["DYNAMODB_TABLE_NAME"])
+    report = migrate(table, dry_run=args.dry_run)
+    print(f"copied: {report['copied']}, superseded: {report['superseded']}")
+
+
+if __name__ == "__main__":
+    main()